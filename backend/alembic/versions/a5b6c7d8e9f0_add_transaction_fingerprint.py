@@ -0,0 +1,36 @@
+"""add_transaction_fingerprint
+
+Revision ID: a5b6c7d8e9f0
+Revises: f4a5b6c7d8e9
+Create Date: 2026-10-19
+
+Adds:
+- transactions.fingerprint (sha256 of normalized date|amount|currency|description)
+- ix_transactions_user_fingerprint for the import anti-join
+Backfills fingerprints for existing rows with the same normalization used in
+services/transaction_writer.fingerprint.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a5b6c7d8e9f0'
+down_revision = 'f4a5b6c7d8e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('fingerprint', sa.String(64), nullable=True))
+    op.execute(r"""
+        UPDATE transactions
+        SET fingerprint = encode(sha256(convert_to(
+            transaction_date::text || '|' || amount::text || '|' || currency::text || '|' ||
+            btrim(regexp_replace(lower(coalesce(description, '')), '\s+', ' ', 'g')),
+            'UTF8')), 'hex')
+    """)
+    op.create_index('ix_transactions_user_fingerprint', 'transactions', ['user_id', 'fingerprint'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_user_fingerprint', table_name='transactions')
+    op.drop_column('transactions', 'fingerprint')
@@ -0,0 +1,53 @@
+"""add_import_jobs
+
+Revision ID: b6c7d8e9f0a1
+Revises: a5b6c7d8e9f0
+Create Date: 2026-10-19
+
+Adds:
+- import_jobs table (background transaction imports with progress counters)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = 'b6c7d8e9f0a1'
+down_revision = 'a5b6c7d8e9f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True,
+                  server_default=sa.text('gen_random_uuid()')),
+        sa.Column('user_id', UUID(as_uuid=True),
+                  sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('upload_id', sa.String(64), nullable=False),
+        sa.Column('filename', sa.String(255), nullable=True),
+        sa.Column('options', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='QUEUED'),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('rows_parsed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_categorized', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_inserted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_duplicate', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', sa.Text(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('date_min', sa.Date(), nullable=True),
+        sa.Column('date_max', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_import_jobs_user_id', 'import_jobs', ['user_id'])
+    op.create_index('ix_import_jobs_status', 'import_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_jobs_status', table_name='import_jobs')
+    op.drop_index('ix_import_jobs_user_id', table_name='import_jobs')
+    op.drop_table('import_jobs')
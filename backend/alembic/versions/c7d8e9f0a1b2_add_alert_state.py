@@ -0,0 +1,49 @@
+"""add_alert_state
+
+Revision ID: c7d8e9f0a1b2
+Revises: b6c7d8e9f0a1
+Create Date: 2026-10-19
+
+Adds:
+- alert_state table (materialized budget alert levels + threshold crossing times)
+
+Rows are created lazily: the first GET /alerts for a user with budgets fills them.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM as PgEnum, UUID
+
+revision = 'c7d8e9f0a1b2'
+down_revision = 'b6c7d8e9f0a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    category_enum = PgEnum(name='categoryenum', create_type=False)
+    period_enum = PgEnum(name='budgetperiodenum', create_type=False)
+    op.create_table(
+        'alert_state',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True,
+                  server_default=sa.text('gen_random_uuid()')),
+        sa.Column('user_id', UUID(as_uuid=True),
+                  sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('budget_id', UUID(as_uuid=True),
+                  sa.ForeignKey('budgets.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('category', category_enum, nullable=False),
+        sa.Column('period', period_enum, nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('spent', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('utilization', sa.Numeric(10, 4), nullable=False, server_default='0'),
+        sa.Column('level', sa.String(20), nullable=False, server_default='NONE'),
+        sa.Column('approaching_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('exceeded_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.UniqueConstraint('budget_id', name='uq_alert_state_budget'),
+    )
+    op.create_index('ix_alert_state_user_id', 'alert_state', ['user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alert_state_user_id', table_name='alert_state')
+    op.drop_table('alert_state')
@@ -0,0 +1,74 @@
+"""add_transaction_change_versions
+
+Revision ID: d8e9f0a1b2c3
+Revises: c7d8e9f0a1b2
+Create Date: 2026-10-19
+
+Adds:
+- transactions.change_version + ix_transactions_user_change_version
+- change_versions table (per-user change counter)
+- transaction_tombstones table (deleted transaction ids for incremental sync)
+
+Existing transactions are numbered 1..n per user in creation order and each
+user's counter starts at their n.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = 'd8e9f0a1b2c3'
+down_revision = 'c7d8e9f0a1b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'transactions',
+        sa.Column('change_version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        UPDATE transactions t
+        SET change_version = s.rn
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY user_id ORDER BY created_at, id) AS rn
+            FROM transactions
+        ) s
+        WHERE t.id = s.id
+    """)
+    op.create_index(
+        'ix_transactions_user_change_version', 'transactions', ['user_id', 'change_version']
+    )
+
+    op.create_table(
+        'change_versions',
+        sa.Column('user_id', UUID(as_uuid=True),
+                  sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        INSERT INTO change_versions (user_id, version)
+        SELECT user_id, max(change_version) FROM transactions GROUP BY user_id
+    """)
+
+    op.create_table(
+        'transaction_tombstones',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True,
+                  server_default=sa.text('gen_random_uuid()')),
+        sa.Column('user_id', UUID(as_uuid=True),
+                  sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('transaction_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('change_version', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+    op.create_index(
+        'ix_transaction_tombstones_user_version', 'transaction_tombstones', ['user_id', 'change_version']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transaction_tombstones_user_version', table_name='transaction_tombstones')
+    op.drop_table('transaction_tombstones')
+    op.drop_table('change_versions')
+    op.drop_index('ix_transactions_user_change_version', table_name='transactions')
+    op.drop_column('transactions', 'change_version')
@@ -0,0 +1,32 @@
+"""add_fx_daily_rates
+
+Revision ID: e9f0a1b2c3d4
+Revises: d8e9f0a1b2c3
+Create Date: 2026-10-19
+
+Adds:
+- fx_daily_rates table (currency, rate_date) -> units per 1 USD
+
+Empty on creation; fill it with `python -m scripts.load_fx_history <snapshot>`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e9f0a1b2c3d4'
+down_revision = 'd8e9f0a1b2c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fx_daily_rates',
+        sa.Column('currency', sa.String(3), nullable=False),
+        sa.Column('rate_date', sa.Date(), nullable=False),
+        sa.Column('rate', sa.Numeric(18, 8), nullable=False),
+        sa.PrimaryKeyConstraint('currency', 'rate_date'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('fx_daily_rates')
@@ -0,0 +1,34 @@
+"""add_ephemeral_entries
+
+Revision ID: f0a1b2c3d4e5
+Revises: e9f0a1b2c3d4
+Create Date: 2026-10-19
+
+Adds:
+- ephemeral_entries table: key -> JSON value / counter with an expiry,
+  the cross-process backend of services/ephemeral
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f0a1b2c3d4e5'
+down_revision = 'e9f0a1b2c3d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ephemeral_entries',
+        sa.Column('key', sa.String(255), nullable=False),
+        sa.Column('value', sa.Text(), nullable=True),
+        sa.Column('counter', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index('ix_ephemeral_entries_expires_at', 'ephemeral_entries', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ephemeral_entries_expires_at', table_name='ephemeral_entries')
+    op.drop_table('ephemeral_entries')
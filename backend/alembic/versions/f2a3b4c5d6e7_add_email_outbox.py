@@ -0,0 +1,39 @@
+"""add_email_outbox
+
+Revision ID: f2a3b4c5d6e7
+Revises: f0a1b2c3d4e5
+Create Date: 2026-10-19
+
+Adds:
+- email_outbox table: queued outbound email for the services/mailer worker
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f2a3b4c5d6e7'
+down_revision = 'f0a1b2c3d4e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('to_address', sa.String(255), nullable=False),
+        sa.Column('subject', sa.String(255), nullable=False),
+        sa.Column('html', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='PENDING'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_email_outbox_due', 'email_outbox', ['status', 'next_attempt_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_email_outbox_due', table_name='email_outbox')
+    op.drop_table('email_outbox')
@@ -0,0 +1,25 @@
+"""add_import_job_next_row
+
+Revision ID: f3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-19
+
+Adds:
+- import_jobs.next_row: first data row not yet committed, so a reclaimed job
+  resumes instead of starting over
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f3b4c5d6e7f8'
+down_revision = 'f2a3b4c5d6e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('import_jobs', sa.Column('next_row', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('import_jobs', 'next_row')
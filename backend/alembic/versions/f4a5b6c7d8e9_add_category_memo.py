@@ -0,0 +1,36 @@
+"""add_category_memo
+
+Revision ID: f4a5b6c7d8e9
+Revises: e3f4a5b6c7d8
+Create Date: 2026-10-19
+
+Adds:
+- category_memo table (shared normalized-description → category cache for imports)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM as PgEnum, UUID
+
+revision = 'f4a5b6c7d8e9'
+down_revision = 'e3f4a5b6c7d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    category_enum = PgEnum(name='categoryenum', create_type=False)
+    op.create_table(
+        'category_memo',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True,
+                  server_default=sa.text('gen_random_uuid()')),
+        sa.Column('key', sa.String(500), nullable=False),
+        sa.Column('category', category_enum, nullable=False),
+        sa.Column('description', sa.String(200), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint('key', name='uq_category_memo_key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('category_memo')
@@ -0,0 +1,25 @@
+"""add_email_outbox_expires_at
+
+Revision ID: f4c5d6e7f8a9
+Revises: f3b4c5d6e7f8
+Create Date: 2026-10-19
+
+Adds:
+- email_outbox.expires_at: time after which an undelivered message is dropped
+  (OTP emails are useless once the code has expired)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f4c5d6e7f8a9'
+down_revision = 'f3b4c5d6e7f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('email_outbox', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('email_outbox', 'expires_at')
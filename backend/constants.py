@@ -151,6 +151,23 @@ POPULAR_STUDENT_CURRENCIES = [
 ]
 
 
+# ==================== FALLBACK EXCHANGE RATES ====================
+
+# Static fallback rates vs USD — used ONLY when EXCHANGE_RATE_API_KEY is not set or the API call fails.
+# These are NOT auto-updated. With a valid API key, live rates are fetched and cached in the DB instead.
+FALLBACK_RATES = {
+    "USD": 1.0, "EUR": 0.92, "GBP": 0.79, "JPY": 149.5, "CNY": 7.24,
+    "INR": 83.1, "CAD": 1.36, "AUD": 1.53, "CHF": 0.90, "SEK": 10.42,
+    "NZD": 1.63, "SGD": 1.34, "HKD": 7.82, "NOK": 10.55, "KRW": 1325.0,
+    "MXN": 17.15, "BRL": 4.97, "ZAR": 18.63, "TRY": 32.15, "PLN": 3.98,
+    "DKK": 6.89, "THB": 35.1, "IDR": 15700.0, "MYR": 4.72, "PHP": 56.5,
+    "CZK": 23.2, "HUF": 357.0, "ILS": 3.66, "AED": 3.67, "SAR": 3.75,
+    "EGP": 30.9, "PKR": 278.0, "BDT": 110.0, "VND": 24500.0, "NGN": 1550.0,
+    "KES": 130.0, "ARS": 870.0, "COP": 3900.0, "PEN": 3.72, "QAR": 3.64,
+    "KWD": 0.308,
+}
+
+
 # ==================== INCOME & SCHOLARSHIP FREQUENCY DISPLAY ====================
 
 INCOME_FREQUENCY_DISPLAY = {
@@ -2,13 +2,14 @@
 AI Financial Planner - FastAPI Backend
 Main application entry point
 """
+import asyncio
 import os
 import sys
 import threading
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
@@ -24,6 +25,9 @@ from routers import jobs
 from routers import goals
 from routers import faq
 from routers import chat
+from routers import changes
+from routers import dashboard
+from services import bulkhead, fx_prefetch, mailer
 
 # ---------------------------------------------------------------------------
 # Load the Chronos-2 model once at startup (background thread so the server
@@ -43,9 +47,23 @@ def _load_ml_model_bg() -> None:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    bulkhead.configure_db_threads()
     t = threading.Thread(target=_load_ml_model_bg, daemon=True)
     t.start()
+    prefetch = None
+    if exchange_rates._api_configured() and os.getenv("FX_PREFETCH_ENABLED", "1") == "1":
+        prefetch = asyncio.create_task(fx_prefetch.run())
+    imports = asyncio.create_task(import_transactions.run_reclaimer())
+    outbox = None
+    if mailer.configured() and os.getenv("MAILER_ENABLED", "1") == "1":
+        outbox = asyncio.create_task(mailer.run())
     yield
+    imports.cancel()
+    if prefetch is not None:
+        prefetch.cancel()
+    if outbox is not None:
+        outbox.cancel()
+        await asyncio.gather(outbox, return_exceptions=True)  # lets it close SMTP connections
 
 
 app = FastAPI(
@@ -55,7 +73,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    # Sync endpoints past the DB threadpool's queue get a fast 503
+    dependencies=[Depends(bulkhead.admit_db)],
 )
 
 # CORS middleware
@@ -83,6 +103,8 @@ app.include_router(jobs.router)
 app.include_router(goals.router)
 app.include_router(faq.router)
 app.include_router(chat.router)
+app.include_router(changes.router)
+app.include_router(dashboard.router)
 
 # Serve uploaded files (avatars, etc.)
 _uploads_dir = Path(__file__).parent / "uploads"
@@ -102,3 +124,8 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+@app.get("/api/v1/health/pools")
+async def pool_health():
+    """Bulkhead pool load: running, queued, rejected and queue wait per workload class"""
+    return bulkhead.stats()
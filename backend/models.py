@@ -9,6 +9,7 @@ from typing import Optional
 
 from sqlalchemy import (
     Column,
+    BigInteger,
     String,
     Numeric,
     Boolean,
@@ -377,6 +378,12 @@ class Transaction(Base):
     receipt_url: Optional[str] = Column(String(500), nullable=True)
     notes: Optional[str] = Column(Text, nullable=True)
 
+    # Duplicate detection — sha256 of normalized (date, amount, currency, description)
+    fingerprint: Optional[str] = Column(String(64), nullable=True)
+
+    # Per-user change version of the last insert/update (see ChangeVersion)
+    change_version: int = Column(BigInteger, nullable=False, default=0, server_default="0")
+
     # Timestamps
     created_at: datetime = Column(DateTime(timezone=True), server_default=func.now())
     updated_at: Optional[datetime] = Column(DateTime(timezone=True), onupdate=func.now())
@@ -388,6 +395,8 @@ class Transaction(Base):
         Index("ix_transactions_date", "transaction_date"),
         Index("ix_transactions_user_date", "user_id", "transaction_date"),
         Index("ix_transactions_category", "category"),
+        Index("ix_transactions_user_fingerprint", "user_id", "fingerprint"),
+        Index("ix_transactions_user_change_version", "user_id", "change_version"),
     )
 
     def __repr__(self) -> str:
@@ -397,6 +406,46 @@ class Transaction(Base):
         )
 
 
+class ChangeVersion(Base):
+    """
+    Per-user monotonically increasing change counter for incremental sync.
+
+    Every transaction insert, update and delete takes the next value(s) in the
+    same database transaction; the row lock on this counter orders concurrent
+    writers, so versions become visible in increasing order.
+    """
+    __tablename__ = "change_versions"
+
+    user_id: UUID = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version: int = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<ChangeVersion(user={self.user_id}, version={self.version})>"
+
+
+class TransactionTombstone(Base):
+    """Records a deleted transaction so incremental sync can remove it client-side."""
+    __tablename__ = "transaction_tombstones"
+
+    id: UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: UUID = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    transaction_id: UUID = Column(UUID(as_uuid=True), nullable=False)
+    change_version: int = Column(BigInteger, nullable=False)
+    deleted_at: datetime = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_transaction_tombstones_user_version", "user_id", "change_version"),
+    )
+
+
 # ==================== BUDGETS ====================
 
 class Budget(Base):
@@ -446,6 +495,57 @@ class Budget(Base):
         )
 
 
+class AlertLevelEnum(str, enum.Enum):
+    NONE = "NONE"
+    APPROACHING_LIMIT = "APPROACHING_LIMIT"  # >= 80% of the limit
+    BUDGET_EXCEEDED = "BUDGET_EXCEEDED"      # >= 100% of the limit
+
+
+class AlertState(Base):
+    """
+    Materialized budget alert state — one row per active budget.
+
+    Transaction writes move `spent` by their expense delta in the same
+    database transaction; budget writes and period roll-over re-evaluate it.
+    GET /alerts is a single indexed read. The *_at columns record when the current period first
+    crossed each threshold.
+    """
+    __tablename__ = "alert_state"
+
+    id: UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: UUID = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    budget_id: UUID = Column(
+        UUID(as_uuid=True),
+        ForeignKey("budgets.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    category: CategoryEnum = Column(Enum(CategoryEnum), nullable=False)
+    period: BudgetPeriodEnum = Column(Enum(BudgetPeriodEnum), nullable=False)
+    period_start: date = Column(Date, nullable=False)
+
+    spent: float = Column(Numeric(12, 2), nullable=False, default=0)  # in the budget's currency
+    utilization: float = Column(Numeric(10, 4), nullable=False, default=0)
+    level: AlertLevelEnum = Column(
+        Enum(AlertLevelEnum, native_enum=False), nullable=False, default=AlertLevelEnum.NONE
+    )
+    approaching_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+    exceeded_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    updated_at: Optional[datetime] = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("budget_id", name="uq_alert_state_budget"),
+        Index("ix_alert_state_user_id", "user_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AlertState(budget={self.budget_id}, level={self.level}, utilization={self.utilization})>"
+
+
 # ==================== FORECAST CONTEXT ====================
 
 class ForecastContext(Base):
@@ -531,6 +631,177 @@ class ExchangeRateCache(Base):
         )
 
 
+class FxDailyRate(Base):
+    """
+    Historical daily exchange rates, quoted as units of `currency` per 1 USD.
+
+    Loaded from a local CSV/JSON snapshot (scripts/load_fx_history.py) and
+    extended by every USD rate refresh. services/fx_history serves it from
+    memory for date-aware conversion to USD.
+    """
+    __tablename__ = "fx_daily_rates"
+
+    currency: str = Column(String(3), primary_key=True)
+    rate_date: date = Column(Date, primary_key=True)
+    rate: float = Column(Numeric(18, 8), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<FxDailyRate({self.currency} {self.rate_date} @ {self.rate})>"
+
+
+# ==================== EPHEMERAL STATE ====================
+
+class EphemeralEntry(Base):
+    """
+    Short-lived key/value state shared by every API process: pending OTP
+    registrations, rate-limit counters.
+
+    Accessed only through services/ephemeral; rows past `expires_at` are
+    ignored on read and swept periodically.
+    """
+    __tablename__ = "ephemeral_entries"
+
+    key: str = Column(String(255), primary_key=True)
+    value: Optional[str] = Column(Text, nullable=True)        # JSON document
+    counter: int = Column(Integer, nullable=False, default=0)  # for incr()
+    expires_at: datetime = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_ephemeral_entries_expires_at", "expires_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<EphemeralEntry({self.key} until {self.expires_at})>"
+
+
+# ==================== EMAIL OUTBOX ====================
+
+class EmailStatusEnum(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"  # gave up after MAILER_MAX_ATTEMPTS
+    EXPIRED = "expired"  # not delivered before expires_at; no longer worth sending
+
+
+class EmailOutbox(Base):
+    """
+    Outbound email, queued by request handlers and delivered by the
+    services/mailer worker over a reused SMTP connection.
+
+    A worker leases a row by pushing `next_attempt_at` forward before sending,
+    so a crashed send is retried once the lease runs out. `expires_at` bounds
+    retries for time-limited content such as OTP codes.
+    """
+    __tablename__ = "email_outbox"
+
+    id: UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    to_address: str = Column(String(255), nullable=False)
+    subject: str = Column(String(255), nullable=False)
+    html: str = Column(Text, nullable=False)
+    status: EmailStatusEnum = Column(
+        Enum(EmailStatusEnum, native_enum=False), nullable=False, default=EmailStatusEnum.PENDING
+    )
+    attempts: int = Column(Integer, nullable=False, default=0)
+    next_attempt_at: datetime = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error: Optional[str] = Column(Text, nullable=True)
+    expires_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+    created_at: datetime = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_due", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox({self.to_address} {self.status} x{self.attempts})>"
+
+
+# ==================== CATEGORY MEMO ====================
+
+class CategoryMemo(Base):
+    """
+    Shared normalized-description → category memo for import categorization.
+
+    Filled from LLM classifications and consulted before any LLM call, so a
+    merchant like "STARBUCKS #1234" is classified once for every user.
+    """
+    __tablename__ = "category_memo"
+
+    id: UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    key: str = Column(String(500), nullable=False)  # normalized description (+ label)
+    category: CategoryEnum = Column(Enum(CategoryEnum), nullable=False)
+    description: Optional[str] = Column(String(200), nullable=True)  # clean label suggested by the LLM
+
+    created_at: datetime = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Optional[datetime] = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("key", name="uq_category_memo_key"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<CategoryMemo({self.key!r} -> {self.category})>"
+
+
+# ==================== IMPORT JOBS ====================
+
+class ImportJobStatusEnum(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(Base):
+    """
+    A background transaction import started by /import/confirm.
+
+    The worker commits one chunk at a time and bumps the row counters as it
+    goes, so the status endpoint can report progress while the import runs.
+    `next_row` is committed with each chunk; a job reclaimed after a crash or
+    restart resumes from there.
+    """
+    __tablename__ = "import_jobs"
+
+    id: UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: UUID = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    upload_id: str = Column(String(64), nullable=False)  # staged upload being imported
+    filename: Optional[str] = Column(String(255), nullable=True)
+    options: str = Column(Text, nullable=False)  # JSON: column mapping + defaults
+    status: ImportJobStatusEnum = Column(
+        Enum(ImportJobStatusEnum, native_enum=False), nullable=False, default=ImportJobStatusEnum.QUEUED
+    )
+
+    total_rows: Optional[int] = Column(Integer, nullable=True)  # estimate, for a progress bar
+    rows_parsed: int = Column(Integer, nullable=False, default=0)
+    rows_categorized: int = Column(Integer, nullable=False, default=0)
+    rows_inserted: int = Column(Integer, nullable=False, default=0)
+    rows_skipped: int = Column(Integer, nullable=False, default=0)
+    rows_duplicate: int = Column(Integer, nullable=False, default=0)
+    next_row: int = Column(Integer, nullable=False, default=0)  # first data row not yet committed
+    errors: Optional[str] = Column(Text, nullable=True)  # JSON list, first 20 row errors
+    error_message: Optional[str] = Column(Text, nullable=True)  # why the job failed
+    date_min: Optional[date] = Column(Date, nullable=True)
+    date_max: Optional[date] = Column(Date, nullable=True)
+
+    created_at: datetime = Column(DateTime(timezone=True), server_default=func.now())
+    started_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+    updated_at: Optional[datetime] = Column(DateTime(timezone=True), onupdate=func.now())  # worker heartbeat
+    finished_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_import_jobs_user_id", "user_id"),
+        Index("ix_import_jobs_status", "status"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ImportJob(id={self.id}, user={self.user_id}, status={self.status})>"
+
+
 # ==================== JOBS ====================
 
 class JobTypeEnum(str, enum.Enum):
@@ -1,7 +1,7 @@
 """
 Alerts router — computed in-app notifications from budget utilization.
 GET /api/v1/alerts  returns alerts for budgets at ≥80% or ≥100% spend.
-No writes needed: alerts are derived on-the-fly from live budget data.
+Reads the materialized alert_state rows, which transaction and budget writes keep current.
 """
 from __future__ import annotations
 from fastapi import APIRouter, Depends
@@ -9,8 +9,8 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from routers.auth import get_current_user
-from routers.budgets import _enrich
-from models import Budget
+from models import AlertLevelEnum
+from services import alert_state
 
 router = APIRouter(prefix="/api/v1/alerts", tags=["alerts"])
 
@@ -20,33 +20,28 @@ def list_alerts(
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> list[dict]:
-    """Return computed alerts for budgets approaching or exceeding their limit."""
-    budgets = (
-        db.query(Budget)
-        .filter(Budget.user_id == current_user.id, Budget.is_active == True)
-        .all()
-    )
+    """Return alerts for budgets approaching or exceeding their limit."""
     alerts = []
-    for b in budgets:
-        enriched = _enrich(b, db)
-        if enriched.utilization >= 1.0:
-            alerts.append({
-                "budget_id": str(b.id),
-                "category": b.category.value,
-                "type": "BUDGET_EXCEEDED",
-                "message": f"{b.category.value.replace('_', ' ').title()} budget exceeded — {round(enriched.utilization * 100)}% used",
-                "utilization": enriched.utilization,
-                "period": b.period.value,
-            })
-        elif enriched.utilization >= 0.8:
-            alerts.append({
-                "budget_id": str(b.id),
-                "category": b.category.value,
-                "type": "APPROACHING_LIMIT",
-                "message": f"{b.category.value.replace('_', ' ').title()} budget at {round(enriched.utilization * 100)}% — approaching limit",
-                "utilization": enriched.utilization,
-                "period": b.period.value,
-            })
+    for state in alert_state.current(db, current_user.id):
+        if state.level == AlertLevelEnum.NONE:
+            continue
+        utilization = float(state.utilization)
+        label = state.category.value.replace('_', ' ').title()
+        if state.level == AlertLevelEnum.BUDGET_EXCEEDED:
+            message = f"{label} budget exceeded — {round(utilization * 100)}% used"
+            first_crossed_at = state.exceeded_at
+        else:
+            message = f"{label} budget at {round(utilization * 100)}% — approaching limit"
+            first_crossed_at = state.approaching_at
+        alerts.append({
+            "budget_id": str(state.budget_id),
+            "category": state.category.value,
+            "type": state.level.value,
+            "message": message,
+            "utilization": utilization,
+            "period": state.period.value,
+            "first_crossed_at": first_crossed_at.isoformat() if first_crossed_at else None,
+        })
     # Most severe first
     alerts.sort(key=lambda a: a["utilization"], reverse=True)
     return alerts
@@ -6,21 +6,19 @@ from __future__ import annotations
 import os
 import uuid
 import secrets
-import smtplib
-import threading
 from datetime import datetime, timezone, timedelta
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from typing import Any
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from jose import jwt
-from passlib.context import CryptContext
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_async_db, get_db
 from models import User, UserSession
+from services import auth_cache, google_tokens, mailer, passwords
+from services.ephemeral import store as ephemeral
 from schemas import (
     GoogleAuthRequest,
     AuthResponse,
@@ -36,31 +34,100 @@ router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
 # ==================== AUTH DEPENDENCY ====================
 
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db),
-) -> User:
-    """Extract and verify the Bearer JWT; return the corresponding User row."""
+def _bearer_token(request: Request) -> str:
     auth_header = request.headers.get("Authorization", "")
     if not auth_header.startswith("Bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    token = auth_header.split(" ", 1)[1]
+    return auth_header.split(" ", 1)[1]
+
+
+def _decode_token(token: str) -> tuple[uuid.UUID, str]:
+    """Verify the JWT signature and expiry; return (user_id, jti)."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub", "")
-        jti: str = payload.get("jti", "")
+        return uuid.UUID(payload.get("sub", "")), payload.get("jti", "")
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
-    # Check revocation
-    if jti:
-        session = db.query(UserSession).filter(UserSession.jti == jti).first()
-        if session and session.is_revoked:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
-    db_user = db.query(User).filter(User.id == user_id).first()
+
+
+def _revoked_error() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+
+
+def _check_user(db_user: User | None) -> User:
     if not db_user or not db_user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
     return db_user
 
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db),
+) -> User:
+    """Extract and verify the Bearer JWT; return the corresponding User row."""
+    return user_from_token(_bearer_token(request), db)
+
+
+async def get_current_user_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """`get_current_user` for async endpoints; the User belongs to the request's AsyncSession."""
+    return await user_from_token_async(_bearer_token(request), db)
+
+
+def user_from_token(token: str, db: Session) -> User:
+    """
+    Verify a raw JWT (not revoked, user active) and return its User.
+    Served from services.auth_cache when warm — the result is a detached
+    snapshot, so load the row in `db` before modifying it.
+    """
+    user_id, jti = _decode_token(token)
+    if auth_cache.revocation_sync_due():
+        started = datetime.now(timezone.utc)
+        auth_cache.apply_revocations(db.execute(auth_cache.revocations_query()).all(), started)
+    if jti and not _token_ok(jti):
+        if db.scalar(select(UserSession.is_revoked).where(UserSession.jti == jti)):
+            auth_cache.revoke(jti)
+            raise _revoked_error()
+        auth_cache.mark_verified(jti)
+    user = auth_cache.get_user(user_id)
+    if user is not None and auth_cache.user_check_due(user_id):
+        # Deactivated or deleted on another worker since it was cached?
+        if not db.scalar(select(User.is_active).where(User.id == user_id)):
+            auth_cache.invalidate_user(user_id)
+            user = None
+    if user is None:
+        user = auth_cache.put_user(_check_user(db.get(User, user_id)))
+    return _check_user(user)
+
+
+async def user_from_token_async(token: str, db: AsyncSession) -> User:
+    user_id, jti = _decode_token(token)
+    if auth_cache.revocation_sync_due():
+        started = datetime.now(timezone.utc)
+        auth_cache.apply_revocations((await db.execute(auth_cache.revocations_query())).all(), started)
+    if jti and not _token_ok(jti):
+        if await db.scalar(select(UserSession.is_revoked).where(UserSession.jti == jti)):
+            auth_cache.revoke(jti)
+            raise _revoked_error()
+        auth_cache.mark_verified(jti)
+    user = auth_cache.get_user(user_id)
+    if user is not None and auth_cache.user_check_due(user_id):
+        if not await db.scalar(select(User.is_active).where(User.id == user_id)):
+            auth_cache.invalidate_user(user_id)
+            user = None
+    if user is None:
+        user = auth_cache.put_user(_check_user(await db.get(User, user_id)))
+    return _check_user(user)
+
+
+def _token_ok(jti: str) -> bool:
+    """True if the jti was verified recently; raises if it is known to be revoked."""
+    if auth_cache.is_revoked(jti):
+        raise _revoked_error()
+    return auth_cache.is_verified(jti)
+
 # ==================== CONFIGURATION ====================
 
 SECRET_KEY: str = os.getenv("SECRET_KEY", "")
@@ -68,36 +135,28 @@ GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
 ALGORITHM: str = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
 OTP_EXPIRE_MINUTES: int = 5
+OTP_MAX_ATTEMPTS: int = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+REGISTER_LIMIT_PER_HOUR: int = int(os.getenv("REGISTER_LIMIT_PER_HOUR", "5"))        # OTP emails per address
+SIGNIN_LIMIT_PER_15_MIN: int = int(os.getenv("SIGNIN_LIMIT_PER_15_MIN", "10"))       # sign-in attempts per address
 
-SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
-SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
-SMTP_USER: str = os.getenv("SMTP_USER", "")
-SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
-SMTP_FROM_NAME: str = os.getenv("SMTP_FROM_NAME", "Spendemic")
 DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
 
-_SMTP_PLACEHOLDER = {"", "your-gmail@gmail.com", "your-app-password"}
-
-def _smtp_configured() -> bool:
-    return SMTP_USER not in _SMTP_PLACEHOLDER and SMTP_PASSWORD not in _SMTP_PLACEHOLDER
-
-GOOGLE_TOKENINFO_URL: str = "https://oauth2.googleapis.com/tokeninfo"
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# In-memory OTP store:  email -> { code, expires_at, name, password_hash }
-_otp_store: dict[str, dict] = {}
-_otp_lock = threading.Lock()
+# Pending registrations live in the shared ephemeral store so /register/verify
+# can land on any worker:  "otp:<email>" -> { code, expires_at, name, password_hash }
+# Entries outlive the code by a grace period so late attempts get a 410, not a 400.
+_OTP_GRACE_SECONDS = 600
 
 
 # ==================== HELPERS ====================
 
-def _hash_password(plain: str) -> str:
-    return pwd_context.hash(plain)
-
-
-def _verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+async def _throttle(key: str, limit: int, window_seconds: int, detail: str) -> None:
+    """Count a hit on `key` in the shared store; 429 once `limit` is exceeded within the window."""
+    if await ephemeral.aincr(f"rate:{key}", window_seconds) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(window_seconds)},
+        )
 
 
 def _create_access_token(payload: dict[str, Any]) -> tuple[str, str, datetime]:
@@ -110,8 +169,8 @@ def _create_access_token(payload: dict[str, Any]) -> tuple[str, str, datetime]:
     return token, jti, expires_at
 
 
-def _record_session(db: Session, user_id: Any, jti: str, issued_at: datetime,
-                    expires_at: datetime, request: Request) -> None:
+async def _record_session(db: AsyncSession, user_id: Any, jti: str, issued_at: datetime,
+                          expires_at: datetime, request: Request) -> None:
     session = UserSession(
         user_id=user_id,
         jti=jti,
@@ -122,17 +181,11 @@ def _record_session(db: Session, user_id: Any, jti: str, issued_at: datetime,
         ip_address=request.client.host if request.client else None,
     )
     db.add(session)
-    db.commit()
-
+    await db.commit()
 
-def _send_otp_email(to_email: str, name: str, code: str) -> None:
-    """Send OTP verification email via SMTP. Falls back to terminal log in DEBUG mode."""
-    if not _smtp_configured():
-        if DEBUG:
-            print(f"\n{'='*50}\n[DEV] OTP for {to_email}: {code}\n{'='*50}\n", flush=True)
-            return
-        raise RuntimeError("SMTP credentials not configured in .env")
 
+def _otp_email(name: str, code: str) -> tuple[str, str]:
+    """(subject, html) of the OTP verification email."""
     html = f"""
     <div style="font-family:Arial,sans-serif;max-width:480px;margin:0 auto;">
       <div style="background:#6b1a2a;padding:24px;border-radius:12px 12px 0 0;text-align:center;">
@@ -156,55 +209,31 @@ def _send_otp_email(to_email: str, name: str, code: str) -> None:
     </div>
     """
 
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = f"{code} — Your Spendemic verification code"
-    msg["From"] = f"{SMTP_FROM_NAME} <{SMTP_USER}>"
-    msg["To"] = to_email
-    msg.attach(MIMEText(html, "html"))
-
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.sendmail(SMTP_USER, to_email, msg.as_string())
+    return f"{code} — Your Spendemic verification code", html
 
 
 async def _verify_google_token(credential: str) -> dict[str, Any]:
+    """Verify a Google ID token locally against Google's cached signing keys."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                GOOGLE_TOKENINFO_URL,
-                params={"id_token": credential},
-                timeout=10.0,
-            )
-    except httpx.RequestError as exc:
+        return await google_tokens.verify(credential, audience=GOOGLE_CLIENT_ID)
+    except google_tokens.KeysUnavailable as exc:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Could not reach Google token verification service: {exc}",
+            detail=f"Could not load Google signing keys: {exc}",
         )
-
-    if response.status_code != 200:
+    except google_tokens.InvalidToken as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid Google credential — token rejected by Google",
+            detail=f"Invalid Google credential — {exc}",
         )
 
-    token_info: dict[str, Any] = response.json()
-
-    if GOOGLE_CLIENT_ID and token_info.get("aud") != GOOGLE_CLIENT_ID:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Google token audience mismatch",
-        )
 
-    return token_info
-
-
-def _upsert_user(db: Session, token_info: dict[str, Any]) -> User:
+async def _upsert_user(db: AsyncSession, token_info: dict[str, Any]) -> User:
     email: str = token_info["email"]
     name: str = token_info.get("name", email)
     now = datetime.now(timezone.utc)
 
-    db_user: User | None = db.query(User).filter(User.email == email).first()
+    db_user: User | None = await db.scalar(select(User).where(User.email == email))
 
     if db_user is None:
         db_user = User(
@@ -221,8 +250,9 @@ def _upsert_user(db: Session, token_info: dict[str, Any]) -> User:
         if name:
             db_user.name = name
 
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    auth_cache.invalidate_user(db_user.id)
     return db_user
 
 
@@ -232,17 +262,17 @@ def _upsert_user(db: Session, token_info: dict[str, Any]) -> User:
 async def google_auth(
     body: GoogleAuthRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> AuthResponse:
     """Exchange a Google ID token for a Spendemic JWT."""
     token_info = await _verify_google_token(body.credential)
-    db_user = _upsert_user(db, token_info)
+    db_user = await _upsert_user(db, token_info)
 
     now = datetime.now(timezone.utc)
     access_token, jti, expires_at = _create_access_token(
         payload={"sub": str(db_user.id), "email": db_user.email}
     )
-    _record_session(db, db_user.id, jti, now, expires_at, request)
+    await _record_session(db, db_user.id, jti, now, expires_at, request)
 
     return AuthResponse(
         access_token=access_token,
@@ -252,40 +282,48 @@ async def google_auth(
 
 
 @router.post("/register/request", response_model=OTPSentResponse, status_code=202)
-async def register_request(body: RegisterRequest, db: Session = Depends(get_db)) -> OTPSentResponse:
+async def register_request(body: RegisterRequest, db: AsyncSession = Depends(get_async_db)) -> OTPSentResponse:
     """
     Step 1 — validate signup details and send a 6-digit OTP to the email.
     The user is NOT created yet; creation happens after OTP verification.
     """
     # Check if email already taken
-    existing = db.query(User).filter(User.email == body.email).first()
+    existing = await db.scalar(select(User.id).where(User.email == body.email))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="An account with this email already exists. Please sign in.",
         )
 
+    await _throttle(
+        f"register:{body.email}", REGISTER_LIMIT_PER_HOUR, 3600,
+        "Too many verification codes requested for this email. Please try again later.",
+    )
+
     # Generate OTP and store pending registration
     code = f"{secrets.randbelow(1_000_000):06d}"
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=OTP_EXPIRE_MINUTES)
-
-    with _otp_lock:
-        _otp_store[body.email] = {
-            "code": code,
-            "expires_at": expires_at,
-            "name": body.name,
-            "password_hash": _hash_password(body.password),
-        }
-
-    # Send email — raises 503 if SMTP not configured
-    try:
-        _send_otp_email(body.email, body.name, code)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
-    except Exception as exc:
+    password_hash = await passwords.hash_async(body.password)
+
+    await ephemeral.aset(f"otp:{body.email}", {
+        "code": code,
+        "expires_at": expires_at.isoformat(),
+        "name": body.name,
+        "password_hash": password_hash,
+    }, OTP_EXPIRE_MINUTES * 60 + _OTP_GRACE_SECONDS)
+    await ephemeral.apop(f"otp-attempts:{body.email}")
+
+    # Queue the email for the mailer worker; without SMTP, DEBUG prints the code instead
+    if mailer.configured():
+        mailer.enqueue(db, body.email, *_otp_email(body.name, code), expires_at=expires_at)
+        await db.commit()
+        mailer.wake()
+    elif DEBUG:
+        print(f"\n{'='*50}\n[DEV] OTP for {body.email}: {code}\n{'='*50}\n", flush=True)
+    else:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Failed to send verification email: {exc}",
+            detail="SMTP credentials not configured in .env",
         )
 
     return OTPSentResponse(
@@ -298,14 +336,13 @@ async def register_request(body: RegisterRequest, db: Session = Depends(get_db))
 async def register_verify(
     body: VerifyOTPRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> AuthResponse:
     """
     Step 2 — verify the OTP and create the user account.
     Issues a JWT on success so the user is immediately signed in.
     """
-    with _otp_lock:
-        pending = _otp_store.get(body.email)
+    pending = await ephemeral.aget(f"otp:{body.email}")
 
     if not pending:
         raise HTTPException(
@@ -313,26 +350,35 @@ async def register_verify(
             detail="No pending registration found for this email. Please request a new code.",
         )
 
-    if datetime.now(timezone.utc) > pending["expires_at"]:
-        with _otp_lock:
-            _otp_store.pop(body.email, None)
+    if datetime.now(timezone.utc) > datetime.fromisoformat(pending["expires_at"]):
+        await ephemeral.apop(f"otp:{body.email}")
         raise HTTPException(
             status_code=status.HTTP_410_GONE,
             detail="Verification code has expired. Please sign up again.",
         )
 
-    if body.otp_code != pending["code"]:
+    if not secrets.compare_digest(body.otp_code, pending["code"]):
+        attempts = await ephemeral.aincr(f"otp-attempts:{body.email}", OTP_EXPIRE_MINUTES * 60)
+        if attempts >= OTP_MAX_ATTEMPTS:
+            await ephemeral.apop(f"otp:{body.email}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many incorrect codes. Please sign up again.",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect verification code. Please try again.",
         )
 
-    # OTP valid — create the user
-    with _otp_lock:
-        _otp_store.pop(body.email, None)
+    # OTP valid — claim it; a concurrent verify on another worker may have won
+    if await ephemeral.apop(f"otp:{body.email}") is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No pending registration found for this email. Please request a new code.",
+        )
 
     # Guard against duplicate (race condition)
-    if db.query(User).filter(User.email == body.email).first():
+    if await db.scalar(select(User.id).where(User.email == body.email)):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="An account with this email already exists.",
@@ -348,13 +394,13 @@ async def register_verify(
         is_active=True,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     access_token, jti, expires_at = _create_access_token(
         payload={"sub": str(new_user.id), "email": new_user.email}
     )
-    _record_session(db, new_user.id, jti, now, expires_at, request)
+    await _record_session(db, new_user.id, jti, now, expires_at, request)
 
     return AuthResponse(
         access_token=access_token,
@@ -367,10 +413,14 @@ async def register_verify(
 async def signin(
     body: SignInRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> AuthResponse:
     """Authenticate with email and password."""
-    db_user: User | None = db.query(User).filter(User.email == body.email).first()
+    await _throttle(
+        f"signin:{body.email}", SIGNIN_LIMIT_PER_15_MIN, 900,
+        "Too many sign-in attempts. Please try again later.",
+    )
+    db_user: User | None = await db.scalar(select(User).where(User.email == body.email))
 
     if not db_user or not db_user.password_hash:
         raise HTTPException(
@@ -378,7 +428,8 @@ async def signin(
             detail="Invalid email or password.",
         )
 
-    if not _verify_password(body.password, db_user.password_hash):
+    password_ok, rehashed = await passwords.verify_async(body.password, db_user.password_hash)
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password.",
@@ -392,13 +443,15 @@ async def signin(
 
     now = datetime.now(timezone.utc)
     db_user.last_login = now
-    db.commit()
-    db.refresh(db_user)
+    if rehashed:
+        db_user.password_hash = rehashed  # stored with an outdated BCRYPT_ROUNDS
+    await db.commit()
+    await db.refresh(db_user)
 
     access_token, jti, expires_at = _create_access_token(
         payload={"sub": str(db_user.id), "email": db_user.email}
     )
-    _record_session(db, db_user.id, jti, now, expires_at, request)
+    await _record_session(db, db_user.id, jti, now, expires_at, request)
 
     return AuthResponse(
         access_token=access_token,
@@ -410,20 +463,16 @@ async def signin(
 @router.post("/logout", status_code=200)
 async def logout(
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ) -> None:
     """Revoke the current JWT so it cannot be reused after logout."""
-    auth_header = request.headers.get("Authorization", "")
-    token = auth_header.split(" ", 1)[1] if " " in auth_header else ""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        jti: str = payload.get("jti", "")
-        if jti:
-            session = db.query(UserSession).filter(UserSession.jti == jti).first()
-            if session:
-                session.is_revoked = True
-                session.revoked_at = datetime.now(timezone.utc)
-                db.commit()
-    except Exception:
-        pass
\ No newline at end of file
+    _, jti = _decode_token(_bearer_token(request))
+    if jti:
+        await db.execute(
+            update(UserSession)
+            .where(UserSession.jti == jti)
+            .values(is_revoked=True, revoked_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+        auth_cache.revoke(jti)
\ No newline at end of file
@@ -3,8 +3,6 @@ Budgets router — CRUD + spend tracking per category.
 All endpoints require a valid JWT (Bearer token).
 """
 from __future__ import annotations
-import csv
-import io
 from datetime import date
 from decimal import Decimal
 from typing import Optional
@@ -12,12 +10,12 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func, extract
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import Budget, Transaction, TransactionTypeEnum, CategoryEnum, BudgetPeriodEnum
+from models import Budget, CurrencyEnum
 from routers.auth import get_current_user
+from services import alert_state, budget_engine, change_feed, export, fx
 from schemas import BudgetCreate, BudgetUpdate, BudgetResponse
 
 router = APIRouter(prefix="/api/v1/budgets", tags=["budgets"])
@@ -30,37 +28,22 @@ def _get_budget_or_404(budget_id: UUID, user_id: UUID, db: Session) -> Budget:
     return b
 
 
-def _compute_spend(budget: Budget, db: Session) -> Decimal:
-    """Sum expenses in this budget's category for the current period."""
-    today = date.today()
-    q = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == budget.user_id,
-        Transaction.category == budget.category,
-        Transaction.type == TransactionTypeEnum.EXPENSE,
-    )
-    if budget.period == BudgetPeriodEnum.MONTHLY:
-        q = q.filter(
-            extract("year", Transaction.transaction_date) == today.year,
-            extract("month", Transaction.transaction_date) == today.month,
-        )
-    else:  # WEEKLY — last 7 days
-        from datetime import timedelta
-        week_start = today - timedelta(days=today.weekday())
-        q = q.filter(Transaction.transaction_date >= week_start)
-    total = q.scalar()
-    return Decimal(str(total)) if total else Decimal("0")
-
-
-def _enrich(budget: Budget, db: Session) -> BudgetResponse:
-    spent = _compute_spend(budget, db)
-    limit = Decimal(str(budget.limit_amount))
-    utilization = float(spent / limit) if limit > 0 else 0.0
+def _enrich(budget: Budget, spent: Decimal, convert: Optional[fx.Converter] = None) -> BudgetResponse:
     r = BudgetResponse.model_validate(budget)
     r.spent = spent
-    r.utilization = round(utilization, 4)
+    r.utilization = budget_engine.utilization(spent, budget.limit_amount)
+    if convert is not None:
+        r.display_currency = convert.target
+        r.display_limit_amount = fx.money(convert(budget.limit_amount, budget.currency))
+        r.display_spent = fx.money(convert(spent, budget.currency))
     return r
 
 
+def _evaluate_one(budget: Budget, db: Session) -> BudgetResponse:
+    [(b, spent)] = budget_engine.evaluate(db, budget.user_id, budget_id=budget.id)
+    return _enrich(b, spent)
+
+
 # ──────────────────────────────────────────────
 # Endpoints
 # ──────────────────────────────────────────────
@@ -87,32 +70,82 @@ def create_budget(
     b = Budget(user_id=current_user.id, **body.model_dump())
     db.add(b)
     db.commit()
+    alert_state.refresh(db, current_user.id)
     db.refresh(b)
-    return _enrich(b, db)
+    change_feed.publish(current_user.id, "budgets", "created", id=str(b.id))
+    return _evaluate_one(b, db)
 
 
 @router.get("", response_model=list[BudgetResponse])
 def list_budgets(
     active_only: bool = Query(True),
+    currency: Optional[CurrencyEnum] = Query(None, description="Also return limit and spend in this currency"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> list[BudgetResponse]:
-    """List all budgets for the current user with live spend data."""
-    q = db.query(Budget).filter(Budget.user_id == current_user.id)
-    if active_only:
-        q = q.filter(Budget.is_active == True)
-    budgets = q.order_by(Budget.category).all()
-    return [_enrich(b, db) for b in budgets]
+    """List all budgets for the current user with live spend data (one query)."""
+    convert = fx.Converter(currency.value, db) if currency else None
+    return [
+        _enrich(b, spent, convert)
+        for b, spent in budget_engine.evaluate(db, current_user.id, active_only=active_only)
+    ]
+
+
+_EXPORT_COLUMNS = ["category", "limit_amount", "currency", "period", "start_date", "end_date",
+                   "is_active", "spent", "utilization_pct"]
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_budgets_csv(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Download all budgets with current spend as CSV (default) or Parquet."""
+    evaluated = budget_engine.evaluate(db, current_user.id)
+
+    def to_record(item: tuple[Budget, Decimal]) -> list:
+        b, spent = item
+        return [
+            b.category.value,
+            float(b.limit_amount),
+            b.currency.value,
+            b.period.value,
+            b.start_date.isoformat(),
+            b.end_date.isoformat() if b.end_date else "",
+            b.is_active,
+            float(spent),
+            round(budget_engine.utilization(spent, b.limit_amount) * 100, 1),
+        ]
+
+    if format == "parquet":
+        import pyarrow as pa
+        types = [pa.string(), pa.float64(), pa.string(), pa.string(), pa.string(), pa.string(),
+                 pa.bool_(), pa.float64(), pa.float64()]
+        body = export.stream_parquet(list(zip(_EXPORT_COLUMNS, types)), evaluated, to_record)
+    else:
+        body = export.stream_csv(_EXPORT_COLUMNS, evaluated, to_record)
+
+    filename = f"budgets_{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 
 @router.get("/{budget_id}", response_model=BudgetResponse)
 def get_budget(
     budget_id: UUID,
+    currency: Optional[CurrencyEnum] = Query(None, description="Also return limit and spend in this currency"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> BudgetResponse:
-    b = _get_budget_or_404(budget_id, current_user.id, db)
-    return _enrich(b, db)
+    evaluated = budget_engine.evaluate(db, current_user.id, budget_id=budget_id)
+    if not evaluated:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    convert = fx.Converter(currency.value, db) if currency else None
+    return _enrich(*evaluated[0], convert)
 
 
 @router.put("/{budget_id}", response_model=BudgetResponse)
@@ -126,8 +159,10 @@ def update_budget(
     for field, value in body.model_dump(exclude_unset=True).items():
         setattr(b, field, value)
     db.commit()
+    alert_state.refresh(db, current_user.id)
     db.refresh(b)
-    return _enrich(b, db)
+    change_feed.publish(current_user.id, "budgets", "updated", id=str(b.id))
+    return _evaluate_one(b, db)
 
 
 @router.delete("/{budget_id}", status_code=200)
@@ -139,40 +174,5 @@ def delete_budget(
     b = _get_budget_or_404(budget_id, current_user.id, db)
     db.delete(b)
     db.commit()
-
-
-@router.get("/export", response_class=StreamingResponse)
-def export_budgets_csv(
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    """Download all budgets as a CSV file."""
-    budgets = (
-        db.query(Budget)
-        .filter(Budget.user_id == current_user.id)
-        .order_by(Budget.category)
-        .all()
-    )
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["category", "limit_amount", "currency", "period", "start_date", "end_date", "is_active", "spent", "utilization_pct"])
-    for b in budgets:
-        enriched = _enrich(b, db)
-        writer.writerow([
-            b.category.value,
-            float(b.limit_amount),
-            b.currency.value,
-            b.period.value,
-            b.start_date.isoformat(),
-            b.end_date.isoformat() if b.end_date else "",
-            b.is_active,
-            float(enriched.spent) if enriched.spent else 0.0,
-            round((enriched.utilization or 0.0) * 100, 1),
-        ])
-    output.seek(0)
-    filename = f"budgets_{date.today().isoformat()}.csv"
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
\ No newline at end of file
+    alert_state.refresh(db, current_user.id)
+    change_feed.publish(current_user.id, "budgets", "deleted", id=str(budget_id))
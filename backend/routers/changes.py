@@ -0,0 +1,88 @@
+"""
+Change feed router — Server-Sent Events.
+
+GET /api/v1/changes/stream  → per-user stream of change events
+    event: change
+    data: {"topic": "transactions", "action": "created", "ts": ..., ...}
+
+Browsers' EventSource cannot set headers, so the JWT may also be passed as
+?token=. The token is checked on a short-lived session when the stream opens,
+and again before every event and heartbeat: expiry and the in-process
+revocation set each time, the full check (which runs the revocation sync) when
+that sync is due.
+A token that fails gets `event: unauthorized` and the stream closes. The open
+stream holds no database connection.
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from jose import jwt
+
+from database import SessionLocal
+from routers.auth import user_from_token
+from services import auth_cache, change_feed
+
+router = APIRouter(prefix="/api/v1/changes", tags=["changes"])
+
+_HEARTBEAT_SECONDS = 15.0
+
+
+def _authenticate(token: str):
+    with SessionLocal() as db:
+        return user_from_token(token, db).id
+
+
+async def _still_valid(token: str, jti: str, exp: float) -> bool:
+    if time.time() >= exp or (jti and auth_cache.is_revoked(jti)):
+        return False
+    if auth_cache.revocation_sync_due():
+        try:
+            await run_in_threadpool(_authenticate, token)
+        except HTTPException:
+            return False
+    return True
+
+
+@router.get("/stream")
+async def change_stream(
+    request: Request,
+    token: Optional[str] = Query(None),
+):
+    """Stream change events for the current user until the client disconnects."""
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        token = auth_header.split(" ", 1)[1]
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    user_id = await run_in_threadpool(_authenticate, token)
+    claims = jwt.get_unverified_claims(token)  # signature checked just above
+    jti, exp = claims.get("jti", ""), float(claims.get("exp", 0))
+
+    sub = change_feed.subscribe(user_id)
+
+    async def events():
+        try:
+            yield f"event: ready\ndata: {json.dumps({'topics': list(change_feed.TOPICS)})}\n\n"
+            while not await request.is_disconnected():
+                event = await sub.get(timeout=_HEARTBEAT_SECONDS)
+                if not await _still_valid(token, jti, exp):
+                    yield "event: unauthorized\ndata: {}\n\n"
+                    return
+                if event is None:
+                    yield ": ping\n\n"  # keeps proxies from closing an idle stream
+                else:
+                    yield f"event: change\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            change_feed.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -5,11 +5,13 @@ from datetime import date
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from database import get_db
 from models import Budget, Transaction, TransactionTypeEnum, Job
 from routers.auth import get_current_user
+from services import bulkhead
 from schemas import ChatRequest, ChatResponse
 
 router = APIRouter(prefix="/api/v1/chat", tags=["chat"])
@@ -139,7 +141,7 @@ def _strip_action_block(text: str) -> str:
 
 
 @router.post("", response_model=ChatResponse)
-def chat(
+async def chat(
     body: ChatRequest,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -151,7 +153,7 @@ def chat(
             detail="Chat is unavailable: ANTHROPIC_API_KEY not configured.",
         )
 
-    system_prompt = _build_system_prompt(current_user, db)
+    system_prompt = await run_in_threadpool(_build_system_prompt, current_user, db)
 
     messages = []
     for h in body.history[-10:]:
@@ -159,13 +161,16 @@ def chat(
     messages.append({"role": "user", "content": body.message})
 
     try:
-        resp = client.messages.create(
+        resp = await bulkhead.LLM.run(
+            client.messages.create,
             model="claude-haiku-4-5-20251001",
             system=system_prompt,
             messages=messages,
             max_tokens=600,
         )
         reply_text = resp.content[0].text if resp.content else ""
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"Anthropic error: {exc}")
 
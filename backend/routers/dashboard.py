@@ -0,0 +1,154 @@
+"""
+Dashboard router — everything the financial-health tab needs in one response.
+
+GET /api/v1/dashboard
+    month        current month totals + by-category breakdown
+    cashflow     6-month income / expense series (oldest first)
+    budgets      active budgets with live spend and utilization
+    job_income   estimated monthly income from active jobs
+    net_savings  month-to-date income minus expenses
+
+Money values are in the user's working currency (study-country currency,
+or ?currency=) except budget amounts, which stay in each budget's currency.
+Jobs have no currency column; hourly rates are entered as USD ($/hr in the
+app), so job income is converted from USD like any other USD amount.
+Due recurring occurrences are generated first (as GET /transactions does), so
+the totals include them. After that, four queries in total: transactions grouped
+by month/type/category/currency, budgets (via the budget engine), jobs, and the
+rate cache.
+"""
+from __future__ import annotations
+
+from calendar import monthrange
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from dateutil.relativedelta import relativedelta
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import case, extract, func
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import CurrencyEnum, Job, Transaction, TransactionTypeEnum
+from routers.auth import get_current_user
+from routers.transactions import _materialize_recurring
+from services import budget_engine, fx
+
+router = APIRouter(prefix="/api/v1/dashboard", tags=["dashboard"])
+
+_CASHFLOW_MONTHS = 6
+_WEEKS_PER_MONTH = Decimal(52) / Decimal(12)
+
+
+@router.get("")
+def get_dashboard(
+    currency: Optional[CurrencyEnum] = Query(None, description="Defaults to the user's study-country currency"),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> dict:
+    today = date.today()
+    _materialize_recurring(current_user.id, today, db)
+    target = fx.working_currency(current_user, currency.value if currency else None)
+    convert = fx.Converter(target, db)
+
+    month_start = today.replace(day=1)
+    month_end = date(today.year, today.month, monthrange(today.year, today.month)[1])
+    window_start = month_start - relativedelta(months=_CASHFLOW_MONTHS - 1)
+
+    # One grouped pass over the whole 6-month window
+    year_col = extract("year", Transaction.transaction_date)
+    month_col = extract("month", Transaction.transaction_date)
+    is_future = case((Transaction.transaction_date > today, True), else_=False)
+    rows = (
+        db.query(
+            year_col.label("year"),
+            month_col.label("month"),
+            Transaction.type,
+            Transaction.category,
+            Transaction.currency,
+            is_future.label("is_future"),
+            func.sum(Transaction.amount).label("total"),
+        )
+        .filter(
+            Transaction.user_id == current_user.id,
+            Transaction.transaction_date >= window_start,
+            Transaction.transaction_date <= month_end,
+        )
+        .group_by(year_col, month_col, Transaction.type, Transaction.category, Transaction.currency, is_future)
+        .all()
+    )
+
+    series: dict[tuple[int, int], dict[str, Decimal]] = {}
+    for i in range(_CASHFLOW_MONTHS):
+        d = window_start + relativedelta(months=i)
+        series[(d.year, d.month)] = {"income": Decimal("0"), "expenses": Decimal("0")}
+    by_category: dict[str, Decimal] = {}
+    month_income = month_expenses = Decimal("0")
+    mtd_income = mtd_expenses = Decimal("0")
+
+    for r in rows:
+        amount = convert(r.total, r.currency)
+        key = "income" if r.type == TransactionTypeEnum.INCOME else "expenses"
+        series[(int(r.year), int(r.month))][key] += amount
+        if (int(r.year), int(r.month)) != (today.year, today.month):
+            continue
+        by_category[r.category.value] = by_category.get(r.category.value, Decimal("0")) + amount
+        if r.type == TransactionTypeEnum.INCOME:
+            month_income += amount
+            mtd_income += 0 if r.is_future else amount
+        else:
+            month_expenses += amount
+            mtd_expenses += 0 if r.is_future else amount
+
+    budgets = [
+        {
+            "id": str(b.id),
+            "category": b.category.value,
+            "currency": b.currency.value,
+            "period": b.period.value,
+            "limit_amount": str(b.limit_amount),
+            "spent": str(spent),
+            "utilization": budget_engine.utilization(spent, b.limit_amount),
+        }
+        for b, spent in budget_engine.evaluate(db, current_user.id, active_only=True)
+    ]
+
+    job_count, weekly_pay = (
+        db.query(func.count(Job.id), func.sum(Job.hourly_rate * Job.hours_per_week))
+        .filter(Job.user_id == current_user.id, Job.is_active == True)
+        .one()
+    )
+
+    return {
+        "currency": target,
+        "month": {
+            "period_start": month_start.isoformat(),
+            "period_end": month_end.isoformat(),
+            "total_income": float(fx.money(month_income)),
+            "total_expenses": float(fx.money(month_expenses)),
+            "net": float(fx.money(month_income - month_expenses)),
+            "by_category": {k: float(fx.money(v)) for k, v in by_category.items()},
+        },
+        "cashflow": [
+            {
+                "year": y,
+                "month": m,
+                "income": float(fx.money(v["income"])),
+                "expenses": float(fx.money(v["expenses"])),
+            }
+            for (y, m), v in series.items()
+        ],
+        "budgets": budgets,
+        "job_income": {
+            "active_jobs": job_count,
+            "total_monthly_income": float(fx.money(
+                convert(Decimal(str(weekly_pay or 0)) * _WEEKS_PER_MONTH, CurrencyEnum.USD)
+            )),
+        },
+        "net_savings": {
+            "net_savings": float(fx.money(mtd_income - mtd_expenses)),
+            "month_income": float(fx.money(mtd_income)),
+            "month_expenses": float(fx.money(mtd_expenses)),
+        },
+    }
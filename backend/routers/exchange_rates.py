@@ -1,18 +1,32 @@
 """
 Exchange rate router.
 GET /api/v1/exchange-rates/{base} — returns rates for a base currency,
-fetched from ExchangeRate-API and cached in DB for 1 hour.
+fetched from ExchangeRate-API and cached in DB for 1 hour, with an
+in-process copy (L1) in front of the DB so hot-path lookups skip the query.
+services/fx_prefetch refreshes rates in the background ahead of expiry;
+requests themselves never wait on the API, and after a failed fetch they
+don't trigger another for that base until FX_FAILURE_TTL_SECONDS pass.
+Only CurrencyEnum codes are accepted as a base.
+GET /api/v1/exchange-rates/status — cache staleness per base currency.
 Falls back to a minimal hardcoded table when no API key is configured.
 """
+import asyncio
 import os
+import time
+import uuid
 from datetime import datetime, timezone, timedelta
+from typing import NamedTuple, Optional
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException  # Depends kept for db injection
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
-from models import ExchangeRateCache
+from constants import FALLBACK_RATES
+from database import SessionLocal, get_async_db
+from models import CurrencyEnum, ExchangeRateCache
 
 router = APIRouter(prefix="/api/v1/exchange-rates", tags=["exchange-rates"])
 
@@ -20,20 +34,6 @@ _API_KEY = os.getenv("EXCHANGE_RATE_API_KEY", "")
 _PLACEHOLDER = {"", "your_api_key_here"}
 _CACHE_TTL = timedelta(hours=1)
 
-# Static fallback rates vs USD — used ONLY when EXCHANGE_RATE_API_KEY is not set or the API call fails.
-# These are NOT auto-updated. With a valid API key, live rates are fetched and cached in the DB instead.
-_FALLBACK_RATES: dict[str, float] = {
-    "USD": 1.0, "EUR": 0.92, "GBP": 0.79, "JPY": 149.5, "CNY": 7.24,
-    "INR": 83.1, "CAD": 1.36, "AUD": 1.53, "CHF": 0.90, "SEK": 10.42,
-    "NZD": 1.63, "SGD": 1.34, "HKD": 7.82, "NOK": 10.55, "KRW": 1325.0,
-    "MXN": 17.15, "BRL": 4.97, "ZAR": 18.63, "TRY": 32.15, "PLN": 3.98,
-    "DKK": 6.89, "THB": 35.1, "IDR": 15700.0, "MYR": 4.72, "PHP": 56.5,
-    "CZK": 23.2, "HUF": 357.0, "ILS": 3.66, "AED": 3.67, "SAR": 3.75,
-    "EGP": 30.9, "PKR": 278.0, "BDT": 110.0, "VND": 24500.0, "NGN": 1550.0,
-    "KES": 130.0, "ARS": 870.0, "COP": 3900.0, "PEN": 3.72, "QAR": 3.64,
-    "KWD": 0.308,
-}
-
 
 def _api_configured() -> bool:
     return _API_KEY not in _PLACEHOLDER
@@ -41,80 +41,228 @@ def _api_configured() -> bool:
 
 def _convert_fallback(base: str, target: str) -> float:
     """Cross-rate via USD when API is unavailable."""
-    base_usd = _FALLBACK_RATES.get(base.upper(), 1.0)
-    target_usd = _FALLBACK_RATES.get(target.upper(), 1.0)
+    base_usd = FALLBACK_RATES.get(base.upper(), 1.0)
+    target_usd = FALLBACK_RATES.get(target.upper(), 1.0)
     return target_usd / base_usd
 
 
-async def get_rates(base: str, db: Session) -> dict[str, float]:
+class _Entry(NamedTuple):
+    rates: dict[str, float]
+    fetched_at: datetime  # when the rates came from the API (oldest row)
+    loaded_at: float      # time.monotonic() when this process loaded them
+
+
+# L1: per-process copy of the DB cache, one entry per base currency.
+# Entries are replaced wholesale, never mutated, so readers need no lock.
+_l1: dict[str, _Entry] = {}
+_L1_TTL = float(os.getenv("FX_L1_TTL_SECONDS", "300"))
+
+# One refresh per base currency at a time; other requests wait for its result
+_refresh_locks: dict[str, asyncio.Lock] = {}
+
+# Negative cache: after a failed fetch, requests don't trigger another one
+# for `base` until time.monotonic() passes this (the prefetcher keeps its own
+# backoff and still retries)
+_failed_until: dict[str, float] = {}
+_FAILURE_TTL = float(os.getenv("FX_FAILURE_TTL_SECONDS", "60"))
+
+
+def _aware(ts: datetime) -> datetime:
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _l1_get(base: str) -> Optional[_Entry]:
+    entry = _l1.get(base)
+    if entry and time.monotonic() - entry.loaded_at < _L1_TTL:
+        return entry
+    return None
+
+
+def _select_cached(base: str):
+    return select(
+        ExchangeRateCache.to_currency, ExchangeRateCache.rate, ExchangeRateCache.fetched_at
+    ).where(ExchangeRateCache.from_currency == base)
+
+
+def _load(base: str, db: Session) -> Optional[_Entry]:
+    """Read every cached rate for `base` from the DB into L1 (one SELECT)."""
+    return _install(base, db.execute(_select_cached(base)).all())
+
+
+async def _load_async(base: str, db: AsyncSession) -> Optional[_Entry]:
+    return _install(base, (await db.execute(_select_cached(base))).all())
+
+
+def _install(base: str, rows) -> Optional[_Entry]:
+    if not rows:
+        return None
+    entry = _Entry(
+        rates={r.to_currency: float(r.rate) for r in rows},
+        fetched_at=min(_aware(r.fetched_at) for r in rows),
+        loaded_at=time.monotonic(),
+    )
+    _l1[base] = entry
+    return entry
+
+
+def _cached(base: str, db: Session) -> Optional[_Entry]:
+    return _l1_get(base) or _load(base, db)
+
+
+def _store(base: str, rates: dict[str, float], db: Session, now: datetime) -> None:
+    """Upsert all rates for `base` in one statement and refresh L1."""
+    table = ExchangeRateCache.__table__
+    values = [
+        {"id": uuid.uuid4(), "from_currency": base, "to_currency": cur, "rate": rate, "fetched_at": now}
+        for cur, rate in rates.items()
+    ]
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    stmt = upsert(table).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.from_currency, table.c.to_currency],
+        set_={"rate": stmt.excluded.rate, "fetched_at": stmt.excluded.fetched_at},
+    )
+    db.execute(stmt)
+    if base == "USD":
+        # Today's USD rates also extend the historical daily table
+        from services import fx_history
+        fx_history.record(db, now.date(), rates)
+    db.commit()
+    _l1[base] = _Entry(rates=dict(rates), fetched_at=now, loaded_at=time.monotonic())
+
+
+async def _fetch(base: str) -> Optional[dict[str, float]]:
+    """Latest rates for `base` from ExchangeRate-API, or None on any failure."""
+    try:
+        async with httpx.AsyncClient(timeout=8.0) as client:
+            resp = await client.get(
+                f"https://v6.exchangerate-api.com/v6/{_API_KEY}/latest/{base}"
+            )
+        data = resp.json()
+        if data.get("result") == "success":
+            return data["conversion_rates"]
+    except Exception as exc:
+        print(f"[fx] fetch failed for {base}: {exc}", flush=True)
+    return None
+
+
+def _store_new_session(base: str, rates: dict[str, float], now: datetime) -> None:
+    with SessionLocal() as db:
+        _store(base, rates, db, now)
+
+
+def _load_new_session(base: str) -> Optional[_Entry]:
+    with SessionLocal() as db:
+        return _load(base, db)
+
+
+def age(base: str) -> Optional[float]:
+    """
+    Seconds since `base` rates were fetched upstream, per the DB row this
+    process last read (refresh re-reads it), or None if nothing is cached.
+    """
+    entry = _l1.get(base.upper())
+    if entry is None:
+        return None
+    return (datetime.now(timezone.utc) - entry.fetched_at).total_seconds()
+
+
+async def refresh(base: str, max_age: timedelta = _CACHE_TTL) -> Optional[dict[str, float]]:
+    """
+    Fetch and store rates for `base` unless the DB already holds a copy younger
+    than `max_age` (another worker may have refreshed it). Single-flight per
+    base: concurrent callers wait for the refresh in progress and get its
+    result. Returns None if the fetch failed.
+    """
+    base = base.upper()
+    lock = _refresh_locks.setdefault(base, asyncio.Lock())
+    async with lock:
+        # Judge freshness from the shared DB row, not this process's L1 copy
+        entry = await run_in_threadpool(_load_new_session, base)
+        if entry and entry.fetched_at >= datetime.now(timezone.utc) - max_age:
+            return entry.rates
+        rates = await _fetch(base)
+        if rates:
+            _failed_until.pop(base, None)
+            await run_in_threadpool(_store_new_session, base, rates, datetime.now(timezone.utc))
+        else:
+            _failed_until[base] = time.monotonic() + _FAILURE_TTL
+        return rates
+
+
+_background: set[asyncio.Task] = set()
+
+
+def _refresh_in_background(base: str) -> None:
+    lock = _refresh_locks.get(base)
+    if lock is not None and lock.locked():
+        return  # already refreshing
+    if time.monotonic() < _failed_until.get(base, 0.0):
+        return  # failed recently
+    task = asyncio.get_running_loop().create_task(refresh(base))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def get_rates(base: str, db: AsyncSession) -> dict[str, float]:
     """
     Return a dict of {currency: rate} where each rate converts 1 base unit.
-    Checks DB cache first; fetches from API if stale / missing.
+    Serves from the in-process L1 cache, then the DB cache. Never waits on the
+    API: stale or missing rates trigger a background refresh and the request
+    gets the stale copy (or the fallback table) meanwhile.
     Falls back to hardcoded rates when API key not configured.
     """
     base = base.upper()
-    now = datetime.now(timezone.utc)
-    cutoff = now - _CACHE_TTL
-
-    # Try cached rows
-    cached = (
-        db.query(ExchangeRateCache)
-        .filter(
-            ExchangeRateCache.from_currency == base,
-            ExchangeRateCache.fetched_at >= cutoff,
-        )
-        .all()
-    )
-    if cached:
-        return {r.to_currency: float(r.rate) for r in cached}
+    cutoff = datetime.now(timezone.utc) - _CACHE_TTL
+
+    entry = _l1_get(base) or await _load_async(base, db)
+    if entry and entry.fetched_at >= cutoff:
+        return entry.rates
 
-    # Fetch from API
     if _api_configured():
-        try:
-            async with httpx.AsyncClient(timeout=8.0) as client:
-                resp = await client.get(
-                    f"https://v6.exchangerate-api.com/v6/{_API_KEY}/latest/{base}"
-                )
-            data = resp.json()
-            if data.get("result") == "success":
-                rates: dict[str, float] = data["conversion_rates"]
-                # Upsert into cache
-                for to_cur, rate in rates.items():
-                    existing = (
-                        db.query(ExchangeRateCache)
-                        .filter(
-                            ExchangeRateCache.from_currency == base,
-                            ExchangeRateCache.to_currency == to_cur,
-                        )
-                        .first()
-                    )
-                    if existing:
-                        existing.rate = rate
-                        existing.fetched_at = now
-                    else:
-                        db.add(ExchangeRateCache(
-                            from_currency=base,
-                            to_currency=to_cur,
-                            rate=rate,
-                            fetched_at=now,
-                        ))
-                db.commit()
-                return rates
-        except Exception:
-            pass  # Fall through to fallback
+        _refresh_in_background(base)
+        if entry:
+            return entry.rates  # stale beats the static table
 
     # Offline fallback
-    return {cur: _convert_fallback(base, cur) for cur in _FALLBACK_RATES}
+    return {cur: _convert_fallback(base, cur) for cur in FALLBACK_RATES}
+
+
+def cached_rates(base: str, db: Session) -> dict[str, float]:
+    """
+    Synchronous, network-free rates for aggregate endpoints: the most recent
+    cached API rates for `base` (however old), with the fallback table filling
+    any currency the cache lacks.
+    """
+    base = base.upper()
+    rates = {cur: _convert_fallback(base, cur) for cur in FALLBACK_RATES}
+    entry = _cached(base, db)
+    if entry:
+        rates.update(entry.rates)
+    rates[base] = 1.0
+    return rates
+
+
+@router.get("/status")
+async def rate_status() -> dict:
+    """Cache staleness per tracked base currency, as seen by the prefetcher."""
+    from services import fx_prefetch
+    return fx_prefetch.staleness()
 
 
 @router.get("/{base_currency}")
 async def exchange_rates(
     base_currency: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
     base = base_currency.upper()
-    if len(base) != 3:
-        raise HTTPException(status_code=400, detail="Currency must be a 3-letter code")
+    try:
+        CurrencyEnum(base)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unsupported currency: {base}")
     rates = await get_rates(base, db)
     return {
         "base": base,
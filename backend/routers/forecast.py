@@ -30,6 +30,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import Transaction, ForecastContext, TransactionTypeEnum, User
 from routers.auth import get_current_user
+from services import bulkhead
 from schemas import ForecastRequest, ForecastResponse
 
 _ML_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "ml_models"))
@@ -51,7 +52,7 @@ router = APIRouter(prefix="/api/v1/forecast", tags=["forecast"])
 # ---------------------------------------------------------------------------
 
 @router.post("", response_model=ForecastResponse)
-def run_forecast_inline(
+async def run_forecast_inline(
     body: ForecastRequest,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -71,9 +72,40 @@ def run_forecast_inline(
     }
     ```
     """
+    return await bulkhead.CPU.run(_forecast_inline, body, current_user.id, db)
+
+
+@router.get("")
+async def run_forecast(
+    prediction_months: int = Query(default=3, ge=1, le=12),
+    prediction_weeks: int = Query(default=8, ge=1, le=52),
+    granularity: Literal["weekly", "monthly"] = Query(default="weekly"),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Run forecast using pre-saved ForecastContext rows. Default granularity is weekly."""
+    if granularity == "weekly":
+        return await bulkhead.CPU.run(_run_from_db_weekly, current_user.id, prediction_weeks, db)
+    return await bulkhead.CPU.run(_run_from_db, current_user.id, prediction_months, db)
+
+
+@router.get("/to-graduation")
+async def forecast_to_graduation(
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Forecast through the user's graduation date (set in Settings)."""
+    return await bulkhead.CPU.run(_forecast_to_graduation, current_user.id, db)
+
+
+# ---------------------------------------------------------------------------
+# Endpoint bodies — run on the CPU bulkhead (DB reads + model inference)
+# ---------------------------------------------------------------------------
+
+def _forecast_inline(body: ForecastRequest, user_id, db: Session) -> dict:
     ordered = sorted(body.months, key=lambda m: (m.year, m.month))
     prediction_months = len(ordered)
-    history, monthly_labels = _query_history(current_user.id, db, limit=body.history_months)
+    history, monthly_labels = _query_history(user_id, db, limit=body.history_months)
     cold_start = False
 
     future_covariates = []
@@ -119,34 +151,15 @@ def run_forecast_inline(
     return _execute(history, monthly_labels, future_covariates, next_months, prediction_months, cold_start)
 
 
-@router.get("")
-def run_forecast(
-    prediction_months: int = Query(default=3, ge=1, le=12),
-    prediction_weeks: int = Query(default=8, ge=1, le=52),
-    granularity: Literal["weekly", "monthly"] = Query(default="weekly"),
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> dict:
-    """Run forecast using pre-saved ForecastContext rows. Default granularity is weekly."""
-    if granularity == "weekly":
-        return _run_from_db_weekly(current_user.id, prediction_weeks, db)
-    return _run_from_db(current_user.id, prediction_months, db)
-
-
-@router.get("/to-graduation")
-def forecast_to_graduation(
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> dict:
-    """Forecast through the user's graduation date (set in Settings)."""
-    user: User = db.query(User).filter(User.id == current_user.id).first()
+def _forecast_to_graduation(user_id, db: Session) -> dict:
+    user: User = db.query(User).filter(User.id == user_id).first()
     if not user or not user.graduation_date:
         raise HTTPException(status_code=422, detail="Set your graduation date in Settings to enable this.")
     today = date.today()
     if user.graduation_date <= today:
         raise HTTPException(status_code=422, detail="Graduation date is in the past.")
     months_left = (user.graduation_date.year - today.year) * 12 + (user.graduation_date.month - today.month) + 1
-    return _run_from_db(current_user.id, max(1, min(months_left, 60)), db, graduation_date=user.graduation_date)
+    return _run_from_db(user_id, max(1, min(months_left, 60)), db, graduation_date=user.graduation_date)
 
 
 # ---------------------------------------------------------------------------
@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import ForecastContext
 from routers.auth import get_current_user
+from services import change_feed
 from schemas import ForecastContextUpsert, ForecastContextResponse, ForecastContextBulkCopy
 
 router = APIRouter(prefix="/api/v1/forecast-context", tags=["forecast-context"])
@@ -45,6 +46,7 @@ def delete_all_contexts(
         .delete(synchronize_session=False)
     )
     db.commit()
+    change_feed.publish(current_user.id, "forecast_context", "deleted", count=deleted)
     return {"deleted": deleted}
 
 
@@ -77,6 +79,7 @@ def upsert_context(
     _apply_body(row, body)
     db.commit()
     db.refresh(row)
+    change_feed.publish(current_user.id, "forecast_context", "updated", year=year, month=month)
     return row
 
 
@@ -133,6 +136,7 @@ def bulk_copy(
     db.commit()
     for r in results:
         db.refresh(r)
+    change_feed.publish(current_user.id, "forecast_context", "updated", count=len(results))
     return results
 
 
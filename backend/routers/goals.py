@@ -1,12 +1,14 @@
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import uuid
 
 from database import get_db
-from models import Goal, Transaction, TransactionTypeEnum
+from models import CurrencyEnum, Goal, Transaction, TransactionTypeEnum
 from routers.auth import get_current_user
+from services import change_feed, fx
 from schemas import GoalCreate, GoalUpdate, GoalResponse, GoalFundRequest, NetSavingsResponse
 
 router = APIRouter(prefix="/api/v1/goals", tags=["goals"])
@@ -26,27 +28,38 @@ def list_goals(
     return [_to_response(g) for g in goals]
 
 
-@router.get("/net-savings", response_model=NetSavingsResponse)
-def net_savings(
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
+def _month_to_date(user_id, target: str, db: Session) -> tuple[float, float]:
+    """(income, expenses) from the 1st of this month to today, in `target` currency."""
     today = date.today()
-    txns = (
-        db.query(Transaction)
+    rows = (
+        db.query(Transaction.type, Transaction.currency, func.sum(Transaction.amount).label("total"))
         .filter(
-            Transaction.user_id == current_user.id,
+            Transaction.user_id == user_id,
             Transaction.transaction_date >= date(today.year, today.month, 1),
             Transaction.transaction_date <= today,
         )
+        .group_by(Transaction.type, Transaction.currency)
         .all()
     )
-    income = sum(float(t.amount_in_usd or t.amount) for t in txns if t.type == TransactionTypeEnum.INCOME)
-    expenses = sum(float(t.amount_in_usd or t.amount) for t in txns if t.type == TransactionTypeEnum.EXPENSE)
+    convert = fx.Converter(target, db)
+    income = convert.total((r.currency, r.total) for r in rows if r.type == TransactionTypeEnum.INCOME)
+    expenses = convert.total((r.currency, r.total) for r in rows if r.type == TransactionTypeEnum.EXPENSE)
+    return float(income), float(expenses)
+
+
+@router.get("/net-savings", response_model=NetSavingsResponse)
+def net_savings(
+    currency: Optional[CurrencyEnum] = Query(None, description="Defaults to the user's study-country currency"),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    target = fx.working_currency(current_user, currency.value if currency else None)
+    income, expenses = _month_to_date(current_user.id, target, db)
     return NetSavingsResponse(
         net_savings=round(income - expenses, 2),
         month_income=round(income, 2),
         month_expenses=round(expenses, 2),
+        currency=target,
     )
 
 
@@ -69,6 +82,7 @@ def create_goal(
     db.add(goal)
     db.commit()
     db.refresh(goal)
+    change_feed.publish(current_user.id, "goals", "created", id=str(goal.id))
     return _to_response(goal)
 
 
@@ -84,6 +98,7 @@ def update_goal(
         setattr(goal, field, value)
     db.commit()
     db.refresh(goal)
+    change_feed.publish(current_user.id, "goals", "updated", id=str(goal.id))
     return _to_response(goal)
 
 
@@ -96,18 +111,8 @@ def fund_goal(
 ):
     goal = _get_goal(goal_id, current_user.id, db)
 
-    today = date.today()
-    txns = (
-        db.query(Transaction)
-        .filter(
-            Transaction.user_id == current_user.id,
-            Transaction.transaction_date >= date(today.year, today.month, 1),
-            Transaction.transaction_date <= today,
-        )
-        .all()
-    )
-    income = sum(float(t.amount_in_usd or t.amount) for t in txns if t.type == TransactionTypeEnum.INCOME)
-    expenses = sum(float(t.amount_in_usd or t.amount) for t in txns if t.type == TransactionTypeEnum.EXPENSE)
+    # Net savings in the goal's own currency, so the cap compares like with like
+    income, expenses = _month_to_date(current_user.id, str(goal.currency), db)
     net = income - expenses
 
     if net <= 0:
@@ -120,6 +125,7 @@ def fund_goal(
     goal.saved_amount = float(goal.saved_amount) + amount_to_add
     db.commit()
     db.refresh(goal)
+    change_feed.publish(current_user.id, "goals", "funded", id=str(goal.id))
     return _to_response(goal)
 
 
@@ -132,6 +138,7 @@ def delete_goal(
     goal = _get_goal(goal_id, current_user.id, db)
     goal.is_active = False
     db.commit()
+    change_feed.publish(current_user.id, "goals", "deleted", id=goal_id)
 
 
 def _get_goal(goal_id: str, user_id, db: Session) -> Goal:
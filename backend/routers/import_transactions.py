@@ -1,27 +1,41 @@
 """
 Transaction import router — Excel / CSV bulk import.
 
-POST /api/v1/transactions/import/preview  → parse file, return detected columns + 5-row preview
-POST /api/v1/transactions/import/confirm  → re-upload file with confirmed mapping, save to DB
+POST /api/v1/transactions/import/preview  → parse + stage file, return upload_id, detected columns + 5-row preview
+POST /api/v1/transactions/import/confirm  → queue an import of a staged upload_id (or re-uploaded file) with mapping
+GET  /api/v1/transactions/import/jobs/{id} → import job progress and result
+
+Jobs run on a small in-process pool and commit chunk by chunk together with
+their resume offset (`next_row`). `run_reclaimer`, started from the app
+lifespan, picks up queued jobs and jobs whose worker stopped heartbeating, so
+an import interrupted by a restart resumes where it left off.
 """
 from __future__ import annotations
 
-import io
+import asyncio
 import json
 import os
 import re
 import datetime
-from decimal import Decimal
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from typing import Iterator, Optional
+from uuid import UUID
 
 import anthropic
 import pandas as pd
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
-from models import Transaction, TransactionTypeEnum, CategoryEnum, CurrencyEnum
-from routers.auth import get_current_user
+from database import SessionLocal, get_async_db, get_db
+from models import ImportJob, ImportJobStatusEnum, TransactionTypeEnum, CategoryEnum, CurrencyEnum
+from routers.auth import get_current_user, get_current_user_async
+from services import alert_state, bulkhead, category_keywords, category_memo, change_feed, ingest, upload_store
+from services.transaction_writer import existing_fingerprints, fingerprint, write_transactions
 
 # ---------------------------------------------------------------------------
 # Lazy Anthropic client (only initialised when ANTHROPIC_API_KEY is set)
@@ -38,6 +52,8 @@ def _get_anthropic() -> anthropic.Anthropic | None:
 
 router = APIRouter(prefix="/api/v1/transactions/import", tags=["import"])
 
+_PREVIEW_ROWS = 8
+
 
 # ---------------------------------------------------------------------------
 # Column alias dictionary — maps our field names to common Excel/bank headers
@@ -61,42 +77,6 @@ _ALIASES: dict[str, list[str]] = {
                     "cr/dr", "txn type"],
 }
 
-# ---------------------------------------------------------------------------
-# Category keyword inference
-# ---------------------------------------------------------------------------
-_CATEGORY_KW: dict[str, list[str]] = {
-    "HOUSING":        ["rent", "lease", "apartment", "housing", "dorm", "landlord"],
-    "FOOD":           ["grocery", "groceries", "supermarket", "restaurant", "cafe",
-                       "coffee", "food", "dining", "meal", "doordash", "ubereats",
-                       "grubhub", "chipotle", "mcdonald", "subway", "pizza", "starbucks"],
-    "TRANSPORTATION": ["uber", "lyft", "bus", "metro", "transit", "gas", "fuel",
-                       "parking", "transport", "train", "amtrak", "rideshare"],
-    "EDUCATION":      ["tuition", "university", "college", "textbook", "book",
-                       "course", "library", "school", "exam", "registration", "chegg"],
-    "HEALTHCARE":     ["pharmacy", "doctor", "hospital", "clinic", "medical",
-                       "dental", "health", "insurance", "prescription", "cvs", "walgreens"],
-    "ENTERTAINMENT":  ["netflix", "spotify", "hulu", "youtube", "movie", "cinema",
-                       "theater", "concert", "game", "steam", "playstation", "disney"],
-    "SHOPPING":       ["amazon", "target", "walmart", "mall", "store", "shop",
-                       "clothing", "fashion", "ebay", "etsy", "best buy"],
-    "UTILITIES":      ["electric", "electricity", "water", "internet", "wifi",
-                       "phone", "mobile", "utility", "at&t", "verizon", "t-mobile", "comcast"],
-    "TRAVEL":         ["flight", "airline", "hotel", "airbnb", "travel", "trip",
-                       "vacation", "delta", "united", "american airlines", "booking.com"],
-    "SALARY":         ["salary", "payroll", "wage", "paycheck", "direct deposit"],
-    "SCHOLARSHIP":    ["scholarship", "grant", "fellowship", "financial aid"],
-    "STIPEND":        ["stipend", "ta stipend", "ra stipend", "teaching assistant",
-                       "research assistant"],
-    "FAMILY_SUPPORT": ["family", "parents", "wire transfer", "remittance", "zelle",
-                       "venmo", "transfer from"],
-    "PERSONAL_CARE":  ["gym", "fitness", "workout", "yoga", "pilates", "crossfit",
-                       "personal trainer", "swimming", "haircut", "salon", "spa",
-                       "barber", "cosmetics", "hygiene", "laundry", "detergent"],
-    "FREELANCE":      ["freelance", "gig", "contract work", "side hustle", "consulting",
-                       "commission", "client payment"],
-}
-
-
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -105,9 +85,11 @@ _CATEGORY_KW: dict[str, list[str]] = {
 async def preview_import(
     file: UploadFile = File(...),
     current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
 ) -> dict:
     """
-    Parse an Excel or CSV file and return:
+    Parse an Excel or CSV file, stage it for confirmation, and return:
+    - upload_id: reference to pass to /confirm instead of re-uploading the file
     - detected_columns: our field names mapped to the Excel headers we matched
     - undetected: fields we couldn't find (defaults will be used at confirm)
     - preview_rows: first 5 parsed rows as they would be imported
@@ -115,7 +97,47 @@ async def preview_import(
     - all_columns: every column header in the file (so UI can offer corrections)
     - warnings: data quality issues
     """
-    df = _read_file(file)
+    parsed = await bulkhead.CPU.run(_parse_preview, current_user.id, file)
+    raw_preview = parsed["raw_preview"]
+    await bulkhead.LLM.run(_apply_llm_categories, raw_preview, CategoryEnum.OTHER, db)
+    preview = [
+        {k: str(v) if isinstance(v, (datetime.date, datetime.datetime)) else v
+         for k, v in r.items() if not k.startswith('_')}
+        for r in raw_preview if r
+    ][:5]
+
+    warnings = parsed["warnings"]
+    if not preview and parsed["total_rows"] > 0:
+        warnings.append(
+            "Couldn't read any sample rows — the file may have been saved incorrectly. "
+            "Try uploading the original CSV file instead of an Excel conversion."
+        )
+
+    return {
+        "upload_id": parsed["upload_id"],
+        "filename": file.filename,
+        "total_rows": parsed["total_rows"],
+        "detected_columns": {k: v for k, v in parsed["detected"].items() if v},
+        "undetected": parsed["undetected"],
+        "preview_rows": preview,
+        "all_columns": parsed["all_columns"],
+        "warnings": warnings,
+        "date_format": "DD/MM/YYYY" if parsed["dayfirst"] else "MM/DD/YYYY",
+    }
+
+
+def _parse_preview(user_id, file: UploadFile) -> dict:
+    """Stage the upload, detect columns and parse the first rows (CPU bulkhead)."""
+    upload_id = upload_store.stage_file(user_id, file.filename or "", file.file)
+    path, filename = upload_store.load_raw(user_id, upload_id)
+    if ingest.is_large(path):
+        # Streaming mode — only the first rows are parsed; confirm reads chunk by chunk
+        df = ingest.read_head(path, filename, rows=_PREVIEW_ROWS)
+        total_rows = ingest.count_rows(path, filename)
+    else:
+        df = ingest.read_frame(path.read_bytes(), filename)
+        upload_store.save_frame(user_id, upload_id, df)
+        total_rows = len(df)
     detected = _detect_columns(list(df.columns))
     warnings: list[str] = []
 
@@ -145,35 +167,28 @@ async def preview_import(
     if dayfirst:
         warnings.append("Dates look like DD/MM/YYYY — importing with day-first format.")
 
-    raw_preview = [_parse_row(row, detected, dayfirst=dayfirst) for _, row in df.head(8).iterrows()]
-    _apply_llm_categories(raw_preview, CategoryEnum.OTHER)
-    preview = [
-        {k: str(v) if isinstance(v, (datetime.date, datetime.datetime)) else v
-         for k, v in r.items() if not k.startswith('_')}
-        for r in raw_preview if r
-    ][:5]
-
-    if not preview and len(df) > 0:
-        warnings.append(
-            "Couldn't read any sample rows — the file may have been saved incorrectly. "
-            "Try uploading the original CSV file instead of an Excel conversion."
-        )
-
+    head = df.head(_PREVIEW_ROWS)
+    hints = _infer_categories(head, detected.get("description"))
+    raw_preview = [
+        _parse_row(row, detected, dayfirst=dayfirst, inferred=hint)
+        for (_, row), hint in zip(head.iterrows(), hints)
+    ]
     return {
-        "filename": file.filename,
-        "total_rows": len(df),
-        "detected_columns": {k: v for k, v in detected.items() if v},
+        "upload_id": upload_id,
+        "total_rows": total_rows,
+        "detected": detected,
         "undetected": undetected,
-        "preview_rows": preview,
-        "all_columns": list(df.columns),
         "warnings": warnings,
-        "date_format": "DD/MM/YYYY" if dayfirst else "MM/DD/YYYY",
+        "dayfirst": dayfirst,
+        "all_columns": list(df.columns),
+        "raw_preview": raw_preview,
     }
 
 
-@router.post("/confirm")
-async def confirm_import(
-    file: UploadFile = File(...),
+@router.post("/confirm", status_code=202)
+def confirm_import(
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = Form(None),
     date_col: str = Form(...),
     amount_col: Optional[str] = Form(None),
     debit_col: Optional[str] = Form(None),
@@ -184,76 +199,334 @@ async def confirm_import(
     type_col: Optional[str] = Form(None),
     default_currency: str = Form(default="USD"),
     default_category: str = Form(default="OTHER"),
+    skip_duplicates: bool = Form(default=True),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> dict:
     """
-    Re-upload the file with the confirmed column mapping and save all valid rows.
-    Returns counts of imported / skipped rows and up to 20 per-row errors.
+    Queue an import of a staged upload (by upload_id from /preview) or a
+    re-uploaded file with the confirmed column mapping.
+
+    Returns immediately with a job id; parsing, categorisation and inserts run
+    in a background worker that commits chunk by chunk. Poll
+    GET /jobs/{job_id} for progress and the final counts.
+    Rows already stored (same date, amount, currency and description) are
+    skipped unless skip_duplicates is false, so overlapping statements — or a
+    retry of a failed job — can be re-imported safely.
+    """
+    if upload_id is None:
+        if file is None:
+            raise HTTPException(status_code=422, detail="Provide either upload_id or file.")
+        upload_id = upload_store.stage_file(current_user.id, file.filename or "", file.file)
+
+    raw = upload_store.load_raw(current_user.id, upload_id)
+    if raw is None:
+        raise HTTPException(
+            status_code=410,
+            detail="This upload has expired. Please upload the file again.",
+        )
+
+    options = {
+        "columns": {
+            "date": date_col, "amount": amount_col, "debit": debit_col,
+            "credit": credit_col, "description": description_col,
+            "category": category_col, "currency": currency_col, "type": type_col,
+        },
+        "default_currency": default_currency,
+        "default_category": default_category,
+        "skip_duplicates": skip_duplicates,
+    }
+    job = ImportJob(
+        user_id=current_user.id,
+        upload_id=upload_id,
+        filename=raw[1][:255] or None,
+        options=json.dumps(options),
+        status=ImportJobStatusEnum.QUEUED,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _submit(job.id)
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_import_job(
+    job_id: UUID,
+    current_user=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """Progress of an import job; once completed, also the import result."""
+    job = await db.scalar(
+        select(ImportJob).where(ImportJob.id == job_id, ImportJob.user_id == current_user.id)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return _job_status(job)
+
+
+# ---------------------------------------------------------------------------
+# Background import worker
+# ---------------------------------------------------------------------------
+
+_IMPORT_JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+# A running job whose heartbeat is older than this was lost with its process
+_IMPORT_JOB_STALE_SECONDS = int(os.getenv("IMPORT_JOB_STALE_SECONDS", "600"))
+_MAX_JOB_ERRORS = 20
+
+_job_executor = ThreadPoolExecutor(max_workers=_IMPORT_JOB_WORKERS, thread_name_prefix="import-job")
+_submitted: set[UUID] = set()  # jobs waiting in or running on this process's executor
+_submitted_lock = threading.Lock()
+
+
+class _Superseded(Exception):
+    """Another worker committed this job's next chunk first (after a reclaim)."""
+
+
+def _submit(job_id: UUID) -> None:
+    with _submitted_lock:
+        if job_id in _submitted:
+            return
+        _submitted.add(job_id)
+    _job_executor.submit(_run_import_job, job_id)
+
+
+def reclaim_jobs() -> int:
+    """
+    Requeue running jobs whose heartbeat went stale (their process died) and
+    submit every queued job to this process's pool. Several processes may do
+    this at once: claiming a job is atomic, and a chunk only commits if no one
+    else has moved the job's `next_row` since it was read.
     """
-    df = _read_file(file)
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=_IMPORT_JOB_STALE_SECONDS)
+    with SessionLocal() as db:
+        requeued = (
+            db.query(ImportJob)
+            .filter(
+                ImportJob.status == ImportJobStatusEnum.RUNNING,
+                func.coalesce(ImportJob.updated_at, ImportJob.started_at) < cutoff,
+            )
+            .update({"status": ImportJobStatusEnum.QUEUED}, synchronize_session=False)
+        )
+        db.commit()
+        queued = db.execute(
+            select(ImportJob.id)
+            .where(ImportJob.status == ImportJobStatusEnum.QUEUED)
+            .order_by(ImportJob.created_at)
+        ).scalars().all()
+    if requeued:
+        print(f"[import] requeued {requeued} stalled job(s)", flush=True)
+    for job_id in queued:
+        _submit(job_id)
+    return len(queued)
+
+
+async def run_reclaimer() -> None:
+    """Reclaim at startup, then every half stale-interval; runs until cancelled."""
+    while True:
+        try:
+            await run_in_threadpool(reclaim_jobs)
+        except Exception as exc:
+            print(f"[import] reclaim failed: {exc}", flush=True)
+        await asyncio.sleep(_IMPORT_JOB_STALE_SECONDS / 2)
 
+
+def _run_import_job(job_id: UUID) -> None:
+    """Run (or resume) one queued import, committing rows and progress after every chunk."""
+    db = SessionLocal()
+    try:
+        claimed = (
+            db.query(ImportJob)
+            .filter(ImportJob.id == job_id, ImportJob.status == ImportJobStatusEnum.QUEUED)
+            .update({"status": ImportJobStatusEnum.RUNNING,
+                     "started_at": func.coalesce(ImportJob.started_at, func.now())},
+                    synchronize_session=False)
+        )
+        db.commit()
+        if not claimed:
+            return
+        job = db.get(ImportJob, job_id)
+        try:
+            _import_chunks(db, job)
+        except _Superseded:
+            db.rollback()
+            print(f"[import] job {job_id} continued by another worker", flush=True)
+        except Exception as exc:
+            db.rollback()
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            print(f"[import] job {job_id} failed: {detail}", flush=True)
+            job.status = ImportJobStatusEnum.FAILED
+            job.error_message = str(detail)[:1000]
+            job.finished_at = func.now()
+            db.commit()
+            change_feed.publish(job.user_id, "import_jobs", "failed", id=str(job_id))
+    finally:
+        db.close()
+        with _submitted_lock:
+            _submitted.discard(job_id)
+
+
+def _import_chunks(db: Session, job: ImportJob) -> None:
+    user_id, job_id = job.user_id, str(job.id)
+    options = json.loads(job.options)
+    col_map: dict = options["columns"]
+    date_col = col_map["date"]
+    description_col = col_map.get("description")
     try:
-        def_currency = CurrencyEnum(default_currency)
+        def_currency = CurrencyEnum(options.get("default_currency"))
     except ValueError:
         def_currency = CurrencyEnum.USD
     try:
-        def_category = CategoryEnum(default_category)
+        def_category = CategoryEnum(options.get("default_category"))
     except ValueError:
         def_category = CategoryEnum.OTHER
 
-    col_map = {
-        "date": date_col, "amount": amount_col, "debit": debit_col,
-        "credit": credit_col, "description": description_col,
-        "category": category_col, "currency": currency_col, "type": type_col,
-    }
+    raw = upload_store.load_raw(job.user_id, job.upload_id)
+    if raw is not None and job.total_rows is None:
+        try:
+            job.total_rows = ingest.count_rows(*raw)
+        except Exception:
+            pass  # only used for the progress bar
+        db.commit()
 
-    # Detect date format once for the whole file
-    dayfirst = _detect_dayfirst(df[date_col]) if date_col else False
+    next_row = job.next_row or 0
+    duplicate_budget: dict[str, int] | None = None
+    if options.get("skip_duplicates", True):
+        duplicate_budget = _resumed_duplicate_budget(db, job, options) if next_row else {}
+    errors: list[str] = json.loads(job.errors) if job.errors else []
+    dayfirst: bool | None = options.get("dayfirst")
+    # Spreadsheet row number of data row 0 (the chunk index is the 0-based data row)
+    first_row = _header_rows(job.user_id, job.upload_id) + 1
+
+    # Parse, categorise and insert one chunk at a time so memory stays bounded
+    for chunk in _iter_upload_chunks(job.user_id, job.upload_id, start_row=next_row):
+        if dayfirst is None:
+            # Detect date format once, from the first chunk; kept for a resumed run
+            dayfirst = _detect_dayfirst(chunk[date_col]) if date_col in chunk else False
+            options["dayfirst"] = dayfirst
+            job.options = json.dumps(options)
+
+        hints = _infer_categories(chunk, description_col)
+        parsed_rows: list[dict | None] = [
+            _parse_row(row, col_map, def_currency, def_category, dayfirst=dayfirst, inferred=hint)
+            for (_, row), hint in zip(chunk.iterrows(), hints)
+        ]
+        # Fingerprint the file's own text: enrichment below may rewrite descriptions
+        for parsed in parsed_rows:
+            if parsed is not None:
+                parsed["fingerprint"] = _source_fingerprint(parsed)
+        _apply_llm_categories(parsed_rows, def_category, db)
+
+        batch, row_numbers, unparsed = _to_batch(parsed_rows, [int(i) + first_row for i in chunk.index])
+        result = write_transactions(
+            db, job.user_id, batch, row_numbers=row_numbers, duplicate_budget=duplicate_budget,
+        )
 
-    # Parse all rows with keyword matching, then upgrade ambiguous categories via LLM
-    all_rows = list(df.iterrows())
-    parsed_rows: list[dict | None] = [
-        _parse_row(row, col_map, def_currency, def_category, dayfirst=dayfirst)
-        for _, row in all_rows
-    ]
-    _apply_llm_categories(parsed_rows, def_category)
+        errors.extend(result["errors"][: max(0, _MAX_JOB_ERRORS - len(errors))])
+        job.rows_parsed += len(chunk)
+        job.rows_categorized += len(chunk) - unparsed
+        job.rows_inserted += result["inserted"]
+        job.rows_duplicate += result["duplicates"]
+        job.rows_skipped += unparsed + result["skipped"]
+        job.errors = json.dumps(errors)
+        if result["date_range"]:
+            lo = datetime.date.fromisoformat(result["date_range"]["min"])
+            hi = datetime.date.fromisoformat(result["date_range"]["max"])
+            job.date_min = lo if job.date_min is None or lo < job.date_min else job.date_min
+            job.date_max = hi if job.date_max is None or hi > job.date_max else job.date_max
+        # Rows, progress and the resume offset land together, and only if no
+        # other worker has taken this job over since we read next_row
+        chunk_end = int(chunk.index[-1]) + 1
+        owned = db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job.id, ImportJob.next_row == next_row)
+            .values(next_row=chunk_end)
+        ).rowcount
+        if not owned:
+            raise _Superseded()
+        next_row = chunk_end
+        db.commit()
+        if result["inserted"]:
+            alert_state.notify(user_id, result["alerts_changed"])
+            change_feed.publish(user_id, "transactions", "imported", count=result["inserted"])
+        change_feed.publish(user_id, "import_jobs", "progress", id=job_id, rows_parsed=job.rows_parsed)
 
-    imported = skipped = 0
-    errors: list[str] = []
-    imported_dates: list = []
+    job.status = ImportJobStatusEnum.COMPLETED
+    job.finished_at = func.now()
+    db.commit()
+    change_feed.publish(user_id, "import_jobs", "completed", id=job_id)
+    upload_store.discard(user_id, job.upload_id)
 
-    for idx, parsed in enumerate(parsed_rows, start=2):
-        if parsed is None:
-            skipped += 1
-            continue
-        try:
-            parsed.pop("_slang_label", None)  # internal key — strip before use
-            db.add(Transaction(
-                user_id=current_user.id,
-                amount=Decimal(str(parsed["amount"])),
-                currency=CurrencyEnum(parsed["currency"]),
-                type=TransactionTypeEnum(parsed["type"]),
-                category=CategoryEnum(parsed["category"]),
-                description=parsed.get("description"),
-                transaction_date=parsed["date"],
-                is_recurring=False,
-                is_generated=False,
-            ))
-            imported_dates.append(parsed["date"])
-            imported += 1
-        except Exception as exc:
-            errors.append(f"Row {idx}: {exc}")
-            skipped += 1
 
-    if imported > 0:
-        db.commit()
+def _resumed_duplicate_budget(db: Session, job: ImportJob, options: dict) -> dict[str, int]:
+    """
+    Rebuild the duplicate budget for a job resuming at `next_row`. A fresh run
+    would have reached this point with stored(fp) - rows_in_prefix(fp) left for
+    each fingerprint, and rows this job already inserted are now among the
+    stored ones, so re-derive that from the prefix instead of starting empty.
+    """
+    col_map: dict = options["columns"]
+    try:
+        def_currency = CurrencyEnum(options.get("default_currency"))
+    except ValueError:
+        def_currency = CurrencyEnum.USD
+    dayfirst = bool(options.get("dayfirst"))
+
+    prefix: dict[str, int] = {}
+    for chunk in _iter_upload_chunks(job.user_id, job.upload_id, end_row=job.next_row):
+        for _, row in chunk.iterrows():
+            parsed = _parse_row(row, col_map, def_currency, CategoryEnum.OTHER, dayfirst=dayfirst)
+            fp = _source_fingerprint(parsed) if parsed is not None else None
+            if fp is not None:
+                prefix[fp] = prefix.get(fp, 0) + 1
+    stored = existing_fingerprints(db, job.user_id, set(prefix))
+    return {fp: max(stored.get(fp, 0) - n, 0) for fp, n in prefix.items()}
 
-    date_range = None
-    if imported_dates:
-        date_range = {"min": str(min(imported_dates)), "max": str(max(imported_dates))}
 
-    return {"imported": imported, "skipped": skipped, "errors": errors[:20], "date_range": date_range}
+def _source_fingerprint(parsed: dict) -> str | None:
+    """
+    Fingerprint of a parsed row as read from the file (before any LLM
+    enrichment), or None for rows the writer will reject.
+    """
+    try:
+        amount = Decimal(str(parsed["amount"])).quantize(Decimal("0.01"))
+        currency = CurrencyEnum(parsed["currency"])
+    except (InvalidOperation, ValueError):
+        return None
+    if amount <= 0 or parsed.get("date") is None:
+        return None
+    return fingerprint(parsed["date"], amount, currency, parsed.get("description"))
+
+
+def _job_status(job: ImportJob) -> dict:
+    status = job.status
+
+    out = {
+        "job_id": str(job.id),
+        "upload_id": job.upload_id,
+        "filename": job.filename,
+        "status": status.value,
+        "total_rows": job.total_rows,
+        "rows_parsed": job.rows_parsed or 0,
+        "rows_categorized": job.rows_categorized or 0,
+        "rows_inserted": job.rows_inserted or 0,
+        "rows_skipped": job.rows_skipped or 0,
+        "rows_duplicate": job.rows_duplicate or 0,
+        "errors": json.loads(job.errors) if job.errors else [],
+        "error_message": job.error_message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if status == ImportJobStatusEnum.COMPLETED:
+        # Same shape the synchronous endpoint used to return
+        out.update({
+            "imported": out["rows_inserted"],
+            "skipped": out["rows_skipped"],
+            "duplicates": out["rows_duplicate"],
+            "date_range": {"min": str(job.date_min), "max": str(job.date_max)} if job.date_min else None,
+        })
+    return out
 
 
 # ---------------------------------------------------------------------------
@@ -326,34 +599,55 @@ def _parse_date(val, dayfirst: bool) -> datetime.date | None:
         return None
 
 
-def _read_file(file: UploadFile) -> pd.DataFrame:
-    content = file.file.read()
-    fname = (file.filename or "").lower()
-    is_excel = fname.endswith((".xlsx", ".xls"))
-
-    best: pd.DataFrame | None = None
-
-    def _try(fn):
-        nonlocal best
-        try:
-            candidate = fn()
-            if best is None or len(candidate.columns) > len(best.columns):
-                best = candidate
-        except Exception:
-            pass
-
-    if is_excel:
-        _try(lambda: pd.read_excel(io.BytesIO(content)))
-    # Always try CSV — covers .csv files and XLSX files that Excel saved incorrectly
-    # (when all data ends up in a single column because the delimiter wasn't recognised)
-    _try(lambda: pd.read_csv(io.BytesIO(content)))
-    _try(lambda: pd.read_csv(io.BytesIO(content), encoding="latin-1"))
-    if not is_excel:
-        _try(lambda: pd.read_excel(io.BytesIO(content)))
-
-    if best is None:
-        raise ValueError("Could not read file — make sure it is a valid CSV or Excel file.")
-    return best.dropna(how="all").reset_index(drop=True)
+def _iter_upload_chunks(
+    user_id, upload_id: str, start_row: int = 0, end_row: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the data rows in [start_row, end_row) of a staged upload as
+    DataFrame chunks: the cached frame from /preview when there is one,
+    otherwise the raw file (streamed if it is large).
+    """
+    for chunk in _upload_chunks(user_id, upload_id):
+        if not len(chunk) or chunk.index[-1] < start_row:
+            continue  # empty, or committed before a resume
+        if end_row is not None and chunk.index[0] >= end_row:
+            return
+        keep = chunk.index >= start_row
+        if end_row is not None:
+            keep &= chunk.index < end_row
+        if keep.any():
+            yield chunk[keep]
+
+
+def _header_rows(user_id, upload_id: str) -> int:
+    """
+    Lines above data row 0 in the chunks `_upload_chunks` yields: `read_frame`
+    always takes row 1 as the header, the streaming reader sniffs it.
+    """
+    raw = upload_store.load_raw(user_id, upload_id)
+    if raw is None or not ingest.is_large(raw[0]):
+        return 1
+    return ingest.header_rows(*raw)
+
+
+def _upload_chunks(user_id, upload_id: str) -> Iterator[pd.DataFrame]:
+    staged = upload_store.load_frame(user_id, upload_id)
+    if staged is not None:
+        df = staged[0]
+    else:
+        raw = upload_store.load_raw(user_id, upload_id)
+        if raw is None:
+            raise HTTPException(
+                status_code=410,
+                detail="This upload has expired. Please upload the file again.",
+            )
+        path, filename = raw
+        if ingest.is_large(path):
+            yield from ingest.iter_chunks(path, filename)
+            return
+        df = ingest.read_frame(path.read_bytes(), filename)
+    for start in range(0, len(df), ingest.CHUNK_ROWS):
+        yield df.iloc[start:start + ingest.CHUNK_ROWS]
 
 
 def _alias_matches(alias: str, norm: str) -> bool:
@@ -392,7 +686,13 @@ def _parse_row(
     default_currency: CurrencyEnum = CurrencyEnum.USD,
     default_category: CategoryEnum = CategoryEnum.OTHER,
     dayfirst: bool = False,
+    inferred: CategoryEnum | None = None,
 ) -> dict | None:
+    """
+    Parse one spreadsheet row into a transaction dict (None if unusable).
+    `inferred` is the keyword category of this row's description, precomputed
+    for the whole column with _infer_categories.
+    """
     # Date (required)
     date_col = col_map.get("date")
     if not date_col or _isna(row.get(date_col)):
@@ -423,9 +723,9 @@ def _parse_row(
             # (e.g. "Uber robbed me again" matching TRANSPORTATION for a food purchase).
             # If description has no keyword match, fall back to OTHER so the LLM
             # gets a chance to classify it from both the description and slang label.
-            category = (desc and _infer_category(desc)) or default_category
+            category = (desc and inferred) or default_category
     elif desc:
-        category = _infer_category(desc) or default_category
+        category = inferred or default_category
 
     # Amount + type
     amount: float | None = None
@@ -486,6 +786,37 @@ def _parse_row(
     return result
 
 
+def _to_batch(
+    parsed_rows: list[dict | None],
+    rows: list[int],
+) -> tuple[dict[str, list], list[int], int]:
+    """
+    Pivot parsed rows into the columnar batch the bulk writer expects;
+    `rows` holds the spreadsheet row number of each parsed row.
+    Returns (batch, spreadsheet row numbers, count of unparseable rows).
+    Unparseable rows are skipped silently; the writer reports per-row errors.
+    """
+    batch: dict[str, list] = {
+        "amount": [], "currency": [], "type": [], "category": [],
+        "description": [], "transaction_date": [], "fingerprint": [],
+    }
+    row_numbers: list[int] = []
+    unparsed = 0
+    for idx, parsed in zip(rows, parsed_rows):
+        if parsed is None:
+            unparsed += 1
+            continue
+        batch["amount"].append(parsed["amount"])
+        batch["currency"].append(parsed["currency"])
+        batch["type"].append(parsed["type"])
+        batch["category"].append(parsed["category"])
+        batch["description"].append(parsed.get("description"))
+        batch["transaction_date"].append(parsed["date"])
+        batch["fingerprint"].append(parsed.get("fingerprint"))
+        row_numbers.append(idx)
+    return batch, row_numbers, unparsed
+
+
 def _isna(val) -> bool:
     if val is None:
         return True
@@ -513,18 +844,37 @@ def _to_float(val) -> float | None:
 
 _VALID_CATS = [e.value for e in CategoryEnum]
 
+# LLM batching — chunk size keeps each response well inside its token budget
+_LLM_CHUNK_SIZE = int(os.getenv("LLM_CATEGORIZE_CHUNK_SIZE", "40"))
+_LLM_CONCURRENCY = int(os.getenv("LLM_CATEGORIZE_CONCURRENCY", "4"))
+_LLM_TOKENS_BASE = 64
+_LLM_TOKENS_PER_ITEM = 32
+
 
-def _llm_infer_categories(descriptions: list[str]) -> list[dict]:
+def _llm_infer_categories(descriptions: list[str]) -> list[dict | None]:
     """
-    Batch-classify transaction descriptions using Claude Haiku.
+    Classify transaction descriptions using Claude Haiku.
+    Splits the input into chunks of at most _LLM_CHUNK_SIZE items and sends them
+    concurrently (up to _LLM_CONCURRENCY requests in flight), so large imports
+    are never truncated by the output token limit.
     Returns a list of dicts with 'category' and optional 'description' (a clean
-    human-readable label derived from slang when the original description was absent).
-    Falls back to {"category": "OTHER"} for any item that can't be classified.
+    human-readable label derived from slang when the original description was absent),
+    or None for any item that couldn't be classified.
     """
     client = _get_anthropic()
     if client is None or not descriptions:
-        return [{"category": "OTHER"}] * len(descriptions)
+        return [None] * len(descriptions)
+
+    chunks = [descriptions[i:i + _LLM_CHUNK_SIZE] for i in range(0, len(descriptions), _LLM_CHUNK_SIZE)]
+    if len(chunks) == 1:
+        return _llm_classify_chunk(client, chunks[0])
+    with ThreadPoolExecutor(max_workers=min(_LLM_CONCURRENCY, len(chunks))) as pool:
+        results = pool.map(lambda chunk: _llm_classify_chunk(client, chunk), chunks)
+        return [item for chunk_result in results for item in chunk_result]
+
 
+def _llm_classify_chunk(client: anthropic.Anthropic, descriptions: list[str]) -> list[dict | None]:
+    """One Haiku call for a size-bounded chunk. Items it can't classify come back as None."""
     numbered = "\n".join(f"{i + 1}. {d}" for i, d in enumerate(descriptions))
     prompt = f"""You are a financial transaction classifier for an international student budgeting app.
 
@@ -564,14 +914,14 @@ Transactions:
     try:
         msg = client.messages.create(
             model="claude-haiku-4-5-20251001",
-            max_tokens=768,
+            max_tokens=_LLM_TOKENS_BASE + _LLM_TOKENS_PER_ITEM * len(descriptions),
             messages=[{"role": "user", "content": prompt}],
         )
         raw = msg.content[0].text.strip()
         raw = re.sub(r"^```[a-z]*\s*", "", raw)
         raw = re.sub(r"\s*```$", "", raw)
         parsed = json.loads(raw)
-        result = []
+        result: list[dict | None] = []
         for item in parsed:
             cat = str(item.get("category", "OTHER")).upper().strip().replace(" ", "_")
             entry: dict = {"category": cat if cat in _VALID_CATS else "OTHER"}
@@ -579,20 +929,23 @@ Transactions:
                 entry["description"] = str(item["description"]).strip()[:200]
             result.append(entry)
         while len(result) < len(descriptions):
-            result.append({"category": "OTHER"})
+            result.append(None)
         return result[: len(descriptions)]
     except Exception:
-        return [{"category": "OTHER"}] * len(descriptions)
+        return [None] * len(descriptions)
 
 
 def _apply_llm_categories(
     parsed_rows: list[dict | None],
     default_category: CategoryEnum,
+    db: Session | None = None,
 ) -> list[dict | None]:
     """
-    For rows where category == default_category, batch-call the LLM to infer
-    category, enrich vague descriptions using slang label context, and flip
+    For rows where category == default_category, infer category (memo first,
+    then LLM), enrich vague descriptions using slang label context, and flip
     type to INCOME when an income category is assigned.
+    Identical normalized texts are classified once; new LLM answers are
+    written back to the shared memo when a session is given.
     Mutates and returns the list in-place.
     """
     indices: list[int] = []
@@ -616,8 +969,27 @@ def _apply_llm_categories(
     if not descs:
         return parsed_rows
 
-    llm_results = _llm_infer_categories(descs)
-    for idx, result in zip(indices, llm_results):
+    # Memo key per text; texts that normalize to nothing are keyed by themselves
+    keys = [category_memo.normalize(d) or d for d in descs]
+    known = category_memo.lookup(db, keys) if db is not None else {}
+
+    pending: dict[str, str] = {}  # key -> representative text for the LLM
+    for key, text in zip(keys, descs):
+        if key not in known and key not in pending:
+            pending[key] = text
+    if pending:
+        answers = _llm_infer_categories(list(pending.values()))
+        learned = {k: a for k, a in zip(pending, answers) if a is not None}
+        known.update(learned)
+        if db is not None:
+            try:
+                # Raw-text fallback keys (nothing left after normalizing) aren't shared
+                category_memo.remember(db, {k: v for k, v in learned.items() if category_memo.normalize(k) == k})
+            except Exception as exc:
+                print(f"[import] WARNING: could not update category memo: {exc}", flush=True)
+
+    for idx, key in zip(indices, keys):
+        result = known.get(key) or {"category": "OTHER"}
         cat = result["category"]
         parsed_rows[idx]["category"] = cat  # type: ignore[index]
         # Use LLM description if:
@@ -636,12 +1008,9 @@ def _apply_llm_categories(
     return parsed_rows
 
 
-def _infer_category(text: str) -> CategoryEnum | None:
-    lower = text.lower()
-    for cat_name, keywords in _CATEGORY_KW.items():
-        if any(kw in lower for kw in keywords):
-            try:
-                return CategoryEnum(cat_name)
-            except ValueError:
-                pass
-    return None
+def _infer_categories(df: pd.DataFrame, desc_col: str | None) -> list[CategoryEnum | None]:
+    """Keyword-classify a whole description column in one batch (one entry per row)."""
+    if not desc_col or desc_col not in df:
+        return [None] * len(df)
+    texts = [None if _isna(v) else str(v).strip()[:500] for v in df[desc_col]]
+    return [CategoryEnum(c) if c else None for c in category_keywords.classify_many(texts)]
@@ -3,8 +3,6 @@ Transactions router — CRUD + monthly summary.
 All endpoints require a valid JWT (Bearer token).
 """
 from __future__ import annotations
-import csv
-import io
 import os
 import uuid as uuid_lib
 from calendar import monthrange
@@ -17,14 +15,16 @@ from uuid import UUID
 from dateutil.relativedelta import relativedelta
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Request
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func, extract
+from sqlalchemy import func, extract, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
-from models import Transaction, TransactionTypeEnum, CategoryEnum, RecurringFrequencyEnum
-from routers.auth import get_current_user
-from routers.exchange_rates import _FALLBACK_RATES
-from schemas import TransactionCreate, TransactionUpdate, TransactionResponse, TransactionSummary, WeeklyTransactionSummary, ReceiptUploadResponse
+from database import get_async_db, get_db
+from models import Transaction, TransactionTombstone, TransactionTypeEnum, CategoryEnum, CurrencyEnum, RecurringFrequencyEnum
+from routers.auth import get_current_user, get_current_user_async
+from services import alert_state, category_keywords, change_feed, change_log, export, fx, fx_history
+from services.transaction_writer import fingerprint, write_transactions
+from schemas import TransactionCreate, TransactionUpdate, TransactionResponse, TransactionChanges, TransactionSummary, WeeklyTransactionSummary, ReceiptUploadResponse
 
 RECEIPTS_DIR = Path(__file__).parent.parent / "uploads" / "receipts"
 RECEIPTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -38,12 +38,6 @@ router = APIRouter(prefix="/api/v1/transactions", tags=["transactions"])
 # Helpers
 # ──────────────────────────────────────────────
 
-def _to_usd(amount: Decimal, currency: str) -> Decimal:
-    """Convert amount to USD using fallback rates (rate = units per 1 USD)."""
-    rate = _FALLBACK_RATES.get(currency.upper(), 1.0)
-    return round(amount / Decimal(str(rate)), 2)
-
-
 def _next_occurrence(current: date, freq: RecurringFrequencyEnum) -> date:
     if freq == RecurringFrequencyEnum.DAILY:
         return current + timedelta(days=1)
@@ -69,38 +63,43 @@ def _materialize_recurring(user_id: UUID, through: date, db: Session) -> None:
         )
         .all()
     )
-    created = False
+    templates = [t for t in templates if t.recurring_frequency]
+    if not templates:
+        return
+
+    # One query for every template's existing children instead of one per template
+    existing: dict[UUID, set[date]] = {t.id: set() for t in templates}
+    for parent_id, tx_date in db.query(Transaction.recurring_parent_id, Transaction.transaction_date).filter(
+        Transaction.recurring_parent_id.in_(list(existing))
+    ):
+        existing[parent_id].add(tx_date)
+
+    batch: dict[str, list] = {
+        "amount": [], "currency": [], "amount_in_usd": [], "type": [], "category": [],
+        "description": [], "transaction_date": [], "is_generated": [], "recurring_parent_id": [],
+    }
     for tmpl in templates:
-        if not tmpl.recurring_frequency:
-            continue
-        existing_dates = {
-            row.transaction_date
-            for row in db.query(Transaction.transaction_date).filter(
-                Transaction.recurring_parent_id == tmpl.id
-            )
-        }
         next_d = _next_occurrence(tmpl.transaction_date, tmpl.recurring_frequency)
         while next_d <= through:
-            if next_d not in existing_dates:
-                db.add(
-                    Transaction(
-                        user_id=user_id,
-                        amount=tmpl.amount,
-                        currency=tmpl.currency,
-                        amount_in_usd=_to_usd(Decimal(str(tmpl.amount)), tmpl.currency.value),
-                        type=tmpl.type,
-                        category=tmpl.category,
-                        description=tmpl.description,
-                        transaction_date=next_d,
-                        is_recurring=False,
-                        is_generated=True,
-                        recurring_parent_id=tmpl.id,
-                    )
-                )
-                created = True
+            if next_d not in existing[tmpl.id]:
+                batch["amount"].append(tmpl.amount)
+                batch["currency"].append(tmpl.currency)
+                batch["amount_in_usd"].append(None)  # writer converts at each occurrence's date
+                batch["type"].append(tmpl.type)
+                batch["category"].append(tmpl.category)
+                batch["description"].append(tmpl.description)
+                batch["transaction_date"].append(next_d)
+                batch["is_generated"].append(True)
+                batch["recurring_parent_id"].append(tmpl.id)
             next_d = _next_occurrence(next_d, tmpl.recurring_frequency)
-    if created:
-        db.commit()
+
+    if batch["amount"]:
+        result = write_transactions(db, user_id, batch)
+        inserted = result["inserted"]
+        if inserted:
+            db.commit()
+            alert_state.notify(user_id, result["alerts_changed"])
+            change_feed.publish(user_id, "transactions", "generated", count=inserted)
 
 
 def _get_transaction_or_404(
@@ -131,17 +130,22 @@ def create_transaction(
         user_id=current_user.id,
         amount=body.amount,
         currency=body.currency,
-        amount_in_usd=_to_usd(Decimal(str(body.amount)), body.currency),
+        amount_in_usd=fx_history.to_usd(body.amount, body.currency, body.transaction_date),
         type=body.type,
         category=body.category,
         description=body.description,
         transaction_date=body.transaction_date,
         is_recurring=body.is_recurring,
         recurring_frequency=body.recurring_frequency if body.is_recurring else None,
+        fingerprint=fingerprint(body.transaction_date, body.amount, body.currency, body.description),
+        change_version=change_log.reserve(db, current_user.id),
     )
     db.add(tx)
+    alerts_changed = alert_state.apply(db, current_user.id, alert_state.expense_deltas([tx]))
     db.commit()
+    alert_state.notify(current_user.id, alerts_changed)
     db.refresh(tx)
+    change_feed.publish(current_user.id, "transactions", "created", id=str(tx.id))
     return tx
 
 
@@ -187,10 +191,16 @@ def list_transactions(
 def get_summary(
     year: Optional[int] = Query(None, ge=2000, le=2100),
     month: Optional[int] = Query(None, ge=1, le=12),
+    currency: Optional[CurrencyEnum] = Query(None, description="Defaults to the user's study-country currency"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> TransactionSummary:
-    """Return income/expense totals and breakdown by category for a period."""
+    """
+    Return income/expense totals and breakdown by category for a period,
+    converted into one currency (grouped per source currency, converted once per group).
+    """
+    target = fx.working_currency(current_user, currency.value if currency else None)
+    convert = fx.Converter(target, db)
     today = date.today()
     _year = year or today.year
     _month = month or today.month
@@ -202,6 +212,7 @@ def get_summary(
         db.query(
             Transaction.type,
             Transaction.category,
+            Transaction.currency,
             func.sum(Transaction.amount).label("total"),
         )
         .filter(
@@ -209,48 +220,52 @@ def get_summary(
             Transaction.transaction_date >= period_start,
             Transaction.transaction_date <= period_end,
         )
-        .group_by(Transaction.type, Transaction.category)
+        .group_by(Transaction.type, Transaction.category, Transaction.currency)
         .all()
     )
 
     total_income = Decimal("0")
     total_expenses = Decimal("0")
-    by_category: dict[str, str] = {}
+    category_totals: dict[str, Decimal] = {}
 
     for row in rows:
+        amount = convert(row.total, row.currency)
         cat_key = row.category.value
+        category_totals[cat_key] = category_totals.get(cat_key, Decimal("0")) + amount
         if row.type == TransactionTypeEnum.INCOME:
-            total_income += row.total
-            by_category[cat_key] = str(round(row.total, 2))
+            total_income += amount
         else:
-            total_expenses += row.total
-            by_category[cat_key] = str(round(row.total, 2))
+            total_expenses += amount
 
     return TransactionSummary(
         total_income=round(total_income, 2),
         total_expenses=round(total_expenses, 2),
         net=round(total_income - total_expenses, 2),
-        by_category=by_category,
+        by_category={k: str(round(v, 2)) for k, v in category_totals.items()},
         period_start=period_start,
         period_end=period_end,
+        currency=target,
     )
 
 
 @router.get("/weekly-summary", response_model=list[WeeklyTransactionSummary])
 def get_weekly_summary(
     year: Optional[int] = Query(None, ge=2000, le=2100),
+    currency: Optional[CurrencyEnum] = Query(None, description="Defaults to the user's study-country currency"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> list[WeeklyTransactionSummary]:
-    """Return weekly expense totals grouped by ISO week number."""
+    """Return weekly expense totals grouped by ISO week number, in `currency`."""
+    target = fx.working_currency(current_user, currency.value if currency else None)
     from models import TransactionTypeEnum as TTE
     q = (
         db.query(
             extract("isoyear", Transaction.transaction_date).label("iso_year"),
             extract("week",    Transaction.transaction_date).label("iso_week"),
+            Transaction.currency,
             func.min(Transaction.transaction_date).label("week_start"),
             func.max(Transaction.transaction_date).label("week_end"),
-            func.sum(func.coalesce(Transaction.amount_in_usd, Transaction.amount)).label("total"),
+            func.sum(Transaction.amount).label("total"),
         )
         .filter(
             Transaction.user_id == current_user.id,
@@ -259,71 +274,160 @@ def get_weekly_summary(
     )
     if year:
         q = q.filter(extract("isoyear", Transaction.transaction_date) == year)
-    rows = q.group_by("iso_year", "iso_week").order_by("iso_year", "iso_week").all()
+    rows = q.group_by("iso_year", "iso_week", Transaction.currency).all()
+
+    # Fold the per-currency groups of each week into one converted total
+    convert = fx.Converter(target, db)
+    weeks: dict[tuple[int, int], dict] = {}
+    for r in rows:
+        key = (int(r.iso_year), int(r.iso_week))
+        w = weeks.setdefault(key, {"start": r.week_start, "end": r.week_end, "total": Decimal("0")})
+        w["start"], w["end"] = min(w["start"], r.week_start), max(w["end"], r.week_end)
+        w["total"] += convert(r.total, r.currency)
     return [
         WeeklyTransactionSummary(
-            year=int(r.iso_year),
-            week=int(r.iso_week),
-            week_start=r.week_start,
-            week_end=r.week_end,
-            total=float(round(r.total, 2)),
+            year=y,
+            week=wk,
+            week_start=w["start"],
+            week_end=w["end"],
+            total=float(round(w["total"], 2)),
+            currency=target,
         )
-        for r in rows
+        for (y, wk), w in sorted(weeks.items())
     ]
 
 
+_EXPORT_COLUMNS = ["date", "type", "category", "amount", "currency", "amount_usd", "description", "notes", "recurring"]
+
+
 @router.get("/export", response_class=StreamingResponse)
 def export_transactions_csv(
     year: Optional[int] = Query(None, ge=2000, le=2100),
     month: Optional[int] = Query(None, ge=1, le=12),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
-    """Download transactions as a CSV file."""
-    q = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+    """
+    Download transactions as CSV (default) or Parquet.
+
+    Rows are streamed from a server-side cursor as they arrive, so the
+    download starts immediately and memory does not grow with history size.
+    """
+    stmt = select(
+        Transaction.transaction_date, Transaction.type, Transaction.category,
+        Transaction.amount, Transaction.currency, Transaction.amount_in_usd,
+        Transaction.description, Transaction.notes,
+        Transaction.is_recurring, Transaction.recurring_frequency,
+    ).where(Transaction.user_id == current_user.id)
     if year:
-        q = q.filter(extract("year", Transaction.transaction_date) == year)
+        stmt = stmt.where(extract("year", Transaction.transaction_date) == year)
     if month:
-        q = q.filter(extract("month", Transaction.transaction_date) == month)
+        stmt = stmt.where(extract("month", Transaction.transaction_date) == month)
     if start_date:
-        q = q.filter(Transaction.transaction_date >= start_date)
+        stmt = stmt.where(Transaction.transaction_date >= start_date)
     if end_date:
-        q = q.filter(Transaction.transaction_date <= end_date)
-    rows = q.order_by(Transaction.transaction_date.desc()).all()
+        stmt = stmt.where(Transaction.transaction_date <= end_date)
+    stmt = stmt.order_by(Transaction.transaction_date.desc())
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["date", "type", "category", "amount", "currency", "amount_usd", "description", "notes", "recurring"])
-    for t in rows:
-        writer.writerow([
+    def to_record(t) -> list:
+        return [
             t.transaction_date.isoformat(),
             t.type.value,
             t.category.value,
             float(t.amount),
             t.currency.value,
-            float(t.amount_in_usd) if t.amount_in_usd else "",
+            float(t.amount_in_usd) if t.amount_in_usd else None,
             t.description or "",
             t.notes or "",
             t.recurring_frequency.value if t.is_recurring and t.recurring_frequency else "",
-        ])
-    output.seek(0)
-    filename = f"transactions_{date.today().isoformat()}.csv"
+        ]
+
+    rows = export.iter_rows(stmt)
+    if format == "parquet":
+        import pyarrow as pa
+        schema = [(c, pa.float64() if c in ("amount", "amount_usd") else pa.string()) for c in _EXPORT_COLUMNS]
+        body = export.stream_parquet(schema, rows, to_record)
+    else:
+        body = export.stream_csv(_EXPORT_COLUMNS, rows, lambda t: ["" if v is None else v for v in to_record(t)])
+
+    filename = f"transactions_{date.today().isoformat()}.{format}"
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+        body,
+        media_type=export.MEDIA_TYPES[format],
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
 
-@router.get("/{transaction_id}", response_model=TransactionResponse)
-def get_transaction(
-    transaction_id: UUID,
+@router.get("/changes", response_model=TransactionChanges)
+def list_transaction_changes(
+    since: int = Query(0, ge=0, description="Last version the client has synced (0 = full sync)"),
+    limit: int = Query(500, ge=1, le=5000),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
+) -> TransactionChanges:
+    """
+    Incremental sync: transactions inserted or updated, and ids deleted,
+    after version `since`, oldest first. Pass the returned `version` as the
+    next `since`; repeat while `has_more` is true.
+    """
+    _materialize_recurring(current_user.id, date.today(), db)
+    # Snapshot the head first: anything committed later is left for the next sync
+    head = change_log.current(db, current_user.id)
+    changed = (
+        db.query(Transaction)
+        .filter(
+            Transaction.user_id == current_user.id,
+            Transaction.change_version > since,
+            Transaction.change_version <= head,
+        )
+        .order_by(Transaction.change_version)
+        .limit(limit + 1)
+        .all()
+    )
+    deleted = []
+    if since > 0:  # a full sync has nothing to delete
+        deleted = (
+            db.query(TransactionTombstone.transaction_id, TransactionTombstone.change_version)
+            .filter(
+                TransactionTombstone.user_id == current_user.id,
+                TransactionTombstone.change_version > since,
+                TransactionTombstone.change_version <= head,
+            )
+            .order_by(TransactionTombstone.change_version)
+            .limit(limit + 1)
+            .all()
+        )
+
+    # Merge both streams by version and cut the page at `limit` entries
+    entries = sorted(
+        [(t.change_version, t) for t in changed] + [(d.change_version, d.transaction_id) for d in deleted],
+        key=lambda e: e[0],
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    version = entries[-1][0] if has_more else max(head, since)
+    return TransactionChanges(
+        version=version,
+        has_more=has_more,
+        changed=[e[1] for e in entries if isinstance(e[1], Transaction)],
+        deleted=[e[1] for e in entries if not isinstance(e[1], Transaction)],
+    )
+
+
+@router.get("/{transaction_id}", response_model=TransactionResponse)
+async def get_transaction(
+    transaction_id: UUID,
+    current_user=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> TransactionResponse:
-    return _get_transaction_or_404(transaction_id, current_user.id, db)
+    tx = await db.scalar(
+        select(Transaction).where(Transaction.id == transaction_id, Transaction.user_id == current_user.id)
+    )
+    if not tx:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return tx
 
 
 @router.put("/{transaction_id}", response_model=TransactionResponse)
@@ -334,10 +438,20 @@ def update_transaction(
     db: Session = Depends(get_db),
 ) -> TransactionResponse:
     tx = _get_transaction_or_404(transaction_id, current_user.id, db)
-    for field, value in body.model_dump(exclude_unset=True).items():
+    changes = body.model_dump(exclude_unset=True)
+    deltas = alert_state.expense_deltas([tx], sign=-1)  # take out the old amount...
+    for field, value in changes.items():
         setattr(tx, field, value)
+    if changes.keys() & {"amount", "currency", "transaction_date"}:
+        tx.amount_in_usd = fx_history.to_usd(tx.amount, tx.currency, tx.transaction_date)
+    tx.fingerprint = fingerprint(tx.transaction_date, tx.amount, tx.currency, tx.description)
+    change_log.touch(db, tx)
+    deltas += alert_state.expense_deltas([tx])  # ...and put in the new one
+    alerts_changed = alert_state.apply(db, current_user.id, deltas)
     db.commit()
+    alert_state.notify(current_user.id, alerts_changed)
     db.refresh(tx)
+    change_feed.publish(current_user.id, "transactions", "updated", id=str(tx.id))
     return tx
 
 
@@ -347,12 +461,16 @@ def delete_all_transactions(
     db: Session = Depends(get_db),
 ) -> dict:
     """Delete every transaction belonging to the current user. Returns count deleted."""
+    ids = db.scalars(select(Transaction.id).where(Transaction.user_id == current_user.id)).all()
+    change_log.tombstone(db, current_user.id, ids)
     deleted = (
         db.query(Transaction)
         .filter(Transaction.user_id == current_user.id)
         .delete(synchronize_session=False)
     )
     db.commit()
+    alert_state.refresh(db, current_user.id)
+    change_feed.publish(current_user.id, "transactions", "deleted", count=deleted)
     return {"deleted": deleted}
 
 
@@ -363,12 +481,25 @@ def delete_transaction(
     db: Session = Depends(get_db),
 ) -> None:
     tx = _get_transaction_or_404(transaction_id, current_user.id, db)
+    # Generated children go with their template (ON DELETE CASCADE) — record them too
+    children = db.execute(
+        select(
+            Transaction.id, Transaction.type, Transaction.category, Transaction.transaction_date,
+            Transaction.currency, Transaction.amount_in_usd, Transaction.amount,
+        ).where(Transaction.recurring_parent_id == tx.id)
+    ).all()
+    change_log.tombstone(db, current_user.id, [tx.id, *(c.id for c in children)])
+    alerts_changed = alert_state.apply(
+        db, current_user.id, alert_state.expense_deltas([tx, *children], sign=-1)
+    )
     db.delete(tx)
     db.commit()
+    alert_state.notify(current_user.id, alerts_changed)
+    change_feed.publish(current_user.id, "transactions", "deleted", id=str(transaction_id))
 
 
 @router.post("/{transaction_id}/receipt", response_model=ReceiptUploadResponse)
-async def upload_receipt(
+def upload_receipt(
     transaction_id: UUID,
     request: Request,
     file: UploadFile = File(...),
@@ -380,7 +511,7 @@ async def upload_receipt(
 
     if file.content_type not in ALLOWED_RECEIPT_TYPES:
         raise HTTPException(status_code=415, detail="Unsupported file type. Allowed: jpeg, png, webp, gif")
-    contents = await file.read()
+    contents = file.file.read()
     if len(contents) > MAX_RECEIPT_BYTES:
         raise HTTPException(status_code=413, detail="Receipt image must be under 10 MB")
 
@@ -394,7 +525,9 @@ async def upload_receipt(
     receipt_url = f"{base_url}/uploads/receipts/{current_user.id}/{filename}"
 
     tx.receipt_url = receipt_url
+    change_log.touch(db, tx)
     db.commit()
+    change_feed.publish(current_user.id, "transactions", "updated", id=str(transaction_id))
 
     # Attempt LLM category suggestion from description + filename heuristic
     suggested_category = _guess_category_from_description(tx.description or file.filename or "")
@@ -407,19 +540,4 @@ async def upload_receipt(
 
 def _guess_category_from_description(text: str) -> Optional[str]:
     """Simple keyword-based category guesser as a fallback when LLM is unavailable."""
-    text = text.lower()
-    mapping = {
-        "FOOD": ["restaurant", "cafe", "coffee", "pizza", "burger", "sushi", "boba", "grocery", "safeway", "trader joe", "aldi", "walmart food", "chipotle", "mcdonald", "starbucks"],
-        "TRANSPORTATION": ["uber", "lyft", "bus", "metro", "gas", "parking", "bart", "mta"],
-        "HOUSING": ["rent", "lease", "apartment", "landlord"],
-        "UTILITIES": ["electric", "internet", "wifi", "phone", "at&t", "verizon", "t-mobile", "comcast"],
-        "EDUCATION": ["tuition", "textbook", "course", "udemy", "coursera", "amazon books"],
-        "HEALTHCARE": ["pharmacy", "cvs", "walgreens", "doctor", "clinic", "insurance"],
-        "ENTERTAINMENT": ["netflix", "spotify", "hulu", "movie", "concert", "ticket"],
-        "TRAVEL": ["flight", "airline", "hotel", "airbnb", "expedia", "booking"],
-        "SHOPPING": ["amazon", "target", "walmart", "h&m", "zara", "clothing"],
-    }
-    for category, keywords in mapping.items():
-        if any(kw in text for kw in keywords):
-            return category
-    return None
\ No newline at end of file
+    return category_keywords.classify(text)
@@ -13,13 +13,16 @@ from uuid import UUID
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from database import get_db
+from database import get_async_db
 from models import User
 from schemas import UserCreate, UserUpdate, UserResponse, NotificationPreferencesUpdate, LoanProjectionResponse, LoanMonthPoint
-from routers.auth import get_current_user
+from routers.auth import get_current_user_async
+from services import auth_cache
 
 UPLOADS_DIR = Path(__file__).parent.parent / "uploads" / "avatars"
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
@@ -34,35 +37,42 @@ router = APIRouter(
 
 # ==================== CURRENT USER (JWT-protected) — must be before /{user_id} ====================
 
+async def _own_row(current_user: User, db: AsyncSession) -> User:
+    """The caller's User row in this session (current_user may be a cached snapshot)."""
+    return await db.get(User, current_user.id)
+
+
 @router.get("/me", response_model=UserResponse, summary="Get my profile")
-async def get_me(current_user: User = Depends(get_current_user)) -> UserResponse:
+async def get_me(current_user: User = Depends(get_current_user_async)) -> UserResponse:
     return current_user
 
 
 @router.put("/me", response_model=UserResponse, summary="Update my profile")
 async def update_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserResponse:
+    user = await _own_row(current_user, db)
     update_data = user_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     try:
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        auth_cache.invalidate_user(user.id)
+        await db.refresh(user)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already in use")
-    return current_user
+    return user
 
 
 @router.post("/me/avatar", response_model=UserResponse, summary="Upload profile picture")
 async def upload_avatar(
     request: Request,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserResponse:
     if file.content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(
@@ -78,37 +88,41 @@ async def upload_avatar(
     ext = file.content_type.split("/")[1].replace("jpeg", "jpg")
     filename = f"{current_user.id}.{ext}"
     dest = UPLOADS_DIR / filename
-    dest.write_bytes(contents)
+    await run_in_threadpool(dest.write_bytes, contents)
     base_url = str(request.base_url).rstrip("/")
-    current_user.profile_picture_url = f"{base_url}/uploads/avatars/{filename}"
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    user = await _own_row(current_user, db)
+    user.profile_picture_url = f"{base_url}/uploads/avatars/{filename}"
+    await db.commit()
+    auth_cache.invalidate_user(user.id)
+    await db.refresh(user)
+    return user
 
 
 @router.patch("/me/notification-preferences", response_model=UserResponse, summary="Update notification preferences")
 async def update_notification_preferences(
     body: NotificationPreferencesUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserResponse:
+    user = await _own_row(current_user, db)
     existing: dict = {}
-    if current_user.notification_preferences:
+    if user.notification_preferences:
         try:
-            existing = json.loads(current_user.notification_preferences)
+            existing = json.loads(user.notification_preferences)
         except (json.JSONDecodeError, TypeError):
             existing = {}
     updates = body.model_dump(exclude_unset=True)
     existing.update(updates)
-    current_user.notification_preferences = json.dumps(existing)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    user.notification_preferences = json.dumps(existing)
+    await db.commit()
+    auth_cache.invalidate_user(user.id)
+    await db.refresh(user)
+    return user
 
 
 @router.get("/me/loan-projection", response_model=LoanProjectionResponse, summary="Loan repayment projection")
 async def loan_projection(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_async),
 ) -> LoanProjectionResponse:
     if not current_user.total_loan_amount or not current_user.monthly_loan_payment:
         raise HTTPException(
@@ -157,7 +171,7 @@ async def loan_projection(
 )
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserResponse:
     """
     Create a new user with the following information:
@@ -186,13 +200,13 @@ async def create_user(
 
         # Add to database
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
 
         return db_user
 
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         # Email uniqueness violation
         if "email" in str(e.orig):
             raise HTTPException(
@@ -204,7 +218,7 @@ async def create_user(
             detail="Database integrity error"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating user: {str(e)}"
@@ -221,7 +235,7 @@ async def create_user(
 )
 async def get_user(
     user_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserResponse:
     """
     Retrieve user information by ID.
@@ -230,7 +244,7 @@ async def get_user(
 
     Returns the complete user profile including financial and student information.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
 
     if not user:
         raise HTTPException(
@@ -253,7 +267,7 @@ async def get_users(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     active_only: bool = Query(False, description="Filter for active users only"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[UserResponse]:
     """
     Retrieve all users with pagination.
@@ -264,14 +278,14 @@ async def get_users(
 
     Returns a list of user profiles.
     """
-    query = db.query(User)
+    query = select(User)
 
     # Filter by active status if requested
     if active_only:
-        query = query.filter(User.is_active == True)
+        query = query.where(User.is_active == True)
 
     # Apply pagination
-    users = query.offset(skip).limit(limit).all()
+    users = (await db.scalars(query.offset(skip).limit(limit))).all()
 
     return users
 
@@ -286,7 +300,7 @@ async def get_users(
 )
 async def get_user_by_email(
     email: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserResponse:
     """
     Retrieve user information by email address.
@@ -295,7 +309,7 @@ async def get_user_by_email(
 
     Returns the complete user profile.
     """
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
 
     if not user:
         raise HTTPException(
@@ -317,7 +331,7 @@ async def get_user_by_email(
 async def update_user(
     user_id: UUID,
     user_update: UserUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserResponse:
     """
     Update user information. Only provided fields will be updated.
@@ -328,7 +342,7 @@ async def update_user(
     Returns the updated user profile.
     """
     # Check if user exists
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
 
     if not db_user:
         raise HTTPException(
@@ -343,13 +357,14 @@ async def update_user(
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        auth_cache.invalidate_user(user_id)
+        await db.refresh(db_user)
 
         return db_user
 
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         if "email" in str(e.orig):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -360,7 +375,7 @@ async def update_user(
             detail="Database integrity error"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error updating user: {str(e)}"
@@ -377,7 +392,7 @@ async def update_user(
 )
 async def delete_user(
     user_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> None:
     """
     Delete a user account permanently.
@@ -386,7 +401,7 @@ async def delete_user(
 
     This action cannot be undone. Returns 204 No Content on success.
     """
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
 
     if not db_user:
         raise HTTPException(
@@ -395,11 +410,12 @@ async def delete_user(
         )
 
     try:
-        db.delete(db_user)
-        db.commit()
+        await db.delete(db_user)
+        await db.commit()
+        auth_cache.invalidate_user(user_id)
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting user: {str(e)}"
@@ -416,7 +432,7 @@ async def delete_user(
 )
 async def deactivate_user(
     user_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserResponse:
     """
     Deactivate a user account (soft delete).
@@ -425,7 +441,7 @@ async def deactivate_user(
 
     The account is marked as inactive but not deleted from the database.
     """
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
 
     if not db_user:
         raise HTTPException(
@@ -434,8 +450,9 @@ async def deactivate_user(
         )
 
     db_user.is_active = False
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    auth_cache.invalidate_user(user_id)
+    await db.refresh(db_user)
 
     return db_user
 
@@ -450,7 +467,7 @@ async def deactivate_user(
 )
 async def reactivate_user(
     user_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserResponse:
     """
     Reactivate a deactivated user account.
@@ -459,7 +476,7 @@ async def reactivate_user(
 
     Marks the account as active again.
     """
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
 
     if not db_user:
         raise HTTPException(
@@ -468,8 +485,9 @@ async def reactivate_user(
         )
 
     db_user.is_active = True
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    auth_cache.invalidate_user(user_id)
+    await db.refresh(db_user)
 
     return db_user
 
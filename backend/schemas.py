@@ -333,10 +333,18 @@ class TransactionResponse(BaseModel):
     receipt_url: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    change_version: int = 0
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class TransactionChanges(BaseModel):
+    version: int                        # pass back as ?since= on the next sync
+    has_more: bool                      # more changes after `version` — fetch again
+    changed: list[TransactionResponse]  # inserted or updated since `since`
+    deleted: list[UUID]                 # ids removed since `since`
+
+
 class TransactionSummary(BaseModel):
     total_income: Decimal
     total_expenses: Decimal
@@ -344,6 +352,7 @@ class TransactionSummary(BaseModel):
     by_category: dict
     period_start: date
     period_end: date
+    currency: str = "USD"  # every total above is in this currency
 
 
 # ==================== BUDGET SCHEMAS ====================
@@ -384,6 +393,10 @@ class BudgetResponse(BaseModel):
     updated_at: Optional[datetime] = None
     spent: Optional[Decimal] = None        # computed at query time
     utilization: Optional[float] = None   # 0.0 - 1.0+
+    # Set when ?currency= is passed: limit and spend converted for display
+    display_currency: Optional[str] = None
+    display_limit_amount: Optional[Decimal] = None
+    display_spent: Optional[Decimal] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -495,6 +508,7 @@ class WeeklyTransactionSummary(BaseModel):
     week_start: date
     week_end: date
     total: float
+    currency: str = "USD"
 
 
 # ==================== JOB SCHEMAS ====================
@@ -583,6 +597,7 @@ class NetSavingsResponse(BaseModel):
     net_savings: float
     month_income: float
     month_expenses: float
+    currency: str = "USD"
 
 
 # ==================== NOTIFICATION PREFERENCES SCHEMA ====================
@@ -0,0 +1,161 @@
+"""
+Backfill transactions.amount_in_usd from the historical daily rate table.
+
+    python -m scripts.backfill_usd [--all] [--batch-size 1000] [--sleep 0.1] [--restart]
+
+Walks transactions in primary-key order, converts each batch as one column
+with services.fx_history, and writes back only rows whose value changed. On
+PostgreSQL that is a single UPDATE ... FROM (VALUES ...) per batch.
+Updated rows take new change versions, so incrementally syncing clients
+pick them up. The write-back matches on the change_version read with the row,
+so a row edited by the app in the meantime is skipped, not overwritten with
+a value computed from its old amount. Users with updated expenses in the
+current budget windows get their alert state re-evaluated after each batch.
+
+By default only rows with a NULL amount_in_usd are visited; --all recomputes
+every row (e.g. after loading an older rate snapshot). Each batch commits on
+its own and the last processed id is saved to --checkpoint, so an
+interrupted run resumes where it stopped. --sleep pauses between batches to
+keep load on a live database down.
+"""
+import argparse
+import json
+import time
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+from uuid import UUID
+
+from sqlalchemy import Numeric, bindparam, column, func, select, update, values
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Transaction, TransactionTypeEnum
+from services import alert_state, budget_engine, change_log, fx_history
+
+_DEFAULT_CHECKPOINT = Path(__file__).parent / ".backfill_usd.checkpoint"
+
+
+def _write_back(db: Session, changed: list[dict]) -> int:
+    """Apply the batch to rows still at the change_version we read; returns how many were."""
+    if db.get_bind().dialect.name == "postgresql":
+        v = values(
+            column("id", Transaction.id.type),
+            column("seen", Transaction.change_version.type),
+            column("usd", Numeric(12, 2)),
+            column("version", Transaction.change_version.type),
+            name="v",
+        ).data([(r["id"], r["seen"], r["usd"], r["version"]) for r in changed])
+        return db.execute(
+            update(Transaction)
+            .where(Transaction.id == v.c.id, Transaction.change_version == v.c.seen)
+            .values(amount_in_usd=v.c.usd, change_version=v.c.version)
+        ).rowcount
+    table = Transaction.__table__
+    return db.execute(
+        update(table)
+        .where(table.c.id == bindparam("b_id"), table.c.change_version == bindparam("b_seen"))
+        .values(amount_in_usd=bindparam("b_usd"), change_version=bindparam("b_version")),
+        [{"b_id": r["id"], "b_seen": r["seen"], "b_usd": r["usd"], "b_version": r["version"]}
+         for r in changed],
+    ).rowcount
+
+
+def backfill(recompute_all: bool, batch_size: int, pause: float, checkpoint: Path, restart: bool) -> None:
+    after = None
+    if checkpoint.exists() and not restart:
+        state = json.loads(checkpoint.read_text())
+        if state.get("all") == recompute_all:
+            after = UUID(state["after"])
+            print(f"[backfill-usd] resuming after {after}", flush=True)
+
+    scope = [] if recompute_all else [Transaction.amount_in_usd.is_(None)]
+    db = SessionLocal()
+    try:
+        remaining = db.execute(
+            select(func.count()).select_from(Transaction).where(
+                *scope, *([Transaction.id > after] if after else [])
+            )
+        ).scalar_one()
+        print(f"[backfill-usd] {remaining} rows to visit", flush=True)
+
+        visited = updated = skipped = 0
+        started = time.monotonic()
+        while True:
+            stmt = (
+                select(Transaction.id, Transaction.user_id, Transaction.amount, Transaction.currency,
+                       Transaction.transaction_date, Transaction.amount_in_usd, Transaction.change_version,
+                       Transaction.type)
+                .where(*scope)
+                .order_by(Transaction.id)
+                .limit(batch_size)
+            )
+            if after is not None:
+                stmt = stmt.where(Transaction.id > after)
+            rows = db.execute(stmt).all()
+            if not rows:
+                break
+
+            usd = fx_history.usd_amounts(
+                [r.amount for r in rows], [r.currency for r in rows], [r.transaction_date for r in rows]
+            )
+            changed_rows = [
+                (r, new) for r, new in zip(rows, usd)
+                if r.amount_in_usd is None or Decimal(r.amount_in_usd) != new
+            ]
+            changed = [
+                {"id": r.id, "user_id": r.user_id, "seen": r.change_version, "usd": new}
+                for r, new in changed_rows
+            ]
+            written = 0
+            if changed:
+                by_user: dict = defaultdict(list)
+                for c in changed:
+                    by_user[c["user_id"]].append(c)
+                for user_id, items in by_user.items():
+                    first = change_log.reserve(db, user_id, len(items))
+                    for offset, item in enumerate(items):
+                        item["version"] = first + offset
+                written = _write_back(db, changed)
+            db.commit()
+
+            # Stored budget spend sums amount_in_usd, so re-evaluate where it moved
+            windows = budget_engine.current_windows()
+            for user_id in {
+                r.user_id for r, _ in changed_rows
+                if r.type == TransactionTypeEnum.EXPENSE
+                and r.transaction_date >= min(windows.month_start, windows.week_start)
+            }:
+                alert_state.refresh(db, user_id)
+
+            after = rows[-1].id
+            checkpoint.write_text(json.dumps({"after": str(after), "all": recompute_all}))
+            visited += len(rows)
+            updated += written
+            skipped += len(changed) - written
+            elapsed = time.monotonic() - started
+            rate = visited / elapsed if elapsed else 0.0
+            eta = (remaining - visited) / rate if rate else 0.0
+            print(
+                f"[backfill-usd] {visited}/{remaining} visited, {updated} updated, "
+                f"{skipped} changed meanwhile, {rate:.0f} rows/s, eta {eta:.0f}s",
+                flush=True,
+            )
+            if pause:
+                time.sleep(pause)
+    finally:
+        db.close()
+
+    checkpoint.unlink(missing_ok=True)
+    print(f"[backfill-usd] done: {visited} visited, {updated} updated, {skipped} changed meanwhile", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill transactions.amount_in_usd")
+    parser.add_argument("--all", action="store_true", help="recompute every row, not just NULLs")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--sleep", type=float, default=0.1, help="seconds to pause between batches")
+    parser.add_argument("--checkpoint", type=Path, default=_DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="ignore any saved checkpoint")
+    args = parser.parse_args()
+    backfill(args.all, args.batch_size, args.sleep, args.checkpoint, args.restart)
@@ -0,0 +1,32 @@
+"""
+Pick BCRYPT_ROUNDS for this machine.
+
+    python -m scripts.calibrate_bcrypt [--budget-ms 250]
+
+Benchmarks bcrypt from cost 10 upwards and prints the highest cost whose
+hash time fits the budget. Run it on production hardware, then set
+BCRYPT_ROUNDS; existing users are re-hashed on their next sign-in.
+"""
+import argparse
+
+from services import passwords
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the bcrypt cost to a latency budget")
+    parser.add_argument("--budget-ms", type=float, default=250.0,
+                        help="target time for one hash in milliseconds (default 250)")
+    args = parser.parse_args()
+
+    chosen, measured = passwords.calibrate(args.budget_ms)
+    for rounds, ms in measured.items():
+        marker = "  <- recommended" if rounds == chosen else ""
+        print(f"[bcrypt] cost {rounds}: {ms:.0f} ms{marker}", flush=True)
+    if measured[passwords.MIN_ROUNDS] > args.budget_ms:
+        print(f"[bcrypt] even cost {passwords.MIN_ROUNDS} exceeds {args.budget_ms:.0f} ms; "
+              f"keeping the minimum", flush=True)
+    print(f"[bcrypt] current BCRYPT_ROUNDS={passwords.ROUNDS}; set BCRYPT_ROUNDS={chosen}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Local SMTP stand-in for development and tests.
+
+    python -m scripts.debug_smtp [--port 1025]
+
+Accepts every message and prints it instead of delivering it. Point the app
+at it with SMTP_DEBUG=true SMTP_HOST=localhost SMTP_PORT=1025. Supports
+only the subset of SMTP the mailer uses (EHLO/HELO, MAIL, RCPT, DATA, NOOP,
+RSET, QUIT), with no TLS and no auth.
+"""
+import argparse
+import asyncio
+from email import message_from_bytes
+from email.header import decode_header, make_header
+
+
+async def _reply(writer: asyncio.StreamWriter, line: str) -> None:
+    writer.write(f"{line}\r\n".encode())
+    await writer.drain()
+
+
+async def _session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    peer = writer.get_extra_info("peername")
+    await _reply(writer, "220 debug-smtp ready")
+    sender, recipients = None, []
+    try:
+        while line := await reader.readline():
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                await _reply(writer, "250 debug-smtp")
+            elif verb == "MAIL":
+                sender, recipients = command[10:].strip(), []
+                await _reply(writer, "250 OK")
+            elif verb == "RCPT":
+                recipients.append(command[8:].strip())
+                await _reply(writer, "250 OK")
+            elif verb == "DATA":
+                await _reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while (chunk := await reader.readline()) not in (b".\r\n", b".\n", b""):
+                    lines.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                message = message_from_bytes(b"".join(lines))
+                print(f"[debug-smtp] {peer}: {sender} -> {', '.join(recipients)}", flush=True)
+                print(f"[debug-smtp] Subject: {make_header(decode_header(message['Subject'] or ''))}", flush=True)
+                await _reply(writer, "250 OK: queued")
+            elif verb in ("NOOP", "RSET"):
+                await _reply(writer, "250 OK")
+            elif verb == "QUIT":
+                await _reply(writer, "221 Bye")
+                break
+            else:
+                await _reply(writer, "502 Command not implemented")
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(_session, host, port)
+    print(f"[debug-smtp] listening on {host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print outgoing mail instead of sending it")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,33 @@
+"""
+Load a historical exchange-rate snapshot into fx_daily_rates.
+
+    python -m scripts.load_fx_history rates.csv [more.json ...]
+
+Rates are units of currency per 1 USD; see services/fx_history.read_snapshot
+for the accepted CSV and JSON layouts. Re-running with the same file is safe
+(rows are upserted on (currency, rate_date)). Running app processes pick up
+the new rates within FX_HISTORY_RELOAD_SECONDS.
+"""
+import sys
+from pathlib import Path
+
+from database import SessionLocal
+from services import fx_history
+
+
+def load(paths: list[str]) -> None:
+    db = SessionLocal()
+    try:
+        for p in paths:
+            count = fx_history.upsert(db, fx_history.read_snapshot(Path(p)))
+            db.commit()
+            print(f"[fx-history] {p}: {count} rates loaded", flush=True)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    load(sys.argv[1:])
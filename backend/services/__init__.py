@@ -0,0 +1,3 @@
+"""
+Shared services for Financial Planner
+"""
\ No newline at end of file
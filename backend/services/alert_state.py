@@ -0,0 +1,232 @@
+"""
+Materialized budget alert state.
+
+Transaction writes call `apply` inside their own database transaction with the
+expense amounts they add or remove. Only the active budgets on those
+categories are touched, and each stored `spent` moves by the delta; categories
+without a budget cost one small lookup. Budget writes (and period roll-over)
+use `refresh`, which re-evaluates every active budget of the user.
+
+State rows are created with INSERT ... ON CONFLICT DO NOTHING and then locked,
+so concurrent first writes for one user never collide on uq_alert_state_budget.
+`current` serves GET /alerts from the stored rows.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from models import AlertLevelEnum, AlertState, Budget, BudgetPeriodEnum, TransactionTypeEnum
+from services import budget_engine, change_feed
+
+APPROACHING_THRESHOLD = Decimal("0.8")
+EXCEEDED_THRESHOLD = Decimal("1.0")
+
+
+def expense_deltas(transactions: Iterable, sign: int = 1) -> list[tuple]:
+    """
+    (category, transaction_date, currency, amount, USD amount) for the expenses
+    among `transactions` (ORM objects or rows); pass sign=-1 for removed ones.
+    """
+    out = []
+    for tx in transactions:
+        if tx.type != TransactionTypeEnum.EXPENSE:
+            continue
+        usd = tx.amount_in_usd if tx.amount_in_usd is not None else tx.amount
+        out.append((
+            tx.category, tx.transaction_date, tx.currency,
+            sign * Decimal(str(tx.amount)), sign * Decimal(str(usd)),
+        ))
+    return out
+
+
+def apply(
+    db: Session,
+    user_id: UUID,
+    deltas: Iterable[tuple],
+    today: Optional[date] = None,
+) -> bool:
+    """
+    Fold expense deltas (see `expense_deltas`) into the user's alert state, in
+    the caller's transaction; nothing is committed. Returns True when an alert
+    was raised or cleared, to be passed to `notify` after the commit.
+    """
+    windows = budget_engine.current_windows(today)
+    # (category, currency) -> [native, usd], per window
+    month: dict[tuple, list[Decimal]] = {}
+    week: dict[tuple, list[Decimal]] = {}
+    for category, tx_date, currency, amount, usd in deltas:
+        # Same windows as budget_engine.evaluate
+        for window, inside in (
+            (month, windows.month_start <= tx_date < windows.month_end),
+            (week, tx_date >= windows.week_start),
+        ):
+            if inside:
+                total = window.setdefault((category, currency), [Decimal("0"), Decimal("0")])
+                total[0] += amount
+                total[1] += usd
+    categories = {c for (c, _), (native, _) in [*month.items(), *week.items()] if native}
+    if not categories:
+        return False
+
+    budgets = (
+        db.query(Budget)
+        .filter(Budget.user_id == user_id, Budget.is_active == True, Budget.category.in_(categories))
+        .order_by(Budget.id)
+        .all()
+    )
+    if not budgets:
+        return False
+
+    db.flush()  # evaluate() below must see the caller's pending rows
+    states, created = _lock_states(db, user_id, budgets, windows)
+    before = _raised(states.values())
+    now = datetime.now(timezone.utc)
+    for budget in budgets:
+        state = states[budget.id]
+        period_start = _period_start(budget.period, windows)
+        if budget.id in created or state.period_start != period_start:
+            # No usable running total — start from the full evaluation
+            spent = budget_engine.evaluate(db, user_id, budget_id=budget.id, today=today)[0][1]
+        else:
+            window = month if budget.period == BudgetPeriodEnum.MONTHLY else week
+            groups = [(cur, t) for (cat, cur), t in window.items() if cat == budget.category and t[0]]
+            if not groups:
+                continue
+            spent = Decimal(str(state.spent)) + sum(
+                (budget_engine.in_budget_currency(budget.currency, cur, native, usd, today or date.today())
+                 for cur, (native, usd) in groups),
+                Decimal("0"),
+            )
+        _set(state, budget, max(spent, Decimal("0")), period_start, now)
+    return _raised(states.values()) != before
+
+
+def notify(user_id: UUID, changed: bool) -> None:
+    """Publish the alerts change event once the write that caused it is committed."""
+    if changed:
+        change_feed.publish(user_id, "alerts", "changed")
+
+
+def refresh(db: Session, user_id: UUID, today: Optional[date] = None) -> list[AlertState]:
+    """Recompute and store alert state for every active budget of the user, then commit."""
+    windows = budget_engine.current_windows(today)
+    now = datetime.now(timezone.utc)
+    evaluated = budget_engine.evaluate(db, user_id, active_only=True, today=today)
+    states, _ = _lock_states(db, user_id, [b for b, _ in evaluated], windows)
+    stale = db.query(AlertState).filter(
+        AlertState.user_id == user_id, AlertState.budget_id.notin_(list(states))
+    ).all()
+    before = _raised([*states.values(), *stale])
+
+    for budget, spent in evaluated:
+        _set(states[budget.id], budget, spent, _period_start(budget.period, windows), now)
+    # Budgets that were deleted or deactivated
+    for state in stale:
+        db.delete(state)
+    changed = _raised(states.values()) != before
+    db.commit()
+    notify(user_id, changed)
+    return [states[b.id] for b, _ in evaluated]
+
+
+def current(db: Session, user_id: UUID, today: Optional[date] = None) -> list[AlertState]:
+    """
+    Return the user's stored alert state, refreshing first if any row belongs
+    to a past period (or a user with budgets has no state yet).
+    """
+    states = db.query(AlertState).filter(AlertState.user_id == user_id).all()
+    windows = budget_engine.current_windows(today)
+    if any(s.period_start != _period_start(s.period, windows) for s in states):
+        return refresh(db, user_id, today)
+    if not states and db.query(Budget.id).filter(Budget.user_id == user_id, Budget.is_active == True).first():
+        return refresh(db, user_id, today)
+    return states
+
+
+def _lock_states(
+    db: Session, user_id: UUID, budgets: list[Budget], windows: budget_engine.Windows
+) -> tuple[dict[UUID, AlertState], set[UUID]]:
+    """
+    Ensure a state row exists for each budget and lock them (in budget id
+    order). Returns ({budget_id: state}, ids of rows created just now).
+    """
+    if not budgets:
+        return {}, set()
+    table = AlertState.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        raise RuntimeError(f"alert state: unsupported database dialect {dialect!r}")
+    stmt = upsert(table).values([
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "budget_id": b.id,
+            "category": b.category,
+            "period": b.period,
+            "period_start": _period_start(b.period, windows),
+            "spent": 0,
+            "utilization": 0,
+            "level": AlertLevelEnum.NONE,
+        }
+        for b in budgets
+    ]).on_conflict_do_nothing(index_elements=[table.c.budget_id]).returning(table.c.budget_id)
+    created = set(db.execute(stmt).scalars())
+
+    rows = (
+        db.query(AlertState)
+        .filter(AlertState.budget_id.in_([b.id for b in budgets]))
+        .order_by(AlertState.budget_id)
+        .with_for_update()
+        .populate_existing()
+        .all()
+    )
+    return {s.budget_id: s for s in rows}, created
+
+
+def _set(state: AlertState, budget: Budget, spent: Decimal, period_start: date, now: datetime) -> None:
+    if state.period_start != period_start:
+        # New period — earlier crossings no longer apply
+        state.approaching_at = state.exceeded_at = None
+    state.category = budget.category
+    state.period = budget.period
+    state.period_start = period_start
+    state.spent = spent
+
+    utilization = Decimal(str(budget_engine.utilization(spent, budget.limit_amount)))
+    state.utilization = utilization
+    state.approaching_at = _crossed(utilization, APPROACHING_THRESHOLD, state.approaching_at, now)
+    state.exceeded_at = _crossed(utilization, EXCEEDED_THRESHOLD, state.exceeded_at, now)
+    if utilization >= EXCEEDED_THRESHOLD:
+        state.level = AlertLevelEnum.BUDGET_EXCEEDED
+    elif utilization >= APPROACHING_THRESHOLD:
+        state.level = AlertLevelEnum.APPROACHING_LIMIT
+    else:
+        state.level = AlertLevelEnum.NONE
+
+
+def _raised(states) -> dict:
+    """{budget_id: level} for budgets that currently have an alert."""
+    return {s.budget_id: s.level for s in states if s.level != AlertLevelEnum.NONE}
+
+
+def _period_start(period: BudgetPeriodEnum, windows: budget_engine.Windows) -> date:
+    return windows.month_start if period == BudgetPeriodEnum.MONTHLY else windows.week_start
+
+
+def _crossed(
+    utilization: Decimal, threshold: Decimal, since: Optional[datetime], now: datetime
+) -> Optional[datetime]:
+    """Keep the first-crossed time while above the threshold; clear it once back below."""
+    if utilization < threshold:
+        return None
+    return since or now
@@ -0,0 +1,162 @@
+"""
+In-process cache for request authentication.
+
+`routers.auth.user_from_token` consults three structures before touching the
+database:
+
+- verified jtis: a token whose session row was checked within
+  AUTH_CACHE_TTL_SECONDS is trusted without another UserSession lookup
+- revoked jtis: filled by logout in this process, and every
+  AUTH_REVOCATION_SYNC_SECONDS from user_sessions rows revoked elsewhere
+  (one small query per interval, not per request); entries drop out once
+  the token would have expired anyway
+- users: an LRU of detached User snapshots, also capped at
+  AUTH_CACHE_TTL_SECONDS and dropped by `invalidate_user` on profile writes;
+  a snapshot older than AUTH_REVOCATION_SYNC_SECONDS needs its is_active
+  re-checked (`user_check_due`), since deactivation or deletion may have
+  happened on another worker
+
+So a warm request does no auth queries, and a logout, deactivation or account
+deletion on another worker is honoured within AUTH_REVOCATION_SYNC_SECONDS.
+
+Cached users are transient copies shared between requests: read them, but
+load the row in your own session before changing it.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import inspect, select
+
+from models import User, UserSession
+
+TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+REVOCATION_SYNC_SECONDS = float(os.getenv("AUTH_REVOCATION_SYNC_SECONDS", "30"))
+MAX_TOKENS = int(os.getenv("AUTH_CACHE_MAX_TOKENS", "10000"))
+MAX_USERS = int(os.getenv("AUTH_CACHE_MAX_USERS", "1024"))
+
+_lock = threading.Lock()
+_verified: OrderedDict[str, float] = OrderedDict()        # jti -> monotonic deadline
+_revoked: dict[str, float] = {}                           # jti -> token exp (epoch seconds)
+_users: OrderedDict[UUID, tuple[User, float]] = OrderedDict()  # user id -> (snapshot, deadline)
+_user_checks: dict[UUID, float] = {}                      # user id -> next is_active re-check (monotonic)
+_synced_at: Optional[datetime] = None                      # last revocation sync (app clock)
+_next_sync = 0.0
+
+
+# ── tokens ────────────────────────────────────
+
+def is_verified(jti: str) -> bool:
+    with _lock:
+        deadline = _verified.get(jti)
+        if deadline is None:
+            return False
+        if deadline < time.monotonic():
+            del _verified[jti]
+            return False
+        return True
+
+
+def mark_verified(jti: str) -> None:
+    with _lock:
+        _verified[jti] = time.monotonic() + TTL_SECONDS
+        _verified.move_to_end(jti)
+        while len(_verified) > MAX_TOKENS:
+            _verified.popitem(last=False)
+
+
+def is_revoked(jti: str) -> bool:
+    with _lock:
+        return jti in _revoked
+
+
+def revoke(jti: str, expires_at: Optional[datetime] = None) -> None:
+    exp = expires_at.timestamp() if expires_at else time.time() + 86400
+    with _lock:
+        _revoked[jti] = exp
+        _verified.pop(jti, None)
+
+
+# ── revocation sync ───────────────────────────
+
+def revocation_sync_due() -> bool:
+    return time.monotonic() >= _next_sync
+
+
+def revocations_query():
+    """Sessions revoked since the last sync (all of them on the first run that are still valid)."""
+    stmt = select(UserSession.jti, UserSession.expires_at).where(UserSession.is_revoked == True)
+    if _synced_at is not None:
+        stmt = stmt.where(UserSession.revoked_at >= _synced_at)
+    else:
+        stmt = stmt.where(UserSession.expires_at > datetime.now(timezone.utc))
+    return stmt
+
+
+def apply_revocations(rows: Iterable, started_at: datetime) -> None:
+    """Record rows from `revocations_query()`; `started_at` is when that query was built."""
+    global _synced_at, _next_sync
+    for jti, expires_at in rows:
+        revoke(jti, expires_at)
+    now = time.time()
+    with _lock:
+        for jti in [j for j, exp in _revoked.items() if exp < now]:
+            del _revoked[jti]
+        _synced_at = started_at - timedelta(seconds=5)  # overlap for commits in flight
+        _next_sync = time.monotonic() + REVOCATION_SYNC_SECONDS
+
+
+# ── users ─────────────────────────────────────
+
+def get_user(user_id: UUID) -> Optional[User]:
+    with _lock:
+        hit = _users.get(user_id)
+        if hit is None:
+            return None
+        user, deadline = hit
+        if deadline < time.monotonic():
+            del _users[user_id]
+            _user_checks.pop(user_id, None)
+            return None
+        _users.move_to_end(user_id)
+        return user
+
+
+def user_check_due(user_id: UUID) -> bool:
+    """
+    True at most once per AUTH_REVOCATION_SYNC_SECONDS per cached user: the
+    caller should confirm the user still exists and is active, and
+    `invalidate_user` if not.
+    """
+    now = time.monotonic()
+    with _lock:
+        if _user_checks.get(user_id, 0.0) > now:
+            return False
+        _user_checks[user_id] = now + REVOCATION_SYNC_SECONDS
+        return True
+
+
+def put_user(user: User) -> User:
+    """Cache a detached copy of `user` and return it."""
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    now = time.monotonic()
+    with _lock:
+        _users[snapshot.id] = (snapshot, now + TTL_SECONDS)
+        _users.move_to_end(snapshot.id)
+        _user_checks[snapshot.id] = now + REVOCATION_SYNC_SECONDS
+        while len(_users) > MAX_USERS:
+            evicted, _ = _users.popitem(last=False)
+            _user_checks.pop(evicted, None)
+    return snapshot
+
+
+def invalidate_user(user_id: UUID) -> None:
+    with _lock:
+        _users.pop(user_id, None)
+        _user_checks.pop(user_id, None)
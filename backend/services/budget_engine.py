@@ -0,0 +1,137 @@
+"""
+Budget evaluation engine.
+
+Computes current-period spend for all of a user's budgets in one query: the
+user's expenses since the earliest active window are aggregated per category
+with conditional sums for the monthly and weekly windows, and that grouped
+subquery is outer-joined to the budgets on category. The date predicate is a
+plain range on (user_id, transaction_date), so it is served by
+ix_transactions_user_date.
+
+Spend is grouped by currency as well. Expenses in the budget's own currency
+add up natively, so a single-currency user's `spent` is exactly the sum of
+amounts. Other currencies are summed in USD (amount_in_usd, converted at each
+row's date by fx_history) and brought into the budget's currency at the
+fx_history rate for today.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from models import Budget, BudgetPeriodEnum, Transaction, TransactionTypeEnum
+from services import fx_history
+
+_CENT = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class Windows:
+    month_start: date
+    month_end: date  # exclusive
+    week_start: date  # Monday of the current week
+
+
+def current_windows(today: Optional[date] = None) -> Windows:
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    return Windows(
+        month_start=month_start,
+        month_end=(month_start + timedelta(days=32)).replace(day=1),
+        week_start=today - timedelta(days=today.weekday()),
+    )
+
+
+def evaluate(
+    db: Session,
+    user_id: UUID,
+    active_only: bool = False,
+    budget_id: Optional[UUID] = None,
+    today: Optional[date] = None,
+) -> list[tuple[Budget, Decimal]]:
+    """
+    Return [(budget, spent)] for the user's budgets, ordered by category.
+
+    `spent` is the current-period expense total in the budget's currency.
+    """
+    w = current_windows(today)
+    amount_usd = func.coalesce(Transaction.amount_in_usd, Transaction.amount)
+    in_month = and_(Transaction.transaction_date >= w.month_start, Transaction.transaction_date < w.month_end)
+    in_week = Transaction.transaction_date >= w.week_start
+    spend = (
+        db.query(
+            Transaction.category.label("category"),
+            Transaction.currency.label("currency"),
+            func.sum(case((in_month, Transaction.amount))).label("month_native"),
+            func.sum(case((in_month, amount_usd))).label("month_usd"),
+            func.sum(case((in_week, Transaction.amount))).label("week_native"),
+            func.sum(case((in_week, amount_usd))).label("week_usd"),
+        )
+        .filter(
+            Transaction.user_id == user_id,
+            Transaction.type == TransactionTypeEnum.EXPENSE,
+            Transaction.transaction_date >= min(w.month_start, w.week_start),
+        )
+        .group_by(Transaction.category, Transaction.currency)
+        .subquery()
+    )
+
+    # One row per (budget, expense currency) — budgets with no spend get one all-NULL row
+    q = (
+        db.query(
+            Budget, spend.c.currency, spend.c.month_native, spend.c.month_usd,
+            spend.c.week_native, spend.c.week_usd,
+        )
+        .outerjoin(spend, spend.c.category == Budget.category)
+        .filter(Budget.user_id == user_id)
+    )
+    if active_only:
+        q = q.filter(Budget.is_active == True)
+    if budget_id is not None:
+        q = q.filter(Budget.id == budget_id)
+
+    totals: dict[UUID, tuple[Budget, Decimal]] = {}
+    on = today or date.today()
+    for budget, currency, month_native, month_usd, week_native, week_usd in q.order_by(Budget.category, Budget.id):
+        _, spent = totals.get(budget.id, (budget, Decimal("0")))
+        if currency is not None:
+            monthly = budget.period == BudgetPeriodEnum.MONTHLY
+            spent += in_budget_currency(
+                budget.currency, currency,
+                month_native if monthly else week_native,
+                month_usd if monthly else week_usd,
+                on,
+            )
+        totals[budget.id] = (budget, spent)
+    return list(totals.values())
+
+
+def in_budget_currency(budget_currency, currency, native, usd, on: date) -> Decimal:
+    """
+    An expense total (`native` in `currency`, `usd` its amount_in_usd) in the
+    budget's currency: exact when the currencies match, otherwise the USD value
+    converted at the fx_history rate for `on`, the source amount_in_usd uses.
+    """
+    if currency == budget_currency:
+        return Decimal(str(native or 0)).quantize(_CENT)
+    return from_usd(usd, budget_currency, on)
+
+
+def from_usd(amount_usd, currency, on: Optional[date] = None) -> Decimal:
+    """Convert a USD total into `currency` at the fx_history rate for `on` (default today)."""
+    if not amount_usd:
+        return Decimal("0")
+    code = currency.value if hasattr(currency, "value") else str(currency)
+    rate = fx_history.table().rates([code], [on or date.today()])[0]
+    return (Decimal(str(amount_usd)) * Decimal(repr(float(rate)))).quantize(_CENT)
+
+
+def utilization(spent: Decimal, limit_amount) -> float:
+    limit = Decimal(str(limit_amount))
+    return round(float(spent / limit), 4) if limit > 0 else 0.0
@@ -0,0 +1,183 @@
+"""
+Bulkhead thread pools — one bounded executor per workload class.
+
+    CPU    pandas parsing, forecast inference           (BULKHEAD_CPU_*)
+    HASH   bcrypt hashing / verification                 (BULKHEAD_HASH_*)
+    LLM    Anthropic calls                               (BULKHEAD_LLM_*)
+    EMAIL  SMTP sends by the outbox worker               (BULKHEAD_EMAIL_*)
+    DB     FastAPI's default threadpool, which runs every sync `def` endpoint.
+           With heavy steps moved to the pools above it only serves CRUD;
+           it is sized to the DB connection pool (DB_THREADS).
+
+Each pool admits at most `workers + queue` calls. Past that, `run` / `call`
+raise 503 with Retry-After right away instead of queueing without bound.
+
+The DB threadpool belongs to anyio and is also used by other callers (SSE
+auth, the mailer, sync dependencies), so it can't reject work itself. Instead
+the app-wide `admit_db` dependency admits at most DB_THREADS + DB_QUEUE
+requests to sync endpoints at once and answers the rest with the same 503.
+Async endpoints are not gated.
+
+`stats()` reports running, queued, rejected and queue wait per pool for
+GET /api/v1/health/pools.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+import anyio.to_thread
+from fastapi import HTTPException, Request, status
+
+import database
+
+T = TypeVar("T")
+
+_WAIT_SAMPLES = 200
+
+
+class Gate:
+    """Counts calls in flight and rejects (503) past `capacity`."""
+
+    def __init__(self, name: str, capacity: int) -> None:
+        self.name = name
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"The server is busy ({self.name}). Please try again in a moment.",
+                    headers={"Retry-After": "5"},
+                )
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+
+class Bulkhead(Gate):
+    def __init__(self, name: str, workers: int, queue: int) -> None:
+        super().__init__(name, workers + queue)
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-pool")
+        self._running = 0
+        self._completed = 0
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def _wrap(self, fn: Callable[..., T], args: tuple, kwargs: dict) -> Callable[[], T]:
+        enqueued = time.monotonic()
+
+        def task() -> T:
+            with self._lock:
+                self._running += 1
+                self._waits.append(time.monotonic() - enqueued)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._in_flight -= 1
+                    self._completed += 1
+
+        return task
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn` on this pool from async code; 503 if the pool is saturated."""
+        self._admit()
+        task = self._wrap(fn, args, kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn` on this pool from a worker thread and wait for it; 503 if saturated."""
+        self._admit()
+        return self._executor.submit(self._wrap(fn, args, kwargs)).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            running, in_flight = self._running, self._in_flight
+            completed, rejected = self._completed, self._rejected
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "running": running,
+            "queued": in_flight - running,
+            "completed": completed,
+            "rejected": rejected,
+            "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+            "wait_ms_p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+        }
+
+
+def _env(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+_cores = os.cpu_count() or 2
+
+CPU = Bulkhead("cpu", _env("BULKHEAD_CPU_WORKERS", _cores), _env("BULKHEAD_CPU_QUEUE", _cores * 2))
+HASH = Bulkhead("hash", _env("BULKHEAD_HASH_WORKERS", _cores), _env("BULKHEAD_HASH_QUEUE", _cores * 8))
+LLM = Bulkhead("llm", _env("BULKHEAD_LLM_WORKERS", 8), _env("BULKHEAD_LLM_QUEUE", 16))
+EMAIL = Bulkhead("email", _env("BULKHEAD_EMAIL_WORKERS", 2), _env("BULKHEAD_EMAIL_QUEUE", 50))
+
+DB_THREADS = _env("DB_THREADS", database.POOL_SIZE + database.MAX_OVERFLOW)
+DB = Gate("db", DB_THREADS + _env("DB_QUEUE", DB_THREADS * 2))
+
+
+def configure_db_threads() -> None:
+    """Size the default threadpool (sync endpoints) to the DB pool. Call from the event loop."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = DB_THREADS
+
+
+async def admit_db(request: Request):
+    """
+    App-wide dependency: requests to sync endpoints hold a DB gate slot until
+    they finish, or get a 503 when it is full. Being async, it runs on the
+    event loop before any threadpool work for the request is queued.
+    """
+    if asyncio.iscoroutinefunction(request.scope.get("endpoint")):
+        yield
+        return
+    DB._admit()
+    try:
+        yield
+    finally:
+        DB._release()
+
+
+def _db_stats() -> dict:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    s = limiter.statistics()
+    with DB._lock:
+        admitted, rejected = DB._in_flight, DB._rejected
+    return {
+        "workers": int(limiter.total_tokens),
+        "capacity": DB.capacity,
+        "running": s.borrowed_tokens,
+        "queued": s.tasks_waiting,
+        "admitted": admitted,
+        "rejected": rejected,
+    }
+
+
+def stats() -> dict:
+    return {
+        "cpu": CPU.stats(),
+        "hash": HASH.stats(),
+        "llm": LLM.stats(),
+        "email": EMAIL.stats(),
+        "db": _db_stats(),
+    }
@@ -0,0 +1,133 @@
+"""
+Keyword-based category inference shared by imports and receipt uploads.
+
+CATEGORY_KEYWORDS is the single keyword table. It is compiled once, at import
+time, into an Aho-Corasick automaton, so classifying a description costs one
+pass over its characters no matter how many merchant patterns the table holds.
+
+Matching is case-insensitive substring matching. When several keywords match,
+the longest keyword wins ("booking.com" beats "book", "ubereats" beats "uber");
+ties go to the category listed first below.
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable, Optional
+
+CATEGORY_KEYWORDS: dict[str, list[str]] = {
+    "HOUSING":        ["rent", "lease", "apartment", "housing", "dorm", "landlord"],
+    "FOOD":           ["grocery", "groceries", "supermarket", "restaurant", "cafe",
+                       "coffee", "food", "dining", "meal", "doordash", "ubereats",
+                       "grubhub", "chipotle", "mcdonald", "subway", "pizza", "starbucks",
+                       "burger", "sushi", "boba", "safeway", "trader joe", "aldi",
+                       "walmart food"],
+    "TRANSPORTATION": ["uber", "lyft", "bus", "metro", "transit", "gas", "fuel",
+                       "parking", "transport", "train", "amtrak", "rideshare", "bart", "mta"],
+    "EDUCATION":      ["tuition", "university", "college", "textbook", "book",
+                       "course", "library", "school", "exam", "registration", "chegg",
+                       "udemy", "coursera", "amazon books"],
+    "HEALTHCARE":     ["pharmacy", "doctor", "hospital", "clinic", "medical",
+                       "dental", "health", "insurance", "prescription", "cvs", "walgreens"],
+    "ENTERTAINMENT":  ["netflix", "spotify", "hulu", "youtube", "movie", "cinema",
+                       "theater", "concert", "game", "steam", "playstation", "disney", "ticket"],
+    "SHOPPING":       ["amazon", "target", "walmart", "mall", "store", "shop",
+                       "clothing", "fashion", "ebay", "etsy", "best buy", "h&m", "zara"],
+    "UTILITIES":      ["electric", "electricity", "water", "internet", "wifi",
+                       "phone", "mobile", "utility", "at&t", "verizon", "t-mobile", "comcast"],
+    "TRAVEL":         ["flight", "airline", "hotel", "airbnb", "travel", "trip",
+                       "vacation", "delta", "united", "american airlines", "booking.com",
+                       "booking", "expedia"],
+    "SALARY":         ["salary", "payroll", "wage", "paycheck", "direct deposit"],
+    "SCHOLARSHIP":    ["scholarship", "grant", "fellowship", "financial aid"],
+    "STIPEND":        ["stipend", "ta stipend", "ra stipend", "teaching assistant",
+                       "research assistant"],
+    "FAMILY_SUPPORT": ["family", "parents", "wire transfer", "remittance", "zelle",
+                       "venmo", "transfer from"],
+    "PERSONAL_CARE":  ["gym", "fitness", "workout", "yoga", "pilates", "crossfit",
+                       "personal trainer", "swimming", "haircut", "salon", "spa",
+                       "barber", "cosmetics", "hygiene", "laundry", "detergent"],
+    "FREELANCE":      ["freelance", "gig", "contract work", "side hustle", "consulting",
+                       "commission", "client payment"],
+}
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton mapping text to the best-matching category."""
+
+    def __init__(self, table: dict[str, list[str]]) -> None:
+        # Node 0 is the root. _best[n] is the winning (len, -priority, category)
+        # among every keyword ending at n or at any node on its failure chain.
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._best: list[Optional[tuple[int, int, str]]] = [None]
+
+        for priority, (category, keywords) in enumerate(table.items()):
+            for kw in keywords:
+                node = 0
+                for ch in kw.lower():
+                    nxt = self._goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[node][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._best.append(None)
+                    node = nxt
+                self._best[node] = _better(self._best[node], (len(kw), -priority, category))
+
+        # Breadth-first so every failure target is finalised before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._best[child] = _better(self._best[child], self._best[self._fail[child]])
+                queue.append(child)
+
+    def classify(self, text: Optional[str]) -> Optional[str]:
+        """Return the category name for `text`, or None if no keyword occurs in it."""
+        if not text:
+            return None
+        goto, fail, best_at = self._goto, self._fail, self._best
+        node = 0
+        best: Optional[tuple[int, int, str]] = None
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if best_at[node] is not None:
+                best = _better(best, best_at[node])
+        return best[2] if best else None
+
+    def classify_many(self, texts: Iterable[Optional[str]]) -> list[Optional[str]]:
+        """Classify a whole column; repeated descriptions are only scanned once."""
+        seen: dict[str, Optional[str]] = {}
+        out: list[Optional[str]] = []
+        for text in texts:
+            if not isinstance(text, str) or not text:
+                out.append(None)
+                continue
+            if text not in seen:
+                seen[text] = self.classify(text)
+            out.append(seen[text])
+        return out
+
+
+def _better(
+    a: Optional[tuple[int, int, str]], b: Optional[tuple[int, int, str]]
+) -> Optional[tuple[int, int, str]]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if a[:2] >= b[:2] else b
+
+
+MATCHER = KeywordMatcher(CATEGORY_KEYWORDS)
+
+classify = MATCHER.classify
+classify_many = MATCHER.classify_many
@@ -0,0 +1,74 @@
+"""
+Shared merchant → category memo.
+
+Descriptions are normalized (case, store numbers, punctuation) so variants
+like "STARBUCKS #1234" and "Starbucks 0987" share one entry. Imports look
+keys up here before calling the LLM and write new classifications back.
+"""
+from __future__ import annotations
+
+import re
+
+from sqlalchemy.orm import Session
+
+from models import CategoryMemo, CategoryEnum
+
+_DIGITS_RE = re.compile(r"[#*]?\d[\d\-/.:*]*")
+_PUNCT_RE = re.compile(r"[^a-z&'\s]+")
+_SPACE_RE = re.compile(r"\s+")
+_MAX_KEY = 500
+
+
+def normalize(text: str) -> str:
+    """Reduce a description to its merchant-identifying words ('' if none remain)."""
+    s = _DIGITS_RE.sub(" ", text.lower())
+    s = _PUNCT_RE.sub(" ", s)
+    return _SPACE_RE.sub(" ", s).strip()[:_MAX_KEY]
+
+
+def lookup(db: Session, keys: list[str]) -> dict[str, dict]:
+    """Return {key: {"category", "description"?}} for every memoized key."""
+    keys = [k for k in set(keys) if k]
+    if not keys:
+        return {}
+    rows = db.query(CategoryMemo).filter(CategoryMemo.key.in_(keys)).all()
+    out: dict[str, dict] = {}
+    for r in rows:
+        entry: dict = {"category": r.category.value}
+        if r.description:
+            entry["description"] = r.description
+        out[r.key] = entry
+    return out
+
+
+def remember(db: Session, entries: dict[str, dict]) -> None:
+    """
+    Upsert classifications into the memo and commit them.
+
+    Uses its own session on the same bind so memo writes persist independently
+    of (and never prematurely commit) the caller's import transaction.
+    """
+    entries = {k: v for k, v in entries.items() if k}
+    if not entries:
+        return
+    values = [
+        {"key": k, "category": CategoryEnum(v["category"]), "description": v.get("description")}
+        for k, v in entries.items()
+    ]
+    with Session(bind=db.get_bind()) as memo_db:
+        if memo_db.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+            stmt = pg_insert(CategoryMemo.__table__).values(values)
+            memo_db.execute(stmt.on_conflict_do_update(
+                constraint="uq_category_memo_key",
+                set_={"category": stmt.excluded.category, "description": stmt.excluded.description},
+            ))
+        else:
+            existing = {r.key: r for r in memo_db.query(CategoryMemo).filter(CategoryMemo.key.in_(list(entries)))}
+            for v in values:
+                row = existing.get(v["key"])
+                if row is None:
+                    memo_db.add(CategoryMemo(**v))
+                else:
+                    row.category, row.description = v["category"], v["description"]
+        memo_db.commit()
@@ -0,0 +1,86 @@
+"""
+Per-user change feed — in-process pub/sub behind GET /api/v1/changes/stream.
+
+Write paths call `publish(user_id, topic, action, **data)` after they commit.
+Each connected client owns a bounded asyncio queue on the event loop that
+serves its stream; publishing is thread-safe, so sync endpoints running in the
+threadpool and background workers can publish directly.
+
+Events are compact hints ("transactions changed"), not payloads: clients
+re-fetch only the resources whose topic they see. A client that falls behind
+gets a single {"topic": "resync"} event instead of an unbounded backlog.
+
+The feed is per process. With several server workers, run a shared broker
+in front of it or pin a user's stream and writes to one worker.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Optional
+
+FEED_QUEUE_SIZE: int = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "100"))
+
+TOPICS = ("transactions", "budgets", "alerts", "goals", "forecast_context", "import_jobs")
+
+
+class Subscription:
+    """One connected stream: a bounded queue bound to the loop that reads it."""
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop) -> None:
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=FEED_QUEUE_SIZE)
+
+    def _offer(self, event: dict) -> None:
+        # Runs on self.loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind to be useful — collapse the backlog into one resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"topic": "resync", "ts": event["ts"]})
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+_subscribers: dict[str, set[Subscription]] = {}
+_lock = threading.Lock()
+
+
+def subscribe(user_id) -> Subscription:
+    """Register a stream for `user_id`; must be called from the event loop serving it."""
+    sub = Subscription(str(user_id), asyncio.get_running_loop())
+    with _lock:
+        _subscribers.setdefault(sub.user_id, set()).add(sub)
+    return sub
+
+
+def unsubscribe(sub: Subscription) -> None:
+    with _lock:
+        subs = _subscribers.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del _subscribers[sub.user_id]
+
+
+def publish(user_id, topic: str, action: str, **data: Any) -> None:
+    """Send a change event to every open stream of `user_id` (no-op if none)."""
+    with _lock:
+        subs = list(_subscribers.get(str(user_id), ()))
+    if not subs:
+        return
+    event = {"topic": topic, "action": action, "ts": time.time(), **data}
+    for sub in subs:
+        try:
+            sub.loop.call_soon_threadsafe(sub._offer, event)
+        except RuntimeError:
+            unsubscribe(sub)  # its loop has shut down
@@ -0,0 +1,74 @@
+"""
+Per-user change versions and tombstones for incremental transaction sync.
+
+Writers reserve versions with `reserve(db, user_id, count)` inside their own
+database transaction. The counter row stays locked until that transaction
+commits, so a second writer for the same user waits, and versions become
+visible in increasing order. A reader that has seen version N has seen every
+change numbered at or below N.
+
+Nothing here commits; the caller does, together with the rows it versioned.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from models import ChangeVersion, Transaction, TransactionTombstone
+
+
+def reserve(db: Session, user_id: UUID, count: int = 1) -> int:
+    """
+    Reserve `count` consecutive versions for the user and return the first.
+    The reserved range is first .. first + count - 1.
+    """
+    table = ChangeVersion.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(table).values(user_id=user_id, version=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={"version": table.c.version + stmt.excluded.version},
+        ).returning(table.c.version)
+        last = db.execute(stmt).scalar_one()
+    else:
+        last = db.execute(
+            update(table).where(table.c.user_id == user_id)
+            .values(version=table.c.version + count).returning(table.c.version)
+        ).scalar()
+        if last is None:
+            db.execute(insert(table).values(user_id=user_id, version=count))
+            last = count
+    return last - count + 1
+
+
+def current(db: Session, user_id: UUID) -> int:
+    """The user's latest committed version (0 if nothing was ever written)."""
+    return db.execute(
+        select(ChangeVersion.version).where(ChangeVersion.user_id == user_id)
+    ).scalar() or 0
+
+
+def tombstone(db: Session, user_id: UUID, transaction_ids: Iterable[UUID]) -> Optional[int]:
+    """Record deletions, one version per id. Returns the last version used (None if no ids)."""
+    ids = list(transaction_ids)
+    if not ids:
+        return None
+    first = reserve(db, user_id, len(ids))
+    db.execute(insert(TransactionTombstone.__table__), [
+        {"user_id": user_id, "transaction_id": tid, "change_version": first + i}
+        for i, tid in enumerate(ids)
+    ])
+    return first + len(ids) - 1
+
+
+def touch(db: Session, tx: Transaction) -> None:
+    """Give an updated transaction the next version."""
+    tx.change_version = reserve(db, tx.user_id)
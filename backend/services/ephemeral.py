@@ -0,0 +1,266 @@
+"""
+Ephemeral key/value store with TTL for short-lived state that every API worker
+must see: pending OTP registrations, rate-limit counters.
+
+    store.set(key, value, ttl)   value is any JSON-serialisable object
+    store.get(key)               None once expired
+    store.pop(key)               atomic read-and-delete (one-time codes)
+    store.incr(key, ttl)         fixed-window counter; the window opens on the first hit
+    store.sweep()                delete expired entries, return how many
+    (async twins for `async def` endpoints: aget / aset / apop / aincr)
+
+EPHEMERAL_STORE selects the backend:
+    db      (default) the ephemeral_entries table, shared by all processes
+    memory  a process-local dict, for a single worker or local dev
+
+Expired entries are never returned. Writes also sweep them, at most once
+every EPHEMERAL_SWEEP_SECONDS, so neither backend grows without bound.
+"""
+from __future__ import annotations
+
+import abc
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import case, delete, select
+
+import database
+from models import EphemeralEntry
+
+SWEEP_SECONDS = float(os.getenv("EPHEMERAL_SWEEP_SECONDS", "300"))
+
+_table = EphemeralEntry.__table__
+
+
+class EphemeralStore(abc.ABC):
+    """Interface shared by the backends; the async methods default to the sync ones."""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abc.abstractmethod
+    def pop(self, key: str) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def incr(self, key: str, ttl: float) -> int:
+        ...
+
+    @abc.abstractmethod
+    def sweep(self) -> int:
+        ...
+
+    async def aget(self, key: str) -> Any:
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl: float) -> None:
+        self.set(key, value, ttl)
+
+    async def apop(self, key: str) -> Any:
+        return self.pop(key)
+
+    async def aincr(self, key: str, ttl: float) -> int:
+        return self.incr(key, ttl)
+
+
+class MemoryStore(EphemeralStore):
+    """Process-local store. Values are kept as JSON so callers never share objects."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, Optional[str], int]] = {}  # key -> (deadline, value, counter)
+        self._next_sweep = 0.0
+
+    def _live(self, key: str, now: float) -> Optional[tuple[float, Optional[str], int]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= now:
+            return None
+        return entry
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now >= self._next_sweep:
+            self._next_sweep = now + SWEEP_SECONDS
+            for key in [k for k, e in self._entries.items() if e[0] <= now]:
+                del self._entries[key]
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+        return json.loads(entry[1]) if entry and entry[1] is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, json.dumps(value), 0)
+            self._maybe_sweep(now)
+
+    def pop(self, key: str) -> Any:
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            self._entries.pop(key, None)
+        return json.loads(entry[1]) if entry and entry[1] is not None else None
+
+    def incr(self, key: str, ttl: float) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(key, now)
+            deadline, count = (entry[0], entry[2] + 1) if entry else (now + ttl, 1)
+            self._entries[key] = (deadline, None, count)
+            self._maybe_sweep(now)
+        return count
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if e[0] <= now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+
+class DbStore(EphemeralStore):
+    """
+    Store backed by the ephemeral_entries table. Each call is one statement on
+    its own short transaction, through the sync engine or, for the `a*`
+    methods, the async one.
+    """
+
+    def __init__(self) -> None:
+        self._next_sweep = 0.0
+
+    # ── statements ────────────────────────────
+
+    @staticmethod
+    def _upsert(dialect: str):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise RuntimeError(f"ephemeral store: unsupported database dialect {dialect!r}")
+        return insert(_table)
+
+    @staticmethod
+    def _get_stmt(key: str):
+        return select(_table.c.value).where(_table.c.key == key, _table.c.expires_at > _now())
+
+    def _set_stmt(self, dialect: str, key: str, value: Any, ttl: float):
+        stmt = self._upsert(dialect).values(
+            key=key, value=json.dumps(value), counter=0, expires_at=_now() + timedelta(seconds=ttl)
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[_table.c.key],
+            set_={"value": stmt.excluded.value, "counter": 0, "expires_at": stmt.excluded.expires_at},
+        )
+
+    @staticmethod
+    def _pop_stmt(key: str):
+        return (
+            delete(_table)
+            .where(_table.c.key == key, _table.c.expires_at > _now())
+            .returning(_table.c.value)
+        )
+
+    def _incr_stmt(self, dialect: str, key: str, ttl: float):
+        now = _now()
+        stmt = self._upsert(dialect).values(
+            key=key, value=None, counter=1, expires_at=now + timedelta(seconds=ttl)
+        )
+        expired = _table.c.expires_at <= now
+        return stmt.on_conflict_do_update(
+            index_elements=[_table.c.key],
+            set_={
+                "counter": case((expired, 1), else_=_table.c.counter + 1),
+                "expires_at": case((expired, stmt.excluded.expires_at), else_=_table.c.expires_at),
+            },
+        ).returning(_table.c.counter)
+
+    @staticmethod
+    def _sweep_stmt():
+        return delete(_table).where(_table.c.expires_at <= _now())
+
+    def _sweep_due(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return False
+        self._next_sweep = now + SWEEP_SECONDS
+        return True
+
+    # ── sync ──────────────────────────────────
+
+    def get(self, key: str) -> Any:
+        with database.engine.connect() as conn:
+            raw = conn.execute(self._get_stmt(key)).scalar()
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with database.engine.begin() as conn:
+            conn.execute(self._set_stmt(conn.dialect.name, key, value, ttl))
+            if self._sweep_due():
+                conn.execute(self._sweep_stmt())
+
+    def pop(self, key: str) -> Any:
+        with database.engine.begin() as conn:
+            raw = conn.execute(self._pop_stmt(key)).scalar()
+        return json.loads(raw) if raw is not None else None
+
+    def incr(self, key: str, ttl: float) -> int:
+        with database.engine.begin() as conn:
+            count = conn.execute(self._incr_stmt(conn.dialect.name, key, ttl)).scalar_one()
+            if self._sweep_due():
+                conn.execute(self._sweep_stmt())
+        return count
+
+    def sweep(self) -> int:
+        with database.engine.begin() as conn:
+            return conn.execute(self._sweep_stmt()).rowcount
+
+    # ── async ─────────────────────────────────
+
+    async def aget(self, key: str) -> Any:
+        async with database.get_async_engine().connect() as conn:
+            raw = (await conn.execute(self._get_stmt(key))).scalar()
+        return json.loads(raw) if raw is not None else None
+
+    async def aset(self, key: str, value: Any, ttl: float) -> None:
+        async with database.get_async_engine().begin() as conn:
+            await conn.execute(self._set_stmt(conn.dialect.name, key, value, ttl))
+            if self._sweep_due():
+                await conn.execute(self._sweep_stmt())
+
+    async def apop(self, key: str) -> Any:
+        async with database.get_async_engine().begin() as conn:
+            raw = (await conn.execute(self._pop_stmt(key))).scalar()
+        return json.loads(raw) if raw is not None else None
+
+    async def aincr(self, key: str, ttl: float) -> int:
+        async with database.get_async_engine().begin() as conn:
+            count = (await conn.execute(self._incr_stmt(conn.dialect.name, key, ttl))).scalar_one()
+            if self._sweep_due():
+                await conn.execute(self._sweep_stmt())
+        return count
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _build() -> EphemeralStore:
+    backend = os.getenv("EPHEMERAL_STORE", "db").lower()
+    if backend == "memory":
+        return MemoryStore()
+    if backend == "db":
+        return DbStore()
+    raise RuntimeError(f"EPHEMERAL_STORE must be 'db' or 'memory', got {backend!r}")
+
+
+store: EphemeralStore = _build()
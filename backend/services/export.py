@@ -0,0 +1,125 @@
+"""
+Streaming exports.
+
+Rows are pulled from the database with a server-side cursor (`yield_per`) on a
+session owned by the generator, so the response can start as soon as the
+first batch arrives and memory stays at one batch regardless of history size.
+
+Two encoders share the same row source:
+- CSV, flushed every EXPORT_BATCH_ROWS rows;
+- Parquet, one row group per batch, for large downloads and analysis tools.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+from typing import Any, Callable, Iterable, Iterator
+
+from sqlalchemy import Select
+
+from database import SessionLocal
+
+EXPORT_BATCH_ROWS: int = int(os.getenv("EXPORT_BATCH_ROWS", "2000"))
+
+FORMATS = ("csv", "parquet")
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def iter_rows(stmt: Select, batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[Any]:
+    """Execute `stmt` on a fresh session and yield result rows as the cursor fetches them."""
+    with SessionLocal() as db:
+        result = db.execute(stmt.execution_options(yield_per=batch_rows))
+        yield from result
+
+
+def stream_csv(
+    header: list[str],
+    rows: Iterable[Any],
+    to_record: Callable[[Any], list],
+    batch_rows: int = EXPORT_BATCH_ROWS,
+) -> Iterator[bytes]:
+    """Encode rows as CSV, yielding the header immediately and then one chunk per batch."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    yield _drain_text(buf)
+
+    pending = 0
+    for row in rows:
+        writer.writerow(to_record(row))
+        pending += 1
+        if pending >= batch_rows:
+            yield _drain_text(buf)
+            pending = 0
+    if pending:
+        yield _drain_text(buf)
+
+
+def stream_parquet(
+    schema: "list[tuple[str, Any]]",
+    rows: Iterable[Any],
+    to_record: Callable[[Any], list],
+    batch_rows: int = EXPORT_BATCH_ROWS,
+) -> Iterator[bytes]:
+    """
+    Encode rows as Parquet, writing one row group per batch.
+
+    `schema` is a list of (column name, pyarrow type) pairs in record order.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_schema = pa.schema(schema)
+    sink = _DrainSink()
+    with pq.ParquetWriter(sink, arrow_schema, compression="snappy") as writer:
+        columns: list[list] = [[] for _ in schema]
+        for row in rows:
+            for col, value in zip(columns, to_record(row)):
+                col.append(value)
+            if len(columns[0]) >= batch_rows:
+                writer.write_batch(pa.record_batch(columns, schema=arrow_schema))
+                columns = [[] for _ in schema]
+                yield sink.drain()
+        if columns[0]:
+            writer.write_batch(pa.record_batch(columns, schema=arrow_schema))
+    yield sink.drain()
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _drain_text(buf: io.StringIO) -> bytes:
+    data = buf.getvalue().encode("utf-8")
+    buf.seek(0)
+    buf.truncate()
+    return data
+
+
+class _DrainSink(io.RawIOBase):
+    """Write-only file object whose contents are handed off (and released) on drain()."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
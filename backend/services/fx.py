@@ -0,0 +1,51 @@
+"""
+Currency conversion for aggregate endpoints.
+
+Aggregates are grouped by currency in SQL, so conversion is one pass over a
+handful of (currency, total) rows rather than one call per transaction.
+Rates come from `exchange_rates.cached_rates` — the DB rate cache with the
+static table as fallback — so no request waits on the rate API.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from models import CurrencyEnum
+from routers.exchange_rates import cached_rates
+
+_CENT = Decimal("0.01")
+
+
+class Converter:
+    """Converts amounts from any currency into one target currency."""
+
+    def __init__(self, target: str, db: Session) -> None:
+        self.target = target.upper()
+        # cached_rates(target)[c] = units of c per 1 target → divide to convert c → target
+        self._rates = {c: Decimal(str(r)) for c, r in cached_rates(self.target, db).items() if r}
+
+    def __call__(self, amount, currency) -> Decimal:
+        if not amount:
+            return Decimal("0")
+        code = currency.value if isinstance(currency, CurrencyEnum) else str(currency)
+        rate = self._rates.get(code.upper(), Decimal("1"))
+        return Decimal(str(amount)) / rate
+
+    def total(self, rows: Iterable[tuple]) -> Decimal:
+        """Sum (currency, amount) pairs in the target currency."""
+        return sum((self(amount, currency) for currency, amount in rows), Decimal("0"))
+
+
+def working_currency(user, requested: Optional[str] = None) -> str:
+    """The currency a user's aggregates are shown in: explicit request, else study-country currency."""
+    if requested:
+        return requested.upper()
+    cur = getattr(user, "study_country_currency", None)
+    return cur.value if cur is not None else CurrencyEnum.USD.value
+
+
+def money(value: Decimal) -> Decimal:
+    return Decimal(value).quantize(_CENT)
@@ -0,0 +1,218 @@
+"""
+Date-aware conversion to USD from the historical daily rate table.
+
+The whole fx_daily_rates table is held in memory as one sorted date array and
+one rate array per currency. A transaction converts at the rate of its own
+date, or the nearest earlier day when that date is missing (weekends,
+holidays). Dates before a currency's first row use its earliest rate.
+Currencies with no history fall back to the static table (constants.FALLBACK_RATES).
+
+`RateTable.to_usd` converts whole columns of (amount, currency, date) at once:
+one np.searchsorted per distinct currency, no per-row Python.
+
+The in-memory table is loaded from the DB on first use. After that, once it is
+older than FX_HISTORY_RELOAD_SECONDS (or after `invalidate()` in this process),
+the next `table()` call starts a reload on a background thread and keeps
+serving the current copy, so write requests never wait on the full-table read.
+Rates loaded by scripts/load_fx_history.py (a separate process) therefore show
+up within FX_HISTORY_RELOAD_SECONDS.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from constants import FALLBACK_RATES
+from database import SessionLocal
+from models import CurrencyEnum, FxDailyRate
+
+RELOAD_SECONDS = float(os.getenv("FX_HISTORY_RELOAD_SECONDS", "3600"))
+_UPSERT_CHUNK = 5000
+_CENT = Decimal("0.01")
+
+
+class RateTable:
+    """Per-currency sorted (dates, rates) arrays; rates are units per 1 USD."""
+
+    def __init__(self, series: dict[str, tuple[np.ndarray, np.ndarray]]) -> None:
+        self._series = series
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[str, date, float]]) -> "RateTable":
+        grouped: dict[str, tuple[list, list]] = {}
+        for currency, day, rate in rows:
+            dates, rates = grouped.setdefault(currency.upper(), ([], []))
+            dates.append(day)
+            rates.append(float(rate))
+        series = {}
+        for currency, (dates, rates) in grouped.items():
+            d = np.array(dates, dtype="datetime64[D]")
+            order = np.argsort(d, kind="stable")
+            series[currency] = (d[order], np.array(rates, dtype=np.float64)[order])
+        return cls(series)
+
+    def __len__(self) -> int:
+        return sum(len(d) for d, _ in self._series.values())
+
+    def currencies(self) -> list[str]:
+        return sorted(self._series)
+
+    def rates(self, currencies: Sequence[str], dates: Sequence) -> np.ndarray:
+        """Units of currency per 1 USD for each (currency, date) pair."""
+        cur = np.asarray(currencies, dtype=object)
+        days = np.asarray(dates, dtype="datetime64[D]")
+        out = np.empty(len(cur), dtype=np.float64)
+        for code in set(cur.tolist()):
+            mask = cur == code
+            series = self._series.get(code)
+            if series is None:
+                out[mask] = 1.0 if code == "USD" else FALLBACK_RATES.get(code, 1.0)
+                continue
+            known_dates, known_rates = series
+            idx = np.searchsorted(known_dates, days[mask], side="right") - 1
+            out[mask] = known_rates[np.clip(idx, 0, len(known_rates) - 1)]
+        return out
+
+    def to_usd(self, amounts: Sequence[float], currencies: Sequence[str], dates: Sequence) -> np.ndarray:
+        """Convert a column of amounts to USD, rounded to cents."""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        return np.round(amounts / self.rates(currencies, dates), 2)
+
+
+_table: Optional[RateTable] = None
+_loaded_at = float("-inf")
+_lock = threading.Lock()
+_reloading = False
+
+
+def _read() -> RateTable:
+    with SessionLocal() as db:
+        return RateTable.from_rows(db.execute(select(FxDailyRate.currency, FxDailyRate.rate_date, FxDailyRate.rate)))
+
+
+def _reload() -> None:
+    global _table, _loaded_at, _reloading
+    try:
+        fresh = _read()
+        with _lock:
+            _table, _loaded_at = fresh, time.monotonic()
+    except Exception as exc:
+        print(f"[fx-history] reload failed, keeping the current table: {exc}", flush=True)
+    finally:
+        _reloading = False
+
+
+def table() -> RateTable:
+    """
+    The process-wide rate table. Only the very first call reads the DB inline;
+    a stale table is returned as-is while a background thread reloads it.
+    """
+    global _table, _loaded_at, _reloading
+    if _table is not None and time.monotonic() - _loaded_at < RELOAD_SECONDS:
+        return _table
+    with _lock:
+        if _table is None:
+            _table, _loaded_at = _read(), time.monotonic()
+        elif not _reloading and time.monotonic() - _loaded_at >= RELOAD_SECONDS:
+            _reloading = True
+            threading.Thread(target=_reload, name="fx-history-reload", daemon=True).start()
+        return _table
+
+
+def invalidate() -> None:
+    """Have the next `table()` call in this process start a reload."""
+    global _loaded_at
+    _loaded_at = float("-inf")
+
+
+def _code(currency) -> str:
+    return currency.value if isinstance(currency, CurrencyEnum) else str(currency).upper()
+
+
+def usd_amounts(amounts: Sequence, currencies: Sequence, dates: Sequence[date]) -> list[Decimal]:
+    """Batch conversion for write paths: Decimal USD amounts, one per input row."""
+    if not amounts:
+        return []
+    usd = table().to_usd([float(a) for a in amounts], [_code(c) for c in currencies], dates)
+    return [Decimal(repr(float(v))).quantize(_CENT) for v in usd]
+
+
+def to_usd(amount, currency, on: date) -> Decimal:
+    """Single-row convenience wrapper around `usd_amounts`."""
+    return usd_amounts([amount], [currency], [on])[0]
+
+
+# ──────────────────────────────────────────────
+# Loading
+# ──────────────────────────────────────────────
+
+def upsert(db: Session, rows: Iterable[tuple[str, date, float]]) -> int:
+    """Insert or overwrite (currency, rate_date, rate) rows in chunks. Caller commits."""
+    table_ = FxDailyRate.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    total = 0
+    chunk: list[dict] = []
+
+    def flush() -> None:
+        stmt = dialect_insert(table_).values(chunk)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table_.c.currency, table_.c.rate_date],
+            set_={"rate": stmt.excluded.rate},
+        ))
+
+    for currency, day, rate in rows:
+        if not rate or float(rate) <= 0:
+            continue
+        chunk.append({"currency": currency.upper(), "rate_date": day, "rate": rate})
+        if len(chunk) >= _UPSERT_CHUNK:
+            flush()
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        flush()
+        total += len(chunk)
+    return total
+
+
+def record(db: Session, day: date, usd_rates: dict[str, float]) -> int:
+    """Store one day's USD-based rates (e.g. a fresh API response). Caller commits."""
+    return upsert(db, ((cur, day, rate) for cur, rate in usd_rates.items()))
+
+
+def read_snapshot(path: Path) -> Iterable[tuple[str, date, float]]:
+    """
+    Yield (currency, date, rate-per-USD) rows from a snapshot file.
+
+    CSV:  header with date, currency, rate columns (one row per currency per day)
+    JSON: {"rates": {"2024-01-02": {"EUR": 0.91, ...}, ...}}
+          or a list of {"date", "currency", "rate"} records
+    """
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text())
+        if isinstance(data, dict):
+            for day, rates in data["rates"].items():
+                d = date.fromisoformat(day)
+                for currency, rate in rates.items():
+                    yield currency, d, float(rate)
+        else:
+            for rec in data:
+                yield rec["currency"], date.fromisoformat(rec["date"]), float(rec["rate"])
+        return
+    with path.open(newline="") as f:
+        for rec in csv.DictReader(f):
+            yield rec["currency"], date.fromisoformat(rec["date"]), float(rec["rate"])
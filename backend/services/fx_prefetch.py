@@ -0,0 +1,121 @@
+"""
+Background exchange-rate prefetcher.
+
+Started from the app lifespan when an API key is configured. Every cycle
+(FX_PREFETCH_INTERVAL_SECONDS, jittered ±20%) it refreshes each tracked base
+currency whose cached rates are within FX_PREFETCH_LEAD_SECONDS of the
+cache TTL. Tracked bases are POPULAR_STUDENT_CURRENCIES plus every currency
+found on users, transactions, budgets and goals; that scan reads the whole
+transactions table, so it runs only every FX_PREFETCH_SCAN_SECONDS.
+
+A base whose fetch fails is retried with exponential backoff (capped at
+FX_PREFETCH_MAX_BACKOFF_SECONDS) instead of on every cycle. `staleness()`
+reports cache age per base for GET /api/v1/exchange-rates/status.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from datetime import timedelta
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import String, cast, select, union
+
+from constants import POPULAR_STUDENT_CURRENCIES
+from database import SessionLocal
+from models import Budget, Goal, Transaction, User
+from routers import exchange_rates
+
+INTERVAL_SECONDS = float(os.getenv("FX_PREFETCH_INTERVAL_SECONDS", "300"))
+LEAD_SECONDS = float(os.getenv("FX_PREFETCH_LEAD_SECONDS", "900"))
+MAX_BACKOFF_SECONDS = float(os.getenv("FX_PREFETCH_MAX_BACKOFF_SECONDS", "3600"))
+SCAN_SECONDS = float(os.getenv("FX_PREFETCH_SCAN_SECONDS", "21600"))
+
+_tracked: set[str] = set(POPULAR_STUDENT_CURRENCIES)
+_failures: dict[str, int] = {}
+_retry_at: dict[str, float] = {}
+_last_cycle: Optional[float] = None
+_next_scan = 0.0  # monotonic time of the next _currencies_in_use scan
+
+
+def _jitter(seconds: float, spread: float = 0.2) -> float:
+    return seconds * random.uniform(1 - spread, 1 + spread)
+
+
+def _currencies_in_use() -> set[str]:
+    """Distinct currency codes on users, transactions, budgets and goals (one query)."""
+    columns = (User.home_currency, User.study_country_currency,
+               Transaction.currency, Budget.currency, Goal.currency)
+    stmt = union(*[select(cast(col, String(3)).label("code")).where(col.isnot(None)) for col in columns])
+    with SessionLocal() as db:
+        return {code.upper() for code in db.execute(stmt).scalars() if code}
+
+
+async def _refresh_one(base: str, max_age: timedelta) -> None:
+    rates = await exchange_rates.refresh(base, max_age=max_age)
+    if rates:
+        _failures.pop(base, None)
+        _retry_at.pop(base, None)
+        return
+    n = _failures.get(base, 0) + 1
+    _failures[base] = n
+    delay = min(MAX_BACKOFF_SECONDS, INTERVAL_SECONDS * 2 ** (n - 1))
+    _retry_at[base] = time.monotonic() + _jitter(delay)
+    print(f"[fx-prefetch] {base} failed ({n}x), next try in {delay:.0f}s", flush=True)
+
+
+async def run_cycle() -> None:
+    global _last_cycle, _next_scan
+    if time.monotonic() >= _next_scan:
+        try:
+            _tracked.update(await run_in_threadpool(_currencies_in_use))
+            _next_scan = time.monotonic() + _jitter(SCAN_SECONDS)
+        except Exception as exc:
+            print(f"[fx-prefetch] could not list currencies in use: {exc}", flush=True)
+
+    # Refresh anything that would expire before the next cycle comes around
+    max_age = exchange_rates._CACHE_TTL - timedelta(seconds=LEAD_SECONDS)
+    now = time.monotonic()
+    for base in sorted(_tracked):
+        if _retry_at.get(base, 0) > now:
+            continue
+        age = exchange_rates.age(base)
+        if age is not None and age < max_age.total_seconds():
+            continue
+        await _refresh_one(base, max_age)
+        await asyncio.sleep(random.uniform(0, 0.5))  # spread requests to the API
+    _last_cycle = time.time()
+
+    ages = [a for a in (exchange_rates.age(b) for b in _tracked) if a is not None]
+    print(
+        f"[fx-prefetch] {len(_tracked)} bases, max staleness "
+        f"{max(ages) if ages else 0:.0f}s, {len(_failures)} failing",
+        flush=True,
+    )
+
+
+async def run() -> None:
+    """Refresh loop; runs until cancelled."""
+    await asyncio.sleep(random.uniform(0, 5))  # don't stampede when several workers start together
+    while True:
+        try:
+            await run_cycle()
+        except Exception as exc:
+            print(f"[fx-prefetch] cycle failed: {exc}", flush=True)
+        await asyncio.sleep(_jitter(INTERVAL_SECONDS))
+
+
+def staleness() -> dict:
+    """Age of cached rates per tracked base, in seconds (None = nothing cached yet)."""
+    ages = {base: exchange_rates.age(base) for base in sorted(_tracked)}
+    known = [a for a in ages.values() if a is not None]
+    return {
+        "ttl_seconds": exchange_rates._CACHE_TTL.total_seconds(),
+        "max_staleness_seconds": round(max(known), 1) if known else None,
+        "bases": {b: round(a, 1) if a is not None else None for b, a in ages.items()},
+        "failing": dict(_failures),
+        "last_cycle_at": _last_cycle,
+    }
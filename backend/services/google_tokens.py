@@ -0,0 +1,153 @@
+"""
+Local verification of Google ID tokens (the `credential` from Google Sign-In).
+
+Tokens are RS256 JWTs signed with Google's rotating keys. The key set (JWKS)
+is fetched once and kept in memory for as long as Google's Cache-Control
+max-age allows; the first sign-in after that refetches it. Every other sign-in
+is signature, audience, issuer and expiry checks in-process, with no round
+trip to Google.
+
+A token whose `kid` is not in the cached set forces one early refetch (at most
+every MIN_REFRESH_SECONDS) to pick up a key rotation.
+
+For tests or offline development, GOOGLE_JWKS_FILE points at a local JWKS
+document that is used instead of Google's, or call `use_keys(jwks)` directly.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+from jose import JWTError, jwt
+
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+JWKS_FILE = os.getenv("GOOGLE_JWKS_FILE", "")
+
+DEFAULT_MAX_AGE_SECONDS = 3600   # when Google sends no usable Cache-Control
+MIN_REFRESH_SECONDS = 60         # floor between forced refetches for unknown kids
+CLOCK_SKEW_SECONDS = 30
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class InvalidToken(Exception):
+    """The token is malformed, badly signed, expired, or not meant for us."""
+
+
+class KeysUnavailable(Exception):
+    """Google's key set could not be fetched and nothing usable is cached."""
+
+
+_keys: dict[str, dict] = {}      # kid -> JWK
+_expires_at = 0.0                 # monotonic; 0 = never loaded
+_fetched_at = float("-inf")
+_pinned = False                   # keys came from use_keys / GOOGLE_JWKS_FILE; never fetch
+_lock: Optional[asyncio.Lock] = None
+
+
+def use_keys(jwks: dict) -> None:
+    """Verify against this JWKS document from now on instead of Google's."""
+    global _keys, _expires_at, _pinned
+    _keys = {k["kid"]: k for k in jwks.get("keys", []) if "kid" in k}
+    _expires_at = float("inf")
+    _pinned = True
+
+
+if JWKS_FILE:
+    use_keys(json.loads(Path(JWKS_FILE).read_text()))
+
+
+def _max_age(cache_control: str) -> float:
+    match = _MAX_AGE_RE.search(cache_control or "")
+    return float(match.group(1)) if match else DEFAULT_MAX_AGE_SECONDS
+
+
+async def _fetch() -> None:
+    global _keys, _expires_at, _fetched_at
+    async with httpx.AsyncClient() as client:
+        response = await client.get(GOOGLE_JWKS_URL, timeout=10.0)
+    response.raise_for_status()
+    keys = {k["kid"]: k for k in response.json().get("keys", []) if "kid" in k}
+    if not keys:
+        raise ValueError("Google returned an empty key set")
+    _keys = keys
+    _fetched_at = time.monotonic()
+    _expires_at = _fetched_at + _max_age(response.headers.get("cache-control", ""))
+    print(f"[google-keys] loaded {len(keys)} signing keys", flush=True)
+
+
+async def _refresh(force: bool) -> None:
+    """Single-flight refetch. Keeps serving the old keys if Google is unreachable."""
+    global _lock, _expires_at, _fetched_at
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        now = time.monotonic()
+        if force and now - _fetched_at < MIN_REFRESH_SECONDS:
+            return  # someone just refetched
+        if not force and now < _expires_at:
+            return
+        try:
+            await _fetch()
+        except (httpx.HTTPError, ValueError) as exc:
+            if not _keys:
+                raise KeysUnavailable(str(exc)) from exc
+            # Retry after a short pause, not on every sign-in
+            _fetched_at = now
+            _expires_at = now + MIN_REFRESH_SECONDS
+            print(f"[google-keys] refresh failed, keeping cached keys: {exc}", flush=True)
+
+
+async def _key(kid: str) -> dict:
+    if not _pinned:
+        if time.monotonic() >= _expires_at:
+            await _refresh(force=False)
+        if kid not in _keys:
+            await _refresh(force=True)  # key rotation since our last fetch
+    key = _keys.get(kid)
+    if key is None:
+        raise InvalidToken("Unknown signing key")
+    return key
+
+
+async def verify(token: str, audience: str = "") -> dict[str, Any]:
+    """
+    Check the token's signature, expiry, issuer and (if given) audience, and
+    return its claims. Raises InvalidToken or KeysUnavailable.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except JWTError as exc:
+        raise InvalidToken(f"Malformed token: {exc}") from exc
+    if header.get("alg") != "RS256" or not header.get("kid"):
+        raise InvalidToken("Unexpected token algorithm or missing key id")
+
+    key = await _key(header["kid"])
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=audience or None,
+            options={
+                "verify_aud": bool(audience),
+                "verify_at_hash": False,
+                "require_exp": True,
+                "leeway": CLOCK_SKEW_SECONDS,
+            },
+        )
+    except JWTError as exc:
+        raise InvalidToken(str(exc)) from exc
+
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise InvalidToken("Unexpected token issuer")
+    if not claims.get("email"):
+        raise InvalidToken("Token carries no email")
+    return claims
@@ -0,0 +1,226 @@
+"""
+File ingestion for transaction imports.
+
+Small files are parsed whole with `read_frame`, which tries several pandas
+readers and keeps whichever finds the most columns (tolerant of badly saved
+exports). Large files go through the streaming mode instead:
+- encoding, delimiter and header are sniffed from a small prefix;
+- CSV is read in fixed-size row chunks;
+- XLSX is read with openpyxl's read-only row iterator;
+so peak memory is bounded by IMPORT_CHUNK_ROWS rather than the file size.
+
+Every reader drops blank rows but keeps each data row's 0-based position in
+the file as the DataFrame index, so row numbers in import errors stay true.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import os
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+STREAMING_THRESHOLD_BYTES: int = int(os.getenv("IMPORT_STREAMING_THRESHOLD_BYTES", str(5 * 1024 * 1024)))
+CHUNK_ROWS: int = int(os.getenv("IMPORT_CHUNK_ROWS", "5000"))
+_SNIFF_BYTES = 64 * 1024
+_COUNT_BLOCK = 1024 * 1024
+
+
+def is_large(path: Path) -> bool:
+    return path.stat().st_size > STREAMING_THRESHOLD_BYTES
+
+
+def read_frame(content: bytes, filename: str) -> pd.DataFrame:
+    """Parse a whole file in memory, trying every reader that might apply."""
+    fname = filename.lower()
+    is_excel = fname.endswith((".xlsx", ".xls"))
+
+    best: pd.DataFrame | None = None
+
+    def _try(fn):
+        nonlocal best
+        try:
+            candidate = fn()
+            if best is None or len(candidate.columns) > len(best.columns):
+                best = candidate
+        except Exception:
+            pass
+
+    if is_excel:
+        _try(lambda: pd.read_excel(io.BytesIO(content)))
+    # Always try CSV — covers .csv files and XLSX files that Excel saved incorrectly
+    # (when all data ends up in a single column because the delimiter wasn't recognised)
+    # Blank lines are read as empty rows (and dropped below) so positions match the file
+    _try(lambda: pd.read_csv(io.BytesIO(content), skip_blank_lines=False))
+    _try(lambda: pd.read_csv(io.BytesIO(content), encoding="latin-1", skip_blank_lines=False))
+    if not is_excel:
+        _try(lambda: pd.read_excel(io.BytesIO(content)))
+
+    if best is None:
+        raise ValueError("Could not read file — make sure it is a valid CSV or Excel file.")
+    return best.dropna(how="all")
+
+
+# ---------------------------------------------------------------------------
+# Streaming mode
+# ---------------------------------------------------------------------------
+
+def iter_chunks(path: Path, filename: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield the file as DataFrames of at most `chunk_rows` rows each."""
+    kind = _kind(path, filename)
+    if kind == "xlsx":
+        yield from _iter_xlsx(path, chunk_rows)
+    elif kind == "xls":
+        # Legacy binary Excel has no streaming reader — parse once, then slice
+        df = pd.read_excel(path).dropna(how="all")
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        encoding, delimiter, has_header = sniff_csv(path)
+        reader = pd.read_csv(
+            path,
+            encoding=encoding,
+            sep=delimiter,
+            encoding_errors="replace",  # the sniffed prefix may not cover every byte
+            chunksize=chunk_rows,
+            skip_blank_lines=False,
+            **_header_kwargs(path, encoding, delimiter, has_header),
+        )
+        with reader:
+            for chunk in reader:
+                chunk = chunk.dropna(how="all")
+                if len(chunk):
+                    yield chunk
+
+
+def read_head(path: Path, filename: str, rows: int) -> pd.DataFrame:
+    """Read just the first `rows` data rows (for previews)."""
+    return next(iter_chunks(path, filename, chunk_rows=rows), pd.DataFrame())
+
+
+def count_rows(path: Path, filename: str) -> int:
+    """Cheap data-row count: newline count for CSV, sheet dimensions for XLSX."""
+    kind = _kind(path, filename)
+    if kind == "xlsx":
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            if ws.max_row:
+                return max(ws.max_row - 1, 0)
+            return max(sum(1 for _ in ws.iter_rows(values_only=True)) - 1, 0)
+        finally:
+            wb.close()
+    if kind == "xls":
+        return len(pd.read_excel(path, usecols=[0]))
+
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as fh:
+        while block := fh.read(_COUNT_BLOCK):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1  # final line without trailing newline
+    return max(lines - header_rows(path, filename), 0)
+
+
+def header_rows(path: Path, filename: str) -> int:
+    """Lines above the first data row in streaming mode: 1 for Excel, sniffed for CSV."""
+    if _kind(path, filename) != "csv":
+        return 1
+    _, _, has_header = sniff_csv(path)
+    return 1 if has_header else 0
+
+
+def sniff_csv(path: Path) -> tuple[str, str, bool]:
+    """Return (encoding, delimiter, has_header) guessed from the first few KB."""
+    with open(path, "rb") as fh:
+        prefix = fh.read(_SNIFF_BYTES)
+
+    encoding = "utf-8-sig"
+    try:
+        # Incremental decode tolerates a multi-byte character cut off at the prefix boundary
+        text = codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        encoding = "latin-1"
+        text = prefix.decode(encoding)
+    if "\n" in text:
+        text = text[: text.rfind("\n")]
+
+    try:
+        delimiter = csv.Sniffer().sniff(text, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+
+    first_row = next(csv.reader(io.StringIO(text), delimiter=delimiter), [])
+    # A header row is all labels; a data row always has at least one amount
+    has_header = bool(first_row) and not any(_is_number(f) for f in first_row)
+    return encoding, delimiter, has_header
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _kind(path: Path, filename: str) -> str:
+    fname = filename.lower()
+    with open(path, "rb") as fh:
+        magic = fh.read(4)
+    if magic == b"PK\x03\x04":  # zip container → xlsx regardless of extension
+        return "xlsx"
+    if fname.endswith(".xls") and magic == b"\xd0\xcf\x11\xe0":
+        return "xls"
+    return "csv"
+
+
+def _header_kwargs(path: Path, encoding: str, delimiter: str, has_header: bool) -> dict:
+    if has_header:
+        return {"header": 0}
+    with open(path, encoding=encoding, errors="replace", newline="") as fh:
+        width = len(next(csv.reader(fh, delimiter=delimiter), []))
+    return {"header": None, "names": [f"Column {i + 1}" for i in range(width)]}
+
+
+def _iter_xlsx(path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+        buf: list[tuple] = []
+        start = 0
+        for row in rows:
+            row = row[: len(columns)]
+            buf.append(row + (None,) * (len(columns) - len(row)))
+            if len(buf) >= chunk_rows:
+                yield _frame(buf, columns, start)
+                start += len(buf)
+                buf = []
+        if buf:
+            yield _frame(buf, columns, start)
+    finally:
+        wb.close()
+
+
+def _frame(rows: list[tuple], columns: list[str], start: int) -> pd.DataFrame:
+    index = pd.RangeIndex(start, start + len(rows))
+    return pd.DataFrame.from_records(rows, columns=columns, index=index).dropna(how="all")
+
+
+def _is_number(value: str) -> bool:
+    cleaned = value.strip().replace(",", "").replace("$", "").replace("£", "").replace("€", "")
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned = cleaned[1:-1]
+    try:
+        float(cleaned)
+        return True
+    except ValueError:
+        return False
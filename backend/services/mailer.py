@@ -0,0 +1,338 @@
+"""
+Outbound email: a persisted outbox plus a background delivery worker.
+
+Request handlers only queue. `enqueue(db, to, subject, html, expires_at=None)`
+adds an email_outbox row to the caller's transaction. Call `wake()` after the
+commit so this process's worker sends it right away instead of on its next poll.
+
+The worker (`run()`, started from the app lifespan) works like this:
+- It claims due rows in batches of MAILER_BATCH_SIZE and leases each one for
+  MAILER_LEASE_SECONDS. A send lost to a crash is retried once the lease ends.
+- It sends on the EMAIL bulkhead.
+- Each EMAIL thread keeps its own authenticated SMTP connection open between
+  batches. The connection gets a NOOP check after MAILER_IDLE_SECONDS of
+  idleness and is reopened if the server dropped it.
+- A failed send is retried with exponential backoff up to
+  MAILER_MAX_ATTEMPTS, then marked failed.
+- A message with `expires_at` (OTP codes) is marked expired instead of being
+  claimed or retried once that time has passed.
+- About once an hour, sent, failed and expired rows older than
+  MAILER_RETENTION_DAYS are deleted.
+- Every API worker may run the loop. On PostgreSQL, rows are claimed with
+  SKIP LOCKED.
+
+SMTP settings: SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_FROM_NAME.
+SMTP_DEBUG=true sends over a plain connection with no STARTTLS or login. Use
+it with a local stand-in such as `python -m scripts.debug_smtp`
+(SMTP_HOST=localhost SMTP_PORT=1025).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Optional
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, or_, select, update
+
+from database import SessionLocal
+from models import EmailOutbox, EmailStatusEnum
+from services import bulkhead
+
+SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER: str = os.getenv("SMTP_USER", "")
+SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+SMTP_FROM_NAME: str = os.getenv("SMTP_FROM_NAME", "Spendemic")
+SMTP_DEBUG: bool = os.getenv("SMTP_DEBUG", "False").lower() == "true"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+
+POLL_SECONDS = float(os.getenv("MAILER_POLL_SECONDS", "10"))
+BATCH_SIZE = int(os.getenv("MAILER_BATCH_SIZE", "20"))
+LEASE_SECONDS = float(os.getenv("MAILER_LEASE_SECONDS", "120"))
+MAX_ATTEMPTS = int(os.getenv("MAILER_MAX_ATTEMPTS", "6"))
+BASE_BACKOFF_SECONDS = float(os.getenv("MAILER_BASE_BACKOFF_SECONDS", "30"))
+IDLE_SECONDS = float(os.getenv("MAILER_IDLE_SECONDS", "60"))
+RETENTION_DAYS = float(os.getenv("MAILER_RETENTION_DAYS", "7"))
+PURGE_SECONDS = 3600
+
+_SMTP_PLACEHOLDER = {"", "your-gmail@gmail.com", "your-app-password"}
+
+
+def configured() -> bool:
+    return SMTP_DEBUG or (SMTP_USER not in _SMTP_PLACEHOLDER and SMTP_PASSWORD not in _SMTP_PLACEHOLDER)
+
+
+def _sender() -> str:
+    return SMTP_USER or "noreply@localhost"
+
+
+# ── queueing ──────────────────────────────────
+
+def enqueue(
+    db, to_address: str, subject: str, html: str, expires_at: Optional[datetime] = None
+) -> EmailOutbox:
+    """
+    Add an email to the outbox in the caller's (sync or async) session; the
+    caller commits. It is dropped undelivered once `expires_at` passes.
+    """
+    email = EmailOutbox(
+        to_address=to_address,
+        subject=subject,
+        html=html,
+        status=EmailStatusEnum.PENDING,
+        attempts=0,
+        next_attempt_at=_now(),
+        expires_at=expires_at,
+    )
+    db.add(email)
+    return email
+
+
+_wake: Optional[asyncio.Event] = None
+
+
+def wake() -> None:
+    """Nudge this process's worker after committing new outbox rows (no-op if it isn't running)."""
+    if _wake is not None:
+        _wake.set()
+
+
+# ── SMTP connections (one per EMAIL thread) ───
+
+_local = threading.local()
+_connections: set[smtplib.SMTP] = set()
+_connections_lock = threading.Lock()
+
+
+def _open() -> smtplib.SMTP:
+    conn = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    if not SMTP_DEBUG:
+        conn.starttls()
+        conn.login(SMTP_USER, SMTP_PASSWORD)
+    with _connections_lock:
+        _connections.add(conn)
+    return conn
+
+
+def _drop() -> None:
+    conn = getattr(_local, "smtp", None)
+    _local.smtp = None
+    if conn is None:
+        return
+    with _connections_lock:
+        _connections.discard(conn)
+    try:
+        conn.quit()
+    except (smtplib.SMTPException, OSError):
+        conn.close()
+
+
+def _connection() -> smtplib.SMTP:
+    """This thread's SMTP connection, opened on first use and checked after sitting idle."""
+    conn = getattr(_local, "smtp", None)
+    if conn is not None and time.monotonic() - _local.used_at > IDLE_SECONDS:
+        try:
+            conn.noop()
+        except (smtplib.SMTPException, OSError):
+            _drop()
+            conn = None
+    if conn is None:
+        conn = _local.smtp = _open()
+    _local.used_at = time.monotonic()
+    return conn
+
+
+def close_connections() -> None:
+    with _connections_lock:
+        conns = list(_connections)
+        _connections.clear()
+    for conn in conns:
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+
+# ── delivery ──────────────────────────────────
+
+@dataclass
+class _Message:
+    id: UUID
+    to_address: str
+    subject: str
+    html: str
+    attempts: int
+    expires_at: Optional[datetime]
+
+
+def _mime(msg: _Message) -> str:
+    mime = MIMEMultipart("alternative")
+    mime["Subject"] = msg.subject
+    mime["From"] = f"{SMTP_FROM_NAME} <{_sender()}>"
+    mime["To"] = msg.to_address
+    mime.attach(MIMEText(msg.html, "html"))
+    return mime.as_string()
+
+
+def _send_one(msg: _Message) -> None:
+    body = _mime(msg)
+    for attempt in (1, 2):
+        conn = _connection()
+        try:
+            conn.sendmail(_sender(), [msg.to_address], body)
+            return
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+            raise  # the server answered; the connection is still good
+        except (smtplib.SMTPException, OSError):
+            _drop()  # pooled connection went stale — reconnect once
+            if attempt == 2:
+                raise
+
+
+def _deliver(batch: list[_Message]) -> list[tuple[_Message, Optional[str]]]:
+    """Send a batch over this thread's connection. Returns (message, error or None) per message."""
+    results = []
+    for msg in batch:
+        try:
+            _send_one(msg)
+            results.append((msg, None))
+        except Exception as exc:
+            results.append((msg, f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+def _claim(limit: int) -> list[_Message]:
+    now = _now()
+    with SessionLocal() as db:
+        expired = db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.status == EmailStatusEnum.PENDING, EmailOutbox.expires_at <= now)
+            .values(status=EmailStatusEnum.EXPIRED)
+        ).rowcount
+        if expired:
+            print(f"[mailer] dropped {expired} expired messages", flush=True)
+        rows = db.execute(
+            select(EmailOutbox)
+            .where(
+                EmailOutbox.status == EmailStatusEnum.PENDING,
+                EmailOutbox.next_attempt_at <= now,
+                or_(EmailOutbox.expires_at.is_(None), EmailOutbox.expires_at > now),
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        batch = []
+        for row in rows:
+            row.attempts += 1
+            row.next_attempt_at = now + timedelta(seconds=LEASE_SECONDS)
+            batch.append(_Message(
+                row.id, row.to_address, row.subject, row.html, row.attempts, _aware(row.expires_at)
+            ))
+        db.commit()
+    return batch
+
+
+def _backoff(attempts: int) -> float:
+    delay = BASE_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _record(results: list[tuple[_Message, Optional[str]]]) -> None:
+    now = _now()
+    with SessionLocal() as db:
+        for msg, error in results:
+            row = db.get(EmailOutbox, msg.id)
+            if row is None:
+                continue
+            if error is None:
+                row.status = EmailStatusEnum.SENT
+                row.sent_at = now
+                row.last_error = None
+                continue
+            row.last_error = error
+            retry_at = now + timedelta(seconds=_backoff(msg.attempts))
+            if msg.expires_at is not None and retry_at >= msg.expires_at:
+                row.status = EmailStatusEnum.EXPIRED  # the retry would arrive too late to be useful
+            elif msg.attempts >= MAX_ATTEMPTS:
+                row.status = EmailStatusEnum.FAILED
+                print(f"[mailer] giving up on {msg.to_address} after {msg.attempts} attempts: {error}", flush=True)
+            else:
+                row.next_attempt_at = retry_at
+        db.commit()
+
+
+def purge(older_than: timedelta) -> int:
+    """Delete finished (sent, failed or expired) rows created before `older_than` ago."""
+    with SessionLocal() as db:
+        deleted = db.execute(
+            delete(EmailOutbox).where(
+                EmailOutbox.status != EmailStatusEnum.PENDING,
+                EmailOutbox.created_at < _now() - older_than,
+            )
+        ).rowcount
+        db.commit()
+    return deleted
+
+
+async def run_once() -> int:
+    """Claim and send one batch. Returns how many messages were claimed."""
+    batch = await run_in_threadpool(_claim, BATCH_SIZE)
+    if not batch:
+        return 0
+    results = await bulkhead.EMAIL.run(_deliver, batch)
+    await run_in_threadpool(_record, results)
+    failed = sum(1 for _, error in results if error)
+    if failed:
+        print(f"[mailer] sent {len(batch) - failed}/{len(batch)}, {failed} to retry", flush=True)
+    return len(batch)
+
+
+async def run() -> None:
+    """Delivery loop; runs until cancelled."""
+    global _wake
+    _wake = asyncio.Event()
+    next_purge = 0.0
+    try:
+        while True:
+            if time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + PURGE_SECONDS
+                try:
+                    purged = await run_in_threadpool(purge, timedelta(days=RETENTION_DAYS))
+                    if purged:
+                        print(f"[mailer] purged {purged} finished messages", flush=True)
+                except Exception as exc:
+                    print(f"[mailer] purge failed: {exc}", flush=True)
+            _wake.clear()  # before claiming, so a wake() during the batch isn't lost
+            try:
+                claimed = await run_once()
+            except Exception as exc:
+                print(f"[mailer] cycle failed: {exc}", flush=True)
+                claimed = 0
+            if claimed >= BATCH_SIZE:
+                continue  # more may be waiting
+            try:
+                await asyncio.wait_for(_wake.wait(), timeout=POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _wake = None
+        await run_in_threadpool(close_connections)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(ts: Optional[datetime]) -> Optional[datetime]:
+    return ts.replace(tzinfo=timezone.utc) if ts is not None and ts.tzinfo is None else ts
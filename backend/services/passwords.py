@@ -0,0 +1,84 @@
+"""
+Password hashing policy.
+
+bcrypt is deliberately slow, so it never runs on the event loop: `hash_async`
+and `verify_async` dispatch to the bounded HASH bulkhead (bcrypt releases the
+GIL, so threads run in parallel). A sign-in storm fills that pool and gets 503s
+instead of stalling every other endpoint.
+
+The cost is BCRYPT_ROUNDS (default 12). Pick it with
+
+    python -m scripts.calibrate_bcrypt [--budget-ms 250]
+
+which benchmarks this machine and reports the highest cost that fits the budget.
+Hashes made with any other cost are flagged on the next successful sign-in, and
+the caller stores the returned re-hash, so changing BCRYPT_ROUNDS migrates
+users transparently.
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from services import bulkhead
+
+ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+MIN_ROUNDS, MAX_ROUNDS = 10, 16  # calibration range; below 10 is too weak for production
+
+_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=ROUNDS,
+    bcrypt__min_rounds=ROUNDS,  # min == max: any other cost needs an update
+    bcrypt__max_rounds=ROUNDS,
+)
+
+
+def hash_password(plain: str) -> str:
+    return _context.hash(plain)
+
+
+def verify(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """
+    Check `plain` against `hashed`. Returns (ok, new_hash); new_hash is set when
+    the password matched but the stored hash uses an outdated cost or scheme.
+    """
+    return _context.verify_and_update(plain, hashed)
+
+
+async def hash_async(plain: str) -> str:
+    return await bulkhead.HASH.run(hash_password, plain)
+
+
+async def verify_async(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    return await bulkhead.HASH.run(verify, plain, hashed)
+
+
+def benchmark(rounds: int, samples: int = 3) -> float:
+    """Median seconds for one bcrypt hash at `rounds` on this machine."""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate(budget_ms: float) -> tuple[int, dict[int, float]]:
+    """
+    Highest cost in MIN_ROUNDS..MAX_ROUNDS whose hash fits `budget_ms`, plus the
+    measured milliseconds per cost. Each extra round doubles the time, so the
+    search stops at the first cost over budget.
+    """
+    measured: dict[int, float] = {}
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        measured[rounds] = benchmark(rounds) * 1000
+        if measured[rounds] > budget_ms:
+            break
+        chosen = rounds
+    return chosen, measured
@@ -0,0 +1,228 @@
+"""
+Bulk transaction writer — the shared insert path for imports and recurring
+generation.
+
+Takes a columnar batch (dict of equal-length lists) and inserts every valid
+row in a single round trip: PostgreSQL COPY when the session is bound to
+psycopg2 or psycopg 3, otherwise one executemany ``insert()``.
+The duplicate-detection ``fingerprint`` is computed in the validation pass and
+``amount_in_usd`` in one vectorized pass at each row's date (fx_history), and every inserted row takes a per-user change
+version. Inserted expenses are folded into the budget alert state (alert_state.apply).
+
+The caller owns the transaction — nothing here commits.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import uuid
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from models import Transaction, TransactionTypeEnum, CategoryEnum, CurrencyEnum, RecurringFrequencyEnum
+from services import alert_state, change_log, fx_history
+
+# Column order used for both COPY and executemany
+_COLUMNS: tuple[str, ...] = (
+    "id", "user_id", "amount", "currency", "amount_in_usd", "type", "category",
+    "description", "transaction_date", "is_recurring", "recurring_frequency",
+    "is_generated", "recurring_parent_id", "fingerprint", "change_version",
+)
+
+_REQUIRED = ("amount", "currency", "type", "category", "transaction_date")
+
+_CENT = Decimal("0.01")
+
+
+def write_transactions(
+    db: Session,
+    user_id: UUID,
+    batch: dict[str, list],
+    row_numbers: Optional[list[int]] = None,
+    duplicate_budget: Optional[dict[str, int]] = None,
+) -> dict:
+    """
+    Validate and bulk-insert a columnar batch of transactions for one user.
+
+    `batch` must contain the columns amount, currency, type, category and
+    transaction_date; description, amount_in_usd, is_recurring,
+    recurring_frequency, is_generated, recurring_parent_id and fingerprint are
+    optional. A caller that rewrites descriptions (import enrichment) passes the
+    fingerprint of the source row so dedupe doesn't depend on the rewrite.
+    `row_numbers` labels each position in error messages (defaults to 1-based).
+
+    Pass `duplicate_budget` (a dict shared across every chunk of one import) to
+    skip rows that already exist: fingerprints not yet in the dict are looked up
+    in one grouped query, and each stored match absorbs one incoming row. Repeats
+    inside the file itself are kept, so a re-import is idempotent without
+    dropping genuinely identical purchases.
+
+    Returns {"inserted", "skipped", "duplicates", "errors", "date_range",
+    "alerts_changed"}; pass the last to alert_state.notify after committing.
+    """
+    missing = [c for c in _REQUIRED if c not in batch]
+    if missing:
+        raise ValueError(f"Batch is missing required columns: {', '.join(missing)}")
+
+    n = len(batch["amount"])
+    labels = row_numbers or list(range(1, n + 1))
+
+    def col(name: str, i: int, default: Any = None) -> Any:
+        values = batch.get(name)
+        return values[i] if values is not None else default
+
+    rows: list[dict] = []
+    errors: list[str] = []
+    min_date = max_date = None
+
+    for i in range(n):
+        try:
+            try:
+                amount = Decimal(str(batch["amount"][i])).quantize(_CENT)
+            except InvalidOperation:
+                raise ValueError(f"invalid amount {batch['amount'][i]!r}")
+            if amount <= 0:
+                raise ValueError(f"amount must be positive, got {amount}")
+            currency = CurrencyEnum(batch["currency"][i])
+            tx_date = batch["transaction_date"][i]
+            if tx_date is None:
+                raise ValueError("missing transaction_date")
+            freq = col("recurring_frequency", i)
+            row = {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "amount": amount,
+                "currency": currency,
+                "amount_in_usd": col("amount_in_usd", i),
+                "type": TransactionTypeEnum(batch["type"][i]),
+                "category": CategoryEnum(batch["category"][i]),
+                "description": col("description", i),
+                "transaction_date": tx_date,
+                "is_recurring": bool(col("is_recurring", i, False)),
+                "recurring_frequency": RecurringFrequencyEnum(freq) if freq else None,
+                "is_generated": bool(col("is_generated", i, False)),
+                "recurring_parent_id": col("recurring_parent_id", i),
+                "fingerprint": col("fingerprint", i) or fingerprint(tx_date, amount, currency, col("description", i)),
+            }
+        except (ValueError, TypeError) as exc:
+            errors.append(f"Row {labels[i]}: {exc}")
+            continue
+
+        rows.append(row)
+
+    duplicates = 0
+    if duplicate_budget is not None and rows:
+        unseen = {r["fingerprint"] for r in rows} - duplicate_budget.keys()
+        duplicate_budget.update(existing_fingerprints(db, user_id, unseen))
+        kept: list[dict] = []
+        for row in rows:
+            if duplicate_budget.get(row["fingerprint"], 0) > 0:
+                duplicate_budget[row["fingerprint"]] -= 1
+                duplicates += 1
+            else:
+                kept.append(row)
+        rows = kept
+
+    # amount_in_usd at each row's own date, converted as one column
+    pending = [r for r in rows if r["amount_in_usd"] is None]
+    usd = fx_history.usd_amounts(
+        [r["amount"] for r in pending],
+        [r["currency"] for r in pending],
+        [r["transaction_date"] for r in pending],
+    )
+    for row, value in zip(pending, usd):
+        row["amount_in_usd"] = value
+
+    for row in rows:
+        if min_date is None or row["transaction_date"] < min_date:
+            min_date = row["transaction_date"]
+        if max_date is None or row["transaction_date"] > max_date:
+            max_date = row["transaction_date"]
+
+    if rows:
+        # Each row gets its own change version so incremental sync can page through a bulk import
+        first_version = change_log.reserve(db, user_id, len(rows))
+        for offset, row in enumerate(rows):
+            row["change_version"] = first_version + offset
+        if _supports_copy(db):
+            _copy_rows(db, rows)
+        else:
+            db.execute(insert(Transaction.__table__), rows)
+
+    alerts_changed = alert_state.apply(db, user_id, [
+        (r["category"], r["transaction_date"], r["currency"], r["amount"], r["amount_in_usd"])
+        for r in rows if r["type"] == TransactionTypeEnum.EXPENSE
+    ])
+    return {
+        "inserted": len(rows),
+        "skipped": len(errors),
+        "duplicates": duplicates,
+        "errors": errors,
+        "date_range": {"min": str(min_date), "max": str(max_date)} if rows else None,
+        "alerts_changed": alerts_changed,
+    }
+
+
+def fingerprint(tx_date, amount, currency, description: Optional[str]) -> str:
+    """sha256 of the normalized (date, amount, currency, description) tuple."""
+    desc = " ".join((description or "").lower().split())
+    raw = f"{tx_date.isoformat()[:10]}|{Decimal(str(amount)).quantize(_CENT)}|{CurrencyEnum(currency).value}|{desc}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def existing_fingerprints(db: Session, user_id: UUID, fingerprints: set[str]) -> dict[str, int]:
+    """Count stored transactions per fingerprint (uses ix_transactions_user_fingerprint)."""
+    counts = {fp: 0 for fp in fingerprints}
+    if not fingerprints:
+        return counts
+    rows = (
+        db.query(Transaction.fingerprint, func.count())
+        .filter(Transaction.user_id == user_id, Transaction.fingerprint.in_(list(fingerprints)))
+        .group_by(Transaction.fingerprint)
+        .all()
+    )
+    for fp, n in rows:
+        counts[fp] = n
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+def _supports_copy(db: Session) -> bool:
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver in ("psycopg2", "psycopg")
+
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if hasattr(value, "name") and hasattr(value, "value"):  # enum — stored by name
+        return value.name
+    return value
+
+
+def _copy_rows(db: Session, rows: list[dict]) -> None:
+    """Stream rows through COPY ... FROM STDIN on the session's own connection."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["" if (v := _copy_value(row[c])) is None else v for c in _COLUMNS])
+    buf.seek(0)
+
+    sql = f"COPY {Transaction.__tablename__} ({', '.join(_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    raw = db.connection().connection
+    with raw.cursor() as cur:
+        if hasattr(cur, "copy_expert"):  # psycopg2
+            cur.copy_expert(sql, buf)
+        else:  # psycopg 3
+            with cur.copy(sql) as copy:
+                copy.write(buf.getvalue())
@@ -0,0 +1,158 @@
+"""
+Staged-upload store for the import flow.
+
+/import/preview streams a file to disk once and stages it here; /import/confirm
+then refers to it by upload id instead of re-uploading and re-parsing.
+
+Uploads are keyed by the SHA-256 of their content and scoped per user:
+  uploads/staged/<user_id>/<hash>.bin      raw bytes (always written)
+  uploads/staged/<user_id>/<hash>.parquet  parsed DataFrame (small files, best effort)
+A small in-process cache keeps recently parsed frames hot. Everything expires
+after STAGED_UPLOAD_TTL and is swept lazily on each new upload.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+import pandas as pd
+
+STAGED_DIR = Path(__file__).parent.parent / "uploads" / "staged"
+STAGED_UPLOAD_TTL: int = int(os.getenv("STAGED_UPLOAD_TTL_SECONDS", "1800"))  # 30 minutes
+_MAX_CACHED_FRAMES = 16
+_COPY_BLOCK = 1024 * 1024
+
+_UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# (user_id, upload_id) -> (expires_at, filename, frame)
+_frames: "OrderedDict[tuple[str, str], tuple[float, str, pd.DataFrame]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def stage_file(user_id, filename: str, fileobj: BinaryIO) -> str:
+    """
+    Stream an upload to disk in fixed-size blocks, hashing as it goes, and
+    return its upload id. Memory use is one block regardless of file size.
+    """
+    user_dir = STAGED_DIR / str(user_id)
+    user_dir.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=user_dir, suffix=".part", delete=False) as tmp:
+        while block := fileobj.read(_COPY_BLOCK):
+            digest.update(block)
+            tmp.write(block)
+    upload_id = digest.hexdigest()
+    os.replace(tmp.name, user_dir / f"{upload_id}.bin")
+    (user_dir / f"{upload_id}.json").write_text(json.dumps({"filename": filename}))
+
+    sweep_expired()
+    return upload_id
+
+
+def save_frame(user_id, upload_id: str, frame: pd.DataFrame) -> None:
+    """Cache the parsed frame for a staged upload (memory + Parquet)."""
+    path = _path(user_id, upload_id, "parquet")
+    try:
+        frame.to_parquet(path)  # keep the index: it holds each row's position in the file
+    except Exception:
+        # Mixed-type object columns (or no Parquet engine) — confirm will re-parse the raw bytes
+        path.unlink(missing_ok=True)
+    _remember(str(user_id), upload_id, _filename(user_id, upload_id), frame)
+
+
+def load_frame(user_id, upload_id: str) -> Optional[tuple[pd.DataFrame, str]]:
+    """Return (frame, filename) from memory or Parquet, or None if only raw bytes remain."""
+    if not _UPLOAD_ID_RE.match(upload_id or ""):
+        return None
+    key = (str(user_id), upload_id)
+    now = time.monotonic()
+    with _lock:
+        hit = _frames.get(key)
+        if hit and hit[0] > now:
+            _frames.move_to_end(key)
+            return hit[2], hit[1]
+
+    path = _path(user_id, upload_id, "parquet")
+    if not _fresh(path):
+        return None
+    try:
+        frame = pd.read_parquet(path)
+    except Exception:
+        return None
+    filename = _filename(user_id, upload_id)
+    _remember(str(user_id), upload_id, filename, frame)
+    return frame, filename
+
+
+def load_raw(user_id, upload_id: str) -> Optional[tuple[Path, str]]:
+    """Return (path to raw bytes, filename) for a staged upload, or None if unknown / expired."""
+    if not _UPLOAD_ID_RE.match(upload_id or ""):
+        return None
+    path = _path(user_id, upload_id, "bin")
+    if not _fresh(path):
+        return None
+    return path, _filename(user_id, upload_id)
+
+
+def discard(user_id, upload_id: str) -> None:
+    if not _UPLOAD_ID_RE.match(upload_id or ""):
+        return
+    with _lock:
+        _frames.pop((str(user_id), upload_id), None)
+    for ext in ("bin", "json", "parquet"):
+        _path(user_id, upload_id, ext).unlink(missing_ok=True)
+
+
+def sweep_expired() -> int:
+    """Delete staged files older than the TTL. Returns the number of files removed."""
+    removed = 0
+    if not STAGED_DIR.exists():
+        return removed
+    cutoff = time.time() - STAGED_UPLOAD_TTL
+    for path in STAGED_DIR.glob("*/*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _path(user_id, upload_id: str, ext: str) -> Path:
+    return STAGED_DIR / str(user_id) / f"{upload_id}.{ext}"
+
+
+def _fresh(path: Path) -> bool:
+    try:
+        return path.stat().st_mtime >= time.time() - STAGED_UPLOAD_TTL
+    except FileNotFoundError:
+        return False
+
+
+def _filename(user_id, upload_id: str) -> str:
+    try:
+        return json.loads(_path(user_id, upload_id, "json").read_text()).get("filename", "")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return ""
+
+
+def _remember(user_id: str, upload_id: str, filename: str, frame: pd.DataFrame) -> None:
+    with _lock:
+        _frames[(user_id, upload_id)] = (time.monotonic() + STAGED_UPLOAD_TTL, filename, frame)
+        _frames.move_to_end((user_id, upload_id))
+        while len(_frames) > _MAX_CACHED_FRAMES:
+            _frames.popitem(last=False)
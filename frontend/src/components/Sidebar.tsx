@@ -61,8 +61,20 @@ export default function Sidebar() {
     };
 
     fetchAlerts();
-    const interval = setInterval(fetchAlerts, 20000);
-    return () => clearInterval(interval);
+    // Refetch only when the server says alerts changed; fall back to polling if the stream is unavailable
+    let interval: ReturnType<typeof setInterval> | null = null;
+    const feed = new EventSource(`${API}/changes/stream?token=${encodeURIComponent(token)}`);
+    feed.addEventListener('change', (e) => {
+      const { topic } = JSON.parse((e as MessageEvent).data);
+      if (topic === 'alerts' || topic === 'resync') fetchAlerts();
+    });
+    feed.onerror = () => {
+      if (feed.readyState === EventSource.CLOSED && !interval) interval = setInterval(fetchAlerts, 20000);
+    };
+    return () => {
+      feed.close();
+      if (interval) clearInterval(interval);
+    };
   }, [user, soundEnabled]);
 
   useEffect(() => {
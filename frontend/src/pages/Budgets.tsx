@@ -113,7 +113,7 @@ export default function Budgets() {
     try {
       const [gr, sr] = await Promise.all([
         fetch(`${API}/goals`, { headers: authHdr }),
-        fetch(`${API}/goals/net-savings`, { headers: authHdr }),
+        fetch(`${API}/goals/net-savings?currency=USD`, { headers: authHdr }),
       ]);
       if (gr.ok) setGoals(await gr.json());
       if (sr.ok) { const d = await sr.json(); setNetSavings(d.net_savings); }
@@ -152,9 +152,13 @@ const RESOURCE_SECTIONS: { title: string; items: { label: string; detail: string
 // ─────────────────────────────────────────────────────
 // Types for financial health data
 // ─────────────────────────────────────────────────────
-interface RawTx {
-  amount: string; currency: string; type: string; category: string;
-  transaction_date: string;
+interface DashboardData {
+  currency: string;
+  month: { total_income: number; total_expenses: number; net: number; by_category: Record<string, number> };
+  cashflow: { year: number; month: number; income: number; expenses: number }[];
+  budgets: Budget[];
+  job_income: { active_jobs: number; total_monthly_income: number };
+  net_savings: { net_savings: number; month_income: number; month_expenses: number };
 }
 interface ComputedSummary {
   total_income: number;
@@ -168,15 +172,6 @@ interface Budget {
   currency: string; spent: string; utilization: number; period: string;
 }
 
-/** Convert `amount` in `fromCurrency` to `toCurrency` using rates relative to a shared base. */
-function convert(amount: number, from: string, to: string, rates: Record<string, number>): number {
-  if (from === to) return amount;
-  const rFrom = rates[from] ?? 1;
-  const rTo = rates[to] ?? 1;
-  return (amount / rFrom) * rTo;
-}
-
-
 // ─────────────────────────────────────────────────────
 // Component
 // ─────────────────────────────────────────────────────
@@ -215,69 +210,27 @@ export default function Dashboard() {
     if (!token) return; // not logged in yet — wait for user to load
     setSummary(null);
     setLoadingHealth(true);
-    const today = new Date();
     const authHdr = { Authorization: `Bearer ${token}` };
 
     (async () => {
       try {
-        // 1. Get user's working currency
-        const profileRes = await fetch(`${API}/users/me`, { headers: authHdr });
-        const profileData = profileRes.ok ? await profileRes.json() : null;
-        const workingCurrency: string = profileData?.study_country_currency ?? 'USD';
-
-        // 2. Load exchange rates (no auth needed)
-        const ratesRes = await fetch(`${API}/exchange-rates/${workingCurrency}`);
-        const rates: Record<string, number> = ratesRes.ok
-          ? (await ratesRes.json()).rates ?? {}
-          : {};
-        rates[workingCurrency] = rates[workingCurrency] ?? 1;
-
-        // 3. Fetch this month's transactions (max 200 — backend limit)
-        const txUrl = `${API}/transactions?year=${today.getFullYear()}&month=${today.getMonth() + 1}&limit=200`;
-        const txRes = await fetch(txUrl, { headers: authHdr });
-        const txList: RawTx[] = txRes.ok ? await txRes.json() : [];
-
-        // 4. Compute converted totals
-        let totalIncome = 0, totalExpenses = 0;
-        const byCategory: Record<string, number> = {};
-        for (const tx of txList) {
-          const amt = convert(Number(tx.amount), tx.currency, workingCurrency, rates);
-          if (tx.type === 'INCOME') totalIncome += amt;
-          else totalExpenses += amt;
-          byCategory[tx.category] = (byCategory[tx.category] ?? 0) + amt;
-        }
-
+        // One aggregated request — totals arrive already converted to the working currency
+        const res = await fetch(`${API}/dashboard`, { headers: authHdr });
+        if (!res.ok) return;
+        const data: DashboardData = await res.json();
         setSummary({
-          total_income: totalIncome,
-          total_expenses: totalExpenses,
-          net: totalIncome - totalExpenses,
-          by_category: byCategory,
-          workingCurrency,
+          total_income: data.month.total_income,
+          total_expenses: data.month.total_expenses,
+          net: data.month.net,
+          by_category: data.month.by_category,
+          workingCurrency: data.currency,
         });
-
-        // 5. Load budgets
-        const bRes = await fetch(`${API}/budgets?active_only=true`, { headers: authHdr });
-        if (bRes.ok) setBudgets(await bRes.json());
-
-        // 6. Build 6-month cashflow
-        const months: { month: string; income: number; expenses: number }[] = [];
-        for (let i = 5; i >= 0; i--) {
-          const d = new Date(today.getFullYear(), today.getMonth() - i, 1);
-          const y = d.getFullYear();
-          const m = d.getMonth() + 1;
-          const label = d.toLocaleString('default', { month: 'short', year: '2-digit' });
-          try {
-            const r = await fetch(`${API}/transactions?year=${y}&month=${m}&limit=200`, { headers: authHdr });
-            const txs: RawTx[] = r.ok ? await r.json() : [];
-            let inc = 0, exp = 0;
-            for (const tx of txs) {
-              const amt = convert(Number(tx.amount), tx.currency, workingCurrency, rates);
-              if (tx.type === 'INCOME') inc += amt; else exp += amt;
-            }
-            months.push({ month: label, income: Math.round(inc * 100) / 100, expenses: Math.round(exp * 100) / 100 });
-          } catch { months.push({ month: label, income: 0, expenses: 0 }); }
-        }
-        setCashflow(months);
+        setBudgets(data.budgets);
+        setCashflow(data.cashflow.map(c => ({
+          month: new Date(c.year, c.month - 1, 1).toLocaleString('default', { month: 'short', year: '2-digit' }),
+          income: c.income,
+          expenses: c.expenses,
+        })));
       } finally {
         setLoadingHealth(false);
       }
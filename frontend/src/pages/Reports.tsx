@@ -171,7 +171,7 @@ export default function Reports() {
 
   const fetchWeeklySummary = useCallback(async () => {
     try {
-      const res = await fetch(`${API}/transactions/weekly-summary`, { headers });
+      const res = await fetch(`${API}/transactions/weekly-summary?currency=USD`, { headers });
       if (res.ok) setWeeklySummary(await res.json());
     } catch { /* silent */ }
   }, [user?.accessToken]);
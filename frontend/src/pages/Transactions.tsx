@@ -139,6 +139,7 @@ export default function Transactions() {
   // ── Import state ───────────────────────────────────────────────────────────
   type ImportStep = 'upload' | 'review' | 'done';
   interface ImportPreview {
+    upload_id: string;
     filename: string;
     total_rows: number;
     detected_columns: Record<string, string>;
@@ -148,7 +149,7 @@ export default function Transactions() {
     warnings: string[];
     date_format?: string;
   }
-  interface ImportResult { imported: number; skipped: number; errors: string[]; date_range?: { min: string; max: string } | null; }
+  interface ImportResult { imported: number; skipped: number; duplicates?: number; errors: string[]; date_range?: { min: string; max: string } | null; }
   const [importOpen, setImportOpen] = useState(false);
   const [importStep, setImportStep] = useState<ImportStep>('upload');
   const [importFile, setImportFile] = useState<File | null>(null);
@@ -158,6 +159,7 @@ export default function Transactions() {
   const [importDefCategory] = useState('OTHER');
   const [importLoading, setImportLoading] = useState(false);
   const [importResult, setImportResult] = useState<ImportResult | null>(null);
+  const [importProgress, setImportProgress] = useState<{ parsed: number; total: number | null } | null>(null);
   const importFileRef = useRef<HTMLInputElement>(null);
 
   // ── Forecast Context helpers ───────────────────────────────────────────────
@@ -317,7 +319,8 @@ export default function Transactions() {
     if (!importFile || !importPreview) return;
     setImportLoading(true);
     const fd = new FormData();
-    fd.append('file', importFile);
+    // The file was staged during preview — confirm by reference instead of re-uploading
+    fd.append('upload_id', importPreview.upload_id);
     fd.append('date_col', importColMap['date'] ?? '');
     fd.append('amount_col', importColMap['amount'] ?? '');
     fd.append('debit_col', importColMap['debit'] ?? '');
@@ -332,8 +335,19 @@ export default function Transactions() {
       const res = await fetch(`${API}/transactions/import/confirm`, {
         method: 'POST', headers: { Authorization: `Bearer ${token}` }, body: fd,
       });
-      const data = await res.json();
+      let data = await res.json();
       if (!res.ok) throw new Error(data.detail ?? 'Import failed');
+      // The import runs as a background job — poll until it finishes
+      while (data.status === 'queued' || data.status === 'running') {
+        setImportProgress({ parsed: data.rows_parsed, total: data.total_rows });
+        await new Promise(r => setTimeout(r, 1000));
+        const poll = await fetch(`${API}/transactions/import/jobs/${data.job_id}`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        data = await poll.json();
+        if (!poll.ok) throw new Error(data.detail ?? 'Import failed');
+      }
+      if (data.status === 'failed') throw new Error(data.error_message ?? 'Import failed');
       const result = data as ImportResult;
       setImportResult(result);
       setImportStep('done');
@@ -348,6 +362,7 @@ export default function Transactions() {
     } catch (err: unknown) {
       showToast(err instanceof Error ? err.message : 'Import failed', false);
     } finally {
+      setImportProgress(null);
       setImportLoading(false);
     }
   };
@@ -1306,7 +1321,9 @@ export default function Transactions() {
                 <div style={{ ...s.modalFooter, marginTop: '16px' }}>
                   <button style={s.cancelBtn} onClick={() => setImportStep('upload')}>Back</button>
                   <button style={s.saveBtn} onClick={handleImportConfirm} disabled={importLoading || !importColMap['date']}>
-                    {importLoading ? 'Importing…' : `Import ${importPreview.total_rows} rows`}
+                    {importLoading
+                      ? (importProgress ? `Importing… ${importProgress.parsed} / ${importProgress.total ?? importPreview.total_rows}` : 'Importing…')
+                      : `Import ${importPreview.total_rows} rows`}
                   </button>
                 </div>
               </div>
@@ -1323,6 +1340,11 @@ export default function Transactions() {
                     {importResult.skipped} rows skipped (missing date or amount)
                   </p>
                 )}
+                {(importResult.duplicates ?? 0) > 0 && (
+                  <p style={{ color: 'var(--brand-rose)', opacity: 0.55, fontSize: '0.85em', margin: '4px 0' }}>
+                    {importResult.duplicates} already imported — skipped as duplicates
+                  </p>
+                )}
                 {importResult.errors.length > 0 && (
                   <div style={{ background: '#2a1010', border: '1px solid #7a2020', borderRadius: '8px', padding: '10px', marginTop: '12px', textAlign: 'left' }}>
                     {importResult.errors.map((e, i) => <p key={i} style={{ color: '#f87171', fontSize: '0.78em', margin: i === 0 ? 0 : '4px 0 0' }}>{e}</p>)}
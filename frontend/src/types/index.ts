@@ -68,4 +68,5 @@ export interface AlertItem {
   type: 'BUDGET_EXCEEDED' | 'APPROACHING_LIMIT';
   message: string;
   utilization: number;
+  first_crossed_at?: string | null;
 }